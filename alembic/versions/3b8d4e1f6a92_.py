@@ -0,0 +1,32 @@
+"""empty message
+
+Revision ID: 3b8d4e1f6a92
+Revises: c63609f2c6a2
+Create Date: 2026-10-18 18:12:40.518203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8d4e1f6a92'
+down_revision = 'c63609f2c6a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_author_id_deleted_created_reference',
+            'posts',
+            ['author_id', 'deleted', sa.text('created DESC'), sa.text('reference DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_author_id_deleted_created_reference', table_name='posts', postgresql_concurrently=True)
@@ -0,0 +1,24 @@
+"""empty message
+
+Revision ID: 5b9e2d7f4a61
+Revises: c41f0e8a7d23
+Create Date: 2026-10-18 23:02:17.318402
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e2d7f4a61'
+down_revision = 'c41f0e8a7d23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('profiles', sa.Column('photo_version', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('profiles', 'photo_version')
@@ -0,0 +1,47 @@
+"""empty message
+
+Revision ID: 6d3a8f2c1e57
+Revises: e4c2a9d7b1f6
+Create Date: 2026-10-20 09:12:44.306118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6d3a8f2c1e57'
+down_revision = 'e4c2a9d7b1f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # both depend on users.is_active, which is counted live now
+    op.drop_column('enterprize_statistics', 'accepted_invitations')
+    op.drop_column('enterprize_statistics', 'active_registrations')
+
+
+def downgrade():
+    op.add_column('enterprize_statistics', sa.Column('active_registrations', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('enterprize_statistics', sa.Column('accepted_invitations', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE enterprize_statistics
+        SET
+            active_registrations = counters.active_registrations,
+            accepted_invitations = counters.accepted_invitations
+        FROM (
+            SELECT
+                profiles.enterprize_id,
+                count(*) FILTER (WHERE users.activated IS NOT NULL AND users.is_active) AS active_registrations,
+                count(*) FILTER (
+                    WHERE users.invited IS NOT NULL AND users.activated IS NOT NULL AND users.is_active
+                ) AS accepted_invitations
+            FROM profiles
+            JOIN users ON users.profile_id = profiles.id
+            GROUP BY profiles.enterprize_id
+        ) AS counters
+        WHERE enterprize_statistics.enterprize_id = counters.enterprize_id
+        """
+    )
@@ -0,0 +1,74 @@
+"""empty message
+
+Revision ID: 7a2c9d5b0e14
+Revises: 3b8d4e1f6a92
+Create Date: 2026-10-18 18:47:09.331870
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2c9d5b0e14'
+down_revision = '3b8d4e1f6a92'
+branch_labels = None
+depends_on = None
+
+TABLES = (('posts', 'author_id'), ('qa_posts', 'author_id'), ('events', 'organizer_id'))
+
+
+def upgrade():
+    for table, profile_column in TABLES:
+        op.add_column(table, sa.Column('enterprize_id', sa.Integer(), nullable=True))
+        op.execute(
+            f'UPDATE {table} SET enterprize_id = profiles.enterprize_id '
+            f'FROM profiles WHERE profiles.id = {table}.{profile_column}'
+        )
+        op.alter_column(table, 'enterprize_id', nullable=False)
+        op.create_foreign_key(None, table, 'enterprizes', ['enterprize_id'], ['id'])
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_author_id_deleted_created_reference', table_name='posts', postgresql_concurrently=True)
+        op.create_index(
+            'ix_posts_enterprize_id_deleted_created_reference',
+            'posts',
+            ['enterprize_id', 'deleted', sa.text('created DESC'), sa.text('reference DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_qa_posts_enterprize_id_parent_id_created',
+            'qa_posts',
+            ['enterprize_id', 'parent_id', sa.text('created DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_events_enterprize_id_deleted_created',
+            'events',
+            ['enterprize_id', 'deleted', sa.text('created DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_events_enterprize_id_deleted_created', table_name='events', postgresql_concurrently=True)
+        op.drop_index(
+            'ix_qa_posts_enterprize_id_parent_id_created', table_name='qa_posts', postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_posts_enterprize_id_deleted_created_reference', table_name='posts', postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_posts_author_id_deleted_created_reference',
+            'posts',
+            ['author_id', 'deleted', sa.text('created DESC'), sa.text('reference DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+    for table, _ in TABLES:
+        op.drop_column(table, 'enterprize_id')
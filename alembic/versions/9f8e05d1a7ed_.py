@@ -0,0 +1,56 @@
+"""empty message
+
+Revision ID: 9f8e05d1a7ed
+Revises: f077ffd97713
+Create Date: 2026-10-18 16:31:07.552914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f8e05d1a7ed'
+down_revision = 'f077ffd97713'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('enterprize_statistics',
+    sa.Column('enterprize_id', sa.Integer(), nullable=False),
+    sa.Column('total_registrations', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('active_registrations', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_invitations', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('accepted_invitations', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['enterprize_id'], ['enterprizes.id'], ),
+    sa.PrimaryKeyConstraint('enterprize_id')
+    )
+    op.execute(
+        """
+        INSERT INTO enterprize_statistics (
+            enterprize_id, total_registrations, active_registrations, total_invitations, accepted_invitations
+        )
+        SELECT
+            profiles.enterprize_id,
+            count(*) FILTER (WHERE streams.registered),
+            count(*) FILTER (WHERE streams.activated),
+            count(*) FILTER (WHERE streams.invited),
+            count(*) FILTER (WHERE streams.invited AND streams.activated)
+        FROM (
+            SELECT
+                stream_reference,
+                bool_or(payload ->> 'name' = 'UserRegistered') AS registered,
+                bool_or(payload ->> 'name' = 'UserActivated') AS activated,
+                bool_or(payload ->> 'name' = 'UserInvited') AS invited
+            FROM system_event_logs
+            GROUP BY stream_reference
+        ) AS streams
+        JOIN profiles ON profiles.reference = streams.stream_reference
+        GROUP BY profiles.enterprize_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('enterprize_statistics')
@@ -0,0 +1,28 @@
+"""empty message
+
+Revision ID: a83d61c2f5b9
+Revises: 5b9e2d7f4a61
+Create Date: 2026-10-19 09:14:52.671304
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83d61c2f5b9'
+down_revision = '5b9e2d7f4a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('system_event_logs', sa.Column('claimed_until', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('system_event_logs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('system_event_logs', sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('system_event_logs', 'last_error')
+    op.drop_column('system_event_logs', 'attempts')
+    op.drop_column('system_event_logs', 'claimed_until')
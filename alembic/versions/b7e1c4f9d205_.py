@@ -0,0 +1,38 @@
+"""empty message
+
+Revision ID: b7e1c4f9d205
+Revises: 6d3a8f2c1e57
+Create Date: 2026-10-20 11:47:19.880542
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1c4f9d205'
+down_revision = '6d3a8f2c1e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # e4c2a9d7b1f6 dropped the constraint only so the seeder could share one hash,
+    # a database seeded in between has to be seeded again before it comes back
+    if not context.is_offline_mode():
+        shared_hashes = op.get_bind().execute(
+            sa.text(
+                """
+                SELECT count(*)
+                FROM (SELECT 1 FROM users WHERE password IS NOT NULL GROUP BY password HAVING count(*) > 1) AS shared
+                """
+            )
+        ).scalar()
+        if shared_hashes:
+            raise RuntimeError(f'{shared_hashes} password hashes are shared by several users, reseed the database')
+
+    op.create_unique_constraint('users_password_key', 'users', ['password'])
+
+
+def downgrade():
+    op.drop_constraint('users_password_key', 'users', type_='unique')
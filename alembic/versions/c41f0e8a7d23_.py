@@ -0,0 +1,41 @@
+"""empty message
+
+Revision ID: c41f0e8a7d23
+Revises: 7a2c9d5b0e14
+Create Date: 2026-10-18 21:12:44.508217
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f0e8a7d23'
+down_revision = '7a2c9d5b0e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('system_event_logs', sa.Column('dispatched_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    # everything logged so far was handled inline by the request that wrote it
+    op.execute('UPDATE system_event_logs SET dispatched_at = coalesce(created, now())')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_system_event_logs_undispatched',
+            'system_event_logs',
+            ['id'],
+            unique=False,
+            postgresql_where=sa.text('dispatched_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_system_event_logs_undispatched', table_name='system_event_logs', postgresql_concurrently=True
+        )
+
+    op.drop_column('system_event_logs', 'dispatched_at')
@@ -0,0 +1,33 @@
+"""empty message
+
+Revision ID: c63609f2c6a2
+Revises: 9f8e05d1a7ed
+Create Date: 2026-10-18 16:58:22.104377
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c63609f2c6a2'
+down_revision = '9f8e05d1a7ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_profiles_enterprize_id_created_reference',
+            'profiles',
+            ['enterprize_id', 'created', 'reference'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_profiles_enterprize_id_created_reference', table_name='profiles', postgresql_concurrently=True
+        )
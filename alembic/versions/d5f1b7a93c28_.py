@@ -0,0 +1,37 @@
+"""empty message
+
+Revision ID: d5f1b7a93c28
+Revises: a83d61c2f5b9
+Create Date: 2026-10-19 10:02:37.184526
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f1b7a93c28'
+down_revision = 'a83d61c2f5b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('enterprize_statistics_events',
+    sa.Column('stream_reference', sa.String(length=36), nullable=False),
+    sa.Column('event_name', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('stream_reference', 'event_name')
+    )
+    # everything already in the log is part of the counters built from it
+    op.execute(
+        """
+        INSERT INTO enterprize_statistics_events (stream_reference, event_name)
+        SELECT DISTINCT stream_reference, payload ->> 'name'
+        FROM system_event_logs
+        WHERE payload ->> 'name' IN ('UserRegistered', 'UserActivated', 'UserInvited')
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('enterprize_statistics_events')
@@ -0,0 +1,25 @@
+"""empty message
+
+Revision ID: e4c2a9d7b1f6
+Revises: d5f1b7a93c28
+Create Date: 2026-10-19 14:21:05.517302
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c2a9d7b1f6'
+down_revision = 'd5f1b7a93c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # salted hashes never collide, the constraint only cost an index on every write
+    # and kept seeded users from sharing one hash of a known password
+    op.drop_constraint('users_password_key', 'users', type_='unique')
+
+
+def downgrade():
+    op.create_unique_constraint('users_password_key', 'users', ['password'])
@@ -0,0 +1,52 @@
+"""empty message
+
+Revision ID: f077ffd97713
+Revises: decacc61c183
+Create Date: 2026-10-18 16:02:41.318520
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f077ffd97713'
+down_revision = 'decacc61c183'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # a concurrent build that hits a duplicate fails late and leaves an invalid index behind,
+    # so usernames differing only in case are reported up front for a manual merge
+    if not context.is_offline_mode():
+        duplicates = op.get_bind().execute(
+            sa.text(
+                """
+                SELECT string_agg(username, ', ' ORDER BY username)
+                FROM users
+                WHERE username IS NOT NULL
+                GROUP BY lower(username)
+                HAVING count(*) > 1
+                """
+            )
+        ).fetchall()
+        if duplicates:
+            raise RuntimeError(
+                'Usernames that differ only in case must be merged before the unique index is built: '
+                + '; '.join(usernames for usernames, in duplicates)
+            )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_username_lower',
+            'users',
+            [sa.text('lower(username)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_username_lower', table_name='users', postgresql_concurrently=True)
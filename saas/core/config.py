@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseSettings
 
@@ -10,14 +10,63 @@ class Configuration(BaseSettings):
     CORS_ALLOWED_ORIGINS: Optional[list[str]] = ['*']
 
     DATABASE_URI: str
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_POOL_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT_IN_SECONDS: int = 30
+    DATABASE_POOL_RECYCLE_IN_SECONDS: int = 1_800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_USE_LIFO: bool = True
 
     JWT_ALGORITHM: str = 'HS256'
     JWT_ACCESS_TOKEN_EXPIRY_IN_SECONDS: int = 86_400
     JWT_CHANGE_TOKEN_EXPIRY_IN_SECONDS: int = 7 * 24 * 3_600
 
+    PASSWORD_HASHING_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASHING_WORKERS: Optional[int] = None
+    PASSWORD_HASHING_MAX_PENDING: int = 64
+    PASSWORD_HASHING_RETRY_AFTER_IN_SECONDS: int = 1
+
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1_024
+    PRINCIPAL_CACHE_TTL_IN_SECONDS: int = 60
+
     GOOGLE_CLOUD_STORAGE_CREDENTIALS_PATH: Optional[str]
     GOOGLE_CLOUD_STORAGE_BUCKET_NAME: str
 
+    BLOB_STORE_BACKEND: Literal['google_cloud', 'local'] = 'google_cloud'
+    BLOB_STORE_LOCAL_PATH: str = 'media'
+    BLOB_STORE_LOCAL_BASE_URL: Optional[str] = None
+    BLOB_STORE_POOL_SIZE: int = 10
+    BLOB_STORE_CHUNK_SIZE_IN_BYTES: int = 8 * 1024 * 1024
+    BLOB_STORE_RESUMABLE_THRESHOLD_IN_BYTES: int = 8 * 1024 * 1024
+
+    PHOTO_MAX_SIZE_IN_BYTES: int = 10 * 1024 * 1024
+    PHOTO_MAX_PIXELS: int = 40_000_000
+    PHOTO_MAX_DIMENSION: int = 10_000
+    PHOTO_PIPELINE_WORKERS: int = 2
+    PHOTO_PIPELINE_MAX_PENDING: int = 100
+    PHOTO_PIPELINE_SPOOL_PATH: Optional[str] = None
+    PHOTO_PIPELINE_RETRY_AFTER_IN_SECONDS: int = 5
+    PHOTO_PIPELINE_MAX_ATTEMPTS: int = 3
+    PHOTO_PIPELINE_RETRY_DELAY_IN_SECONDS: int = 30
+    PHOTO_URL_PREFIX: str = '/photos'
+    PHOTO_CACHE_PATH: Optional[str] = None
+    PHOTO_CACHE_MAX_SIZE_IN_BYTES: int = 512 * 1024 * 1024
+    PHOTO_CACHE_SLOTS: int = 1
+    PHOTO_CACHE_MAX_AGE_IN_SECONDS: int = 31_536_000
+
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 16
+    WEBSOCKET_HEARTBEAT_INTERVAL_IN_SECONDS: float = 30.0
+
+    MESSAGE_BUS_DISPATCHER: Literal['inline', 'thread', 'outbox'] = 'outbox'
+    MESSAGE_BUS_WORKERS: int = 4
+    MESSAGE_BUS_QUEUE_MAX_SIZE: int = 1_000
+    MESSAGE_BUS_SHUTDOWN_TIMEOUT_IN_SECONDS: int = 30
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_IN_SECONDS: float = 1.0
+    OUTBOX_CLAIM_TIMEOUT_IN_SECONDS: int = 300
+    OUTBOX_RETRY_DELAY_IN_SECONDS: int = 30
+    OUTBOX_MAX_RETRY_DELAY_IN_SECONDS: int = 3_600
+
     CUSTOMER_IO_SITE_ID: str = ''
     CUSTOMER_IO_API_KEY: str = ''
 
@@ -0,0 +1,81 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from saas.core.config import configuration
+
+
+class PrincipalCache:
+    def __init__(self, max_size: int, ttl_in_seconds: float):
+        self.max_size = max_size
+        self.ttl_in_seconds = ttl_in_seconds
+
+        self._entries: OrderedDict[str, tuple[float, str, bytes]] = OrderedDict()
+        self._usernames_by_reference: dict[str, str] = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, username: str) -> Optional[Any]:
+        key = username.lower()
+
+        with self._lock:
+            try:
+                expires_at, _, payload = self._entries[key]
+            except KeyError:
+                return None
+
+            if expires_at <= time.monotonic():
+                self._remove(key=key)
+                return None
+
+            self._entries.move_to_end(key)
+
+        # every hit gets its own detached copy, so callers can never mutate the cached state
+        return pickle.loads(payload)
+
+    def set(self, username: str, profile: Any):
+        if self.max_size <= 0:
+            return
+
+        key = username.lower()
+        payload = pickle.dumps(profile)
+
+        with self._lock:
+            self._remove(key=key)
+            self._entries[key] = (time.monotonic() + self.ttl_in_seconds, profile.reference, payload)
+            self._usernames_by_reference[profile.reference] = key
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(key=oldest_key)
+
+    def invalidate(self, reference: str):
+        with self._lock:
+            key = self._usernames_by_reference.get(reference)
+
+            if key is not None:
+                self._remove(key=key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._usernames_by_reference.clear()
+
+    def _remove(self, key: str):
+        try:
+            _, reference, _ = self._entries.pop(key)
+        except KeyError:
+            return
+
+        if self._usernames_by_reference.get(reference) == key:
+            del self._usernames_by_reference[reference]
+
+
+principal_cache = PrincipalCache(
+    max_size=configuration.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_in_seconds=configuration.PRINCIPAL_CACHE_TTL_IN_SECONDS,
+)
@@ -1,10 +1,37 @@
+import threading
+
 from sqlalchemy import MetaData
-from sqlalchemy.orm import foreign, remote
+from sqlalchemy.orm import foreign, remote, clear_mappers, configure_mappers
 
 metadata = MetaData()
 
+_mappers_lock = threading.Lock()
+_mappers_started = False
+
 
 def start_mappers():
+    global _mappers_started
+
+    # the classical mappers may only be registered once per process, every later call is a no-op
+    if _mappers_started:
+        return
+
+    with _mappers_lock:
+        if not _mappers_started:
+            _map_domain_models()
+            configure_mappers()
+            _mappers_started = True
+
+
+def stop_mappers():
+    global _mappers_started
+
+    with _mappers_lock:
+        clear_mappers()
+        _mappers_started = False
+
+
+def _map_domain_models():
     from saas.database.models import (
         users,
         profiles,
@@ -42,10 +69,22 @@ def start_mappers():
     )
     mapper(User, users, properties={'_password': users.c.password})
 
-    mapper(NewsPost, posts, properties={'author': relationship(Profile, backref='news_posts')})
-    mapper(Question, qa_posts, properties={'answers': relationship(Answer)})
-    mapper(Answer, qa_posts)
-    mapper(Event, events, properties={'organizer': relationship(Profile, backref='events')})
+    mapper(
+        NewsPost,
+        posts,
+        properties={'author': relationship(Profile, backref='news_posts'), 'enterprize': relationship(Enterprize)},
+    )
+    mapper(
+        Question,
+        qa_posts,
+        properties={'answers': relationship(Answer), 'enterprize': relationship(Enterprize)},
+    )
+    mapper(Answer, qa_posts, properties={'enterprize': relationship(Enterprize)})
+    mapper(
+        Event,
+        events,
+        properties={'organizer': relationship(Profile, backref='events'), 'enterprize': relationship(Enterprize)},
+    )
 
 
 def create_tables():
@@ -1,19 +1,26 @@
 from .enterprizes import enterprizes
-from .system_events import system_event_logs, SystemEvent
-from .events import events, EventRepository
-from .posts import posts, qa_posts, PostRepository
-from .profiles import users, profiles, ProfileRepository
+from .system_events import system_event_logs, SystemEvent, SystemEventRepository
+from .statistics import enterprize_statistics, enterprize_statistics_events
+from .events import events, EventRepository, AsyncEventRepository
+from .posts import posts, qa_posts, PostRepository, AsyncPostRepository
+from .profiles import users, profiles, ProfileRepository, AsyncProfileRepository
 
 __all__ = [
     'profiles',
     'users',
     'ProfileRepository',
+    'AsyncProfileRepository',
     'enterprizes',
+    'enterprize_statistics',
+    'enterprize_statistics_events',
     'events',
     'EventRepository',
+    'AsyncEventRepository',
     'posts',
     'qa_posts',
     'PostRepository',
+    'AsyncPostRepository',
     'system_event_logs',
     'SystemEvent',
+    'SystemEventRepository',
 ]
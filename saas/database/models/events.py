@@ -1,9 +1,11 @@
 import sqlalchemy
 from sqlalchemy.orm import exc
+from starlette.concurrency import run_in_threadpool
 
 from saas.database.metadata import metadata
 from saas.domain.events import EventAbstractRepository, Event
 from saas.domain.exceptions import EventDoesNotExist
+from .enterprizes import enterprizes
 from .profiles import profiles
 from saas.domain.users import Profile, User, UserType, Enterprize
 
@@ -26,6 +28,11 @@ events = sqlalchemy.Table(
         index=True,
         nullable=False,
     ),
+    sqlalchemy.Column('enterprize_id', sqlalchemy.Integer, sqlalchemy.ForeignKey(enterprizes.c.id), nullable=False),
+)
+
+sqlalchemy.Index(
+    'ix_events_enterprize_id_deleted_created', events.c.enterprize_id, events.c.deleted, events.c.created.desc()
 )
 
 
@@ -35,7 +42,7 @@ class EventRepository(EventAbstractRepository):
 
     def save_event(self, event: Event):
         self.session.add(event)
-        self.session.commit()
+        self.session.flush()
 
     def retrieve(self, reference: str) -> Event:
         try:
@@ -53,21 +60,34 @@ class EventRepository(EventAbstractRepository):
             )
             return (
                 self.session.query(Event)
-                .join(Profile)
-                .filter(Event.reference == reference, Profile.enterprize == admin.enterprize)
+                .filter(Event.reference == reference, Event.enterprize_id == admin.enterprize_id)
                 .one()
             )
         except exc.NoResultFound:
             raise EventDoesNotExist(reference=reference)
 
-    def list_events_for_enterprize(self, enterprize_reference: str):
-        profile_ids = self._list_profile_ids_for_enterprize(enterprize_reference=enterprize_reference)
-
+    def list_events_for_enterprize(self, enterprize: 'Enterprize'):
         return list(
             self.session.query(Event)
-            .filter(Event.organizer_id.in_(profile_ids), Event.deleted.is_(None))  # type: ignore
+            .filter(Event.enterprize_id == enterprize.id, Event.deleted.is_(None))  # type: ignore
             .order_by(Event.created.desc())  # type: ignore
         )
 
-    def _list_profile_ids_for_enterprize(self, enterprize_reference: str):
-        return self.session.query(Profile.id).filter(Enterprize.reference == enterprize_reference)  # type: ignore
+
+class AsyncEventRepository:
+    def __init__(self, repository: 'EventAbstractRepository'):
+        self.repository = repository
+
+    async def save_event(self, event: Event):
+        return await run_in_threadpool(self.repository.save_event, event=event)
+
+    async def retrieve(self, reference: str) -> Event:
+        return await run_in_threadpool(self.repository.retrieve, reference=reference)
+
+    async def retrieve_event_by_admin(self, reference: str, admin_username: str) -> Event:
+        return await run_in_threadpool(
+            self.repository.retrieve_event_by_admin, reference=reference, admin_username=admin_username
+        )
+
+    async def list_events_for_enterprize(self, enterprize: 'Enterprize') -> list[Event]:
+        return await run_in_threadpool(self.repository.list_events_for_enterprize, enterprize=enterprize)
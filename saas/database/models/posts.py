@@ -1,10 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
 import sqlalchemy
-from sqlalchemy.orm import exc
+from sqlalchemy import tuple_
+from sqlalchemy.orm import exc, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from saas.database.metadata import metadata
 from saas.domain.exceptions import PostDoesNotExist
 from saas.domain.posts import PostAbstractRepository, NewsPost, Question, Answer
 from saas.domain.users import Enterprize, Profile, User, UserType
+from .enterprizes import enterprizes
 from .profiles import profiles
 
 posts = sqlalchemy.Table(
@@ -23,6 +29,7 @@ posts = sqlalchemy.Table(
         index=True,
         nullable=False,
     ),
+    sqlalchemy.Column('enterprize_id', sqlalchemy.Integer, sqlalchemy.ForeignKey(enterprizes.c.id), nullable=False),
 )
 
 qa_posts = sqlalchemy.Table(
@@ -42,6 +49,21 @@ qa_posts = sqlalchemy.Table(
         nullable=False,
     ),
     sqlalchemy.Column('parent_id', sqlalchemy.Integer, sqlalchemy.ForeignKey('qa_posts.id'), index=True),
+    sqlalchemy.Column('enterprize_id', sqlalchemy.Integer, sqlalchemy.ForeignKey(enterprizes.c.id), nullable=False),
+)
+
+sqlalchemy.Index(
+    'ix_posts_enterprize_id_deleted_created_reference',
+    posts.c.enterprize_id,
+    posts.c.deleted,
+    posts.c.created.desc(),
+    posts.c.reference.desc(),
+)
+sqlalchemy.Index(
+    'ix_qa_posts_enterprize_id_parent_id_created',
+    qa_posts.c.enterprize_id,
+    qa_posts.c.parent_id,
+    qa_posts.c.created.desc(),
 )
 
 # tags = sqlalchemy.Table(
@@ -67,30 +89,40 @@ class PostRepository(PostAbstractRepository):
 
     def add_news_post(self, post: 'NewsPost'):
         self.session.add(post)
-        self.session.commit()
-
-    def list_for_enterprize(self, enterprize: 'Enterprize') -> list['NewsPost']:
-        profile_ids = self._list_profile_ids_for_enterprize(enterprize=enterprize)
-
-        return list(
+        self.session.flush()
+
+    def list_for_enterprize(
+        self,
+        enterprize: 'Enterprize',
+        limit: Optional[int] = None,
+        before: Optional[tuple[datetime, str]] = None,
+    ) -> list['NewsPost']:
+        query = (
             self.session.query(NewsPost)
-            .filter(NewsPost.author_id.in_(profile_ids), NewsPost.deleted.is_(None))  # type: ignore
-            .order_by(NewsPost.created.desc())  # type: ignore
+            .options(joinedload(NewsPost.author).joinedload(Profile.user))
+            .filter(NewsPost.enterprize_id == enterprize.id, NewsPost.deleted.is_(None))  # type: ignore
         )
 
-    def list_questions_for_enterprize(self, enterprize: 'Enterprize') -> list['Question']:
-        profile_ids = self._list_profile_ids_for_enterprize(enterprize=enterprize)
+        if before is not None:
+            query = query.filter(tuple_(NewsPost.created, NewsPost.reference) < before)  # type: ignore
 
+        return list(query.order_by(NewsPost.created.desc(), NewsPost.reference.desc()).limit(limit))  # type: ignore
+
+    def list_questions_for_enterprize(self, enterprize: 'Enterprize') -> list['Question']:
         return list(
             self.session.query(Question)
-            .filter(Question.author_id.in_(profile_ids), Question.parent_id.is_(None))  # type: ignore
+            .filter(Question.enterprize_id == enterprize.id, Question.parent_id.is_(None))  # type: ignore
+            .options(*self._question_loader_options())
             .order_by(Question.created.desc())  # type: ignore
         )
 
     def retrieve_news_post(self, reference: str) -> 'NewsPost':
         try:
             return (
-                self.session.query(NewsPost).filter(NewsPost.reference == reference, NewsPost.deleted.is_(None)).one()  # type: ignore
+                self.session.query(NewsPost)
+                .options(joinedload(NewsPost.author).joinedload(Profile.user))
+                .filter(NewsPost.reference == reference, NewsPost.deleted.is_(None))  # type: ignore
+                .one()
             )
         except exc.NoResultFound:
             raise PostDoesNotExist(reference=reference)
@@ -105,8 +137,7 @@ class PostRepository(PostAbstractRepository):
             )
             return (
                 self.session.query(NewsPost)
-                .join(Profile)
-                .filter(NewsPost.reference == reference, Profile.enterprize == admin.enterprize)
+                .filter(NewsPost.reference == reference, NewsPost.enterprize_id == admin.enterprize_id)
                 .one()
             )
         except exc.NoResultFound:
@@ -117,11 +148,16 @@ class PostRepository(PostAbstractRepository):
 
     def add_question(self, question: 'Question'):
         self.session.add(question)
-        self.session.commit()
+        self.session.flush()
 
     def retrieve_question(self, reference: str):
         try:
-            return self.session.query(Question).filter_by(reference=reference).one()
+            return (
+                self.session.query(Question)
+                .filter_by(reference=reference)
+                .options(*self._question_loader_options())
+                .one()
+            )
         except exc.NoResultFound:
             raise PostDoesNotExist(reference=reference)
 
@@ -130,7 +166,57 @@ class PostRepository(PostAbstractRepository):
 
     def add_answer(self, answer: 'Answer'):
         self.session.add(answer)
-        self.session.commit()
+        self.session.flush()
+
+    @staticmethod
+    def _question_loader_options():
+        return (
+            joinedload(Question.author).joinedload(Profile.user),
+            selectinload(Question.answers).joinedload(Answer.author).joinedload(Profile.user),
+        )
+
+
+class AsyncPostRepository:
+    def __init__(self, repository: 'PostAbstractRepository'):
+        self.repository = repository
+
+    async def add_news_post(self, post: 'NewsPost'):
+        return await run_in_threadpool(self.repository.add_news_post, post=post)
+
+    async def list_for_enterprize(
+        self,
+        enterprize: 'Enterprize',
+        limit: Optional[int] = None,
+        before: Optional[tuple[datetime, str]] = None,
+    ) -> list['NewsPost']:
+        return await run_in_threadpool(
+            self.repository.list_for_enterprize, enterprize=enterprize, limit=limit, before=before
+        )
+
+    async def list_questions_for_enterprize(self, enterprize: 'Enterprize') -> list['Question']:
+        return await run_in_threadpool(self.repository.list_questions_for_enterprize, enterprize=enterprize)
+
+    async def retrieve_news_post(self, reference: str) -> 'NewsPost':
+        return await run_in_threadpool(self.repository.retrieve_news_post, reference=reference)
+
+    async def retrieve_news_post_by_admin(self, reference: str, admin_username: str) -> 'NewsPost':
+        return await run_in_threadpool(
+            self.repository.retrieve_news_post_by_admin, reference=reference, admin_username=admin_username
+        )
+
+    async def retrieve_news_posts_by_tag(self, tag: str):
+        return await run_in_threadpool(self.repository.retrieve_news_posts_by_tag, tag=tag)
+
+    async def add_question(self, question: 'Question'):
+        return await run_in_threadpool(self.repository.add_question, question=question)
+
+    async def retrieve_question(self, reference: str) -> 'Question':
+        return await run_in_threadpool(self.repository.retrieve_question, reference=reference)
+
+    async def retrieve_answers_for_question(self, question_reference: str):
+        return await run_in_threadpool(
+            self.repository.retrieve_answers_for_question, question_reference=question_reference
+        )
 
-    def _list_profile_ids_for_enterprize(self, enterprize: 'Enterprize'):
-        return self.session.query(Profile.id).filter_by(enterprize_id=enterprize.id)  # type: ignore
+    async def add_answer(self, answer: 'Answer'):
+        return await run_in_threadpool(self.repository.add_answer, answer=answer)
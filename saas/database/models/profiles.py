@@ -1,15 +1,21 @@
 import dataclasses
-from typing import Any
+import itertools
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, Optional
 
 import sqlalchemy
 import sqlalchemy.exc
-from google.cloud import storage
+import sqlalchemy.orm
 from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import exc
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy.orm.util import identity_key
+from starlette.concurrency import run_in_threadpool
 
 from saas.core.config import configuration
+from saas.database.cache import principal_cache
 from saas.database.metadata import metadata
 from saas.database.models import SystemEvent
 from saas.domain.exceptions import (
@@ -28,7 +34,10 @@ from saas.domain.users import (
     Gender,
     LegalStatus,
 )
+from saas.domain.users.events import UserEvents
 from .enterprizes import enterprizes
+from .statistics import enterprize_statistics, enterprize_statistics_events
+from .system_events import system_event_logs
 
 profiles = sqlalchemy.Table(
     'profiles',
@@ -48,6 +57,7 @@ profiles = sqlalchemy.Table(
     sqlalchemy.Column('department', sqlalchemy.String),
     sqlalchemy.Column('position', sqlalchemy.String),
     sqlalchemy.Column('photo_url', sqlalchemy.String),
+    sqlalchemy.Column('photo_version', sqlalchemy.String),
     sqlalchemy.Column('skills', JSONB, server_default='[]'),
     sqlalchemy.Column('descriptions', JSONB, server_default='[]'),
     sqlalchemy.Column('motivation', JSONB, server_default='[]'),
@@ -90,54 +100,107 @@ users = sqlalchemy.Table(
     ),
 )
 
+sqlalchemy.Index(
+    'ix_profiles_enterprize_id_created_reference', profiles.c.enterprize_id, profiles.c.created, profiles.c.reference
+)
+sqlalchemy.Index('ix_users_username_lower', func.lower(users.c.username), unique=True)
+
+USERNAMES_LOOKUP_BATCH_SIZE = 1_000
+
+DASHBOARD_STATISTICS = ('total_registrations', 'active_registrations', 'total_invitations', 'accepted_invitations')
+# only what can never be undone is projected, is_active can be cleared without an event
+PROJECTED_DASHBOARD_STATISTICS = ('total_registrations', 'total_invitations')
+DASHBOARD_STATISTICS_EVENTS = (
+    UserEvents.UserRegistered.name,
+    UserEvents.UserInvited.name,
+)
+
+
+def _mark_principal_stale(session, reference: str):
+    session.info.setdefault('stale_principal_references', set()).add(reference)
+
+
+def _invalidate_stale_principals(session, *args):
+    for reference in session.info.pop('stale_principal_references', set()):
+        principal_cache.invalidate(reference=reference)
+
+
+sqlalchemy.event.listen(sqlalchemy.orm.Session, 'after_commit', _invalidate_stale_principals)
+sqlalchemy.event.listen(sqlalchemy.orm.Session, 'after_soft_rollback', _invalidate_stale_principals)
+
+
+def upsert_dashboard_statistics(enterprize_id: int, **counters: int):
+    statement = postgresql.insert(enterprize_statistics).values(enterprize_id=enterprize_id, **counters)
+
+    return statement.on_conflict_do_update(
+        index_elements=[enterprize_statistics.c.enterprize_id],
+        set_={name: enterprize_statistics.c[name] + statement.excluded[name] for name in counters},
+    )
+
 
 class ProfileRepository(ProfileAbstractRepository):
     def __init__(self, session):
         self.session = session
 
     def save_profile(self, profile: 'Profile'):
-        if getattr(profile, 'event_logs', None) is not None:
-            try:
-                event = profile.event_logs[-1]
-            except IndexError:
-                pass
-            else:
-                event_log = SystemEvent(stream_reference=profile.reference, payload=dataclasses.asdict(event))
-                self.session.add(event_log)
+        event_log = self._create_event_log(profile=profile)
+        if event_log is not None:
+            self.session.add(event_log)
 
         self.session.add(profile)
-        self.session.commit()
+        self.session.flush()
 
-    def upload_photo(self, profile: Profile, photo: Any):
-        client = storage.Client()
-        bucket = client.bucket(bucket_name=configuration.GOOGLE_CLOUD_STORAGE_BUCKET_NAME)
-        blob = storage.Blob(name=profile.reference, bucket=bucket)
-        blob.upload_from_file(file_obj=photo.file, content_type=photo.content_type)
-        blob.make_public()
+        _mark_principal_stale(session=self.session, reference=profile.reference)
 
-        profile.photo_url = blob.public_url
+    def save_profiles(self, profiles: list['Profile']):
+        event_logs = [event_log for event_log in map(self._create_event_log, profiles) if event_log is not None]
+        new_profiles = [profile for profile in profiles if not sqlalchemy.inspect(profile).has_identity]
+        new_users = [
+            profile.user
+            for profile in profiles
+            if profile.user is not None and not sqlalchemy.inspect(profile.user).has_identity
+        ]
 
-        self.session.add(profile)
-        self.session.commit()
+        self._reserve_primary_keys(entities=new_profiles, table_name='profiles')
+        self._reserve_primary_keys(entities=new_users, table_name='users')
+        self._reserve_primary_keys(entities=event_logs, table_name='system_event_logs')
 
-        return profile.photo_url
+        self.session.add_all(event_logs)
+        self.session.add_all(profiles)
+        self.session.flush()
 
-    def delete_photo(self, profile: Profile):
-        client = storage.Client()
-        bucket = client.bucket(bucket_name=configuration.GOOGLE_CLOUD_STORAGE_BUCKET_NAME)
+        for profile in profiles:
+            _mark_principal_stale(session=self.session, reference=profile.reference)
 
-        blob = bucket.blob(blob_name=profile.reference)
-        blob.delete()
+    def _create_event_log(self, profile: 'Profile') -> Optional['SystemEvent']:
+        if not getattr(profile, 'event_logs', None):
+            return None
 
-        profile.photo_url = None
+        event_log = SystemEvent(stream_reference=profile.reference, payload=dataclasses.asdict(profile.event_logs[-1]))
 
-        self.session.add(profile)
-        self.session.commit()
+        # without the outbox the request delivers the event itself, a relay started later must not replay it
+        if configuration.MESSAGE_BUS_DISPATCHER != 'outbox':
+            event_log.mark_dispatched()
+
+        return event_log
+
+    def _reserve_primary_keys(self, entities: list[Any], table_name: str):
+        # rows with known primary keys are inserted by the unit of work with one executemany per table,
+        # instead of one INSERT ... RETURNING per row
+        if not entities or self.session.get_bind().dialect.name != 'postgresql':
+            return
+
+        primary_keys = self.session.execute(
+            sqlalchemy.text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {'table': table_name, 'count': len(entities)},
+        )
+        for entity, (primary_key,) in zip(entities, primary_keys):
+            entity.id = primary_key
 
     def create_enterprize(self, enterprize: Enterprize):
         try:
             self.session.add(enterprize)
-            self.session.commit()
+            self.session.flush()
         except sqlalchemy.exc.IntegrityError:
             raise EnterprizeExists(subdomain=enterprize.subdomain)
 
@@ -147,16 +210,78 @@ class ProfileRepository(ProfileAbstractRepository):
         except exc.NoResultFound:
             raise UserDoesNotExist(reference=reference)
 
-    def retrieve_profiles_for_admin(self, admin_username: str) -> list[Profile]:
+    def retrieve_profile_for_update(self, reference: str) -> Profile:
+        # locked until the unit of work ends, and read past whatever the session already holds
+        try:
+            return (
+                self.session.query(Profile).filter_by(reference=reference).populate_existing().with_for_update().one()
+            )
+        except exc.NoResultFound:
+            raise UserDoesNotExist(reference=reference)
+
+    def retrieve_photo_version(self, reference: str) -> Optional[str]:
+        # a plain column read, never answered from the identity map or the principal cache
+        try:
+            return self.session.query(Profile.photo_version).filter_by(reference=reference).one().photo_version
+        except exc.NoResultFound:
+            raise UserDoesNotExist(reference=reference)
+
+    def retrieve_profiles_for_admin(
+        self,
+        admin_username: str,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> list[Profile]:
+        query = self._query_profiles_for_admin(
+            admin_username=admin_username, availability=availability, department=department, legal_status=legal_status
+        )
+
+        if after is not None:
+            query = query.filter(sqlalchemy.tuple_(Profile.created, Profile.reference) > after)  # type: ignore
+
+        return query.limit(limit).all()
+
+    def stream_profiles_for_admin(
+        self,
+        admin_username: str,
+        batch_size: int = 1_000,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> Iterator[Profile]:
+        query = self._query_profiles_for_admin(
+            admin_username=admin_username, availability=availability, department=department, legal_status=legal_status
+        )
+
+        return iter(query.yield_per(batch_size))
+
+    def _query_profiles_for_admin(
+        self,
+        admin_username: str,
+        availability: Optional[UserAvailability],
+        department: Optional[str],
+        legal_status: Optional[LegalStatus],
+    ):
         admin = self.retrieve_by_username(username=admin_username)
-        return (
+        query = (
             self.session.query(Profile)
             .join(User)
-            .options(joinedload(Profile.user))
-            .filter(Profile.enterprize == admin.enterprize, User.type == UserType.user.value, User.is_active)
-            .all()
+            .options(contains_eager(Profile.user))
+            .filter(Profile.enterprize_id == admin.enterprize_id, User.type == UserType.user.value, User.is_active)
         )
 
+        if availability is not None:
+            query = query.filter(Profile.availability == availability)  # type: ignore
+        if department is not None:
+            query = query.filter(Profile.department == department)  # type: ignore
+        if legal_status is not None:
+            query = query.filter(Profile.legal_status == legal_status)  # type: ignore
+
+        return query.order_by(Profile.created, Profile.reference)  # type: ignore
+
     def retrieve_invited_profiles_for_admin(self, admin_username: str) -> list[Profile]:
         admin = self.retrieve_by_username(username=admin_username)
         return (
@@ -167,14 +292,55 @@ class ProfileRepository(ProfileAbstractRepository):
             .all()
         )
 
+    def retrieve_by_usernames(self, usernames: list[str]) -> list['Profile']:
+        usernames = [username.lower() for username in usernames]
+        found_profiles = []
+
+        for start in range(0, len(usernames), USERNAMES_LOOKUP_BATCH_SIZE):
+            found_profiles.extend(
+                self.session.query(Profile)
+                .join(User)
+                .options(contains_eager(Profile.user), joinedload(Profile.enterprize))
+                .filter(func.lower(User.username).in_(usernames[start : start + USERNAMES_LOOKUP_BATCH_SIZE]))
+            )
+
+        return found_profiles
+
     def retrieve_by_username(self, username: str) -> 'Profile':
+        cached_profile = principal_cache.get(username=username)
+
+        if cached_profile is not None:
+            return self._merge_cached_profile(profile=cached_profile)
+
+        return self.retrieve_by_username_for_authentication(username=username)
+
+    def retrieve_by_username_for_authentication(self, username: str) -> 'Profile':
+        # the cache is only invalidated in this process, so the password and is_active are always read fresh
         try:
-            return self.session.query(Profile).join(User).filter(func.lower(User.username) == username.lower()).one()
+            profile = (
+                self.session.query(Profile)
+                .join(User)
+                .options(contains_eager(Profile.user), joinedload(Profile.enterprize))
+                .filter(func.lower(User.username) == username.lower())
+                .one()
+            )
         except exc.NoResultFound:
             raise UsernameDoesNotExist(username=username)
         except exc.MultipleResultsFound:
             assert False, f'Multiple users found for {username}.'
 
+        principal_cache.set(username=username, profile=profile)
+
+        return profile
+
+    def _merge_cached_profile(self, profile: 'Profile') -> 'Profile':
+        persistent_profile = self.session.identity_map.get(identity_key(instance=profile))
+
+        if persistent_profile is not None:
+            return persistent_profile
+
+        return self.session.merge(profile, load=False)
+
     def retrieve_by_username_allowed_to_register(self, username: str) -> Profile:
         pass
 
@@ -190,34 +356,190 @@ class ProfileRepository(ProfileAbstractRepository):
     def retrieve_dashboard_statistics(self, admin_username: str) -> dict[str, int]:
         admin = self.retrieve_by_username(username=admin_username)
 
-        total_registrations = (
-            self.session.query(Profile)
-            .join(User)
-            .filter(Profile.enterprize == admin.enterprize, User.password is not None)  # type: ignore
-            .count()
+        projected_statistics = (
+            self.session.query(*(enterprize_statistics.c[name] for name in PROJECTED_DASHBOARD_STATISTICS))
+            .filter(enterprize_statistics.c.enterprize_id == admin.enterprize_id)  # type: ignore
+            .one_or_none()
         )
-        active_registrations = (
-            self.session.query(Profile)
+
+        is_activated = sqlalchemy.and_(User.activated.isnot(None), User.is_active)  # type: ignore
+        is_invited = User.invited.isnot(None)  # type: ignore
+
+        live_statistics = (
+            self.session.query(
+                func.count().filter(is_activated).label('active_registrations'),
+                func.count().filter(sqlalchemy.and_(is_invited, is_activated)).label('accepted_invitations'),
+            )
+            .select_from(Profile)
             .join(User)
-            .filter(Profile.enterprize == admin.enterprize, User.activated.isnot(None), User.is_active)  # type: ignore
-            .count()
+            .filter(Profile.enterprize_id == admin.enterprize_id)  # type: ignore
+            .one()
         )
-        total_invitations = (
-            self.session.query(Profile)
-            .join(User)
-            .filter(Profile.enterprize == admin.enterprize, User.invited.isnot(None))  # type: ignore
-            .count()
+
+        if projected_statistics is None:
+            return {**dict.fromkeys(PROJECTED_DASHBOARD_STATISTICS, 0), **live_statistics._asdict()}
+
+        return {**projected_statistics._asdict(), **live_statistics._asdict()}
+
+    def record_statistics_event(self, stream_reference: str, event_name: str) -> bool:
+        if self.session.get_bind().dialect.name == 'postgresql':
+            recorded = self.session.execute(
+                postgresql.insert(enterprize_statistics_events)
+                .values(stream_reference=stream_reference, event_name=event_name)
+                .on_conflict_do_nothing()
+            )
+            return recorded.rowcount == 1
+
+        # sqlite has no ON CONFLICT before SQLAlchemy 1.4, a second writer fails on the primary key instead
+        recorded = self.session.query(
+            sqlalchemy.exists().where(
+                sqlalchemy.and_(
+                    enterprize_statistics_events.c.stream_reference == stream_reference,
+                    enterprize_statistics_events.c.event_name == event_name,
+                )
+            )
+        ).scalar()
+        if recorded:
+            return False
+
+        self.session.execute(
+            enterprize_statistics_events.insert().values(stream_reference=stream_reference, event_name=event_name)
         )
-        accepted_invitations = (
-            self.session.query(Profile)
-            .join(User)
-            .filter(User.invited.isnot(None), User.activated.isnot(None), User.is_active)  # type: ignore
-            .count()
+        return True
+
+    def increment_dashboard_statistics(self, enterprize_id: int, **counters: int):
+        if self.session.get_bind().dialect.name == 'postgresql':
+            self.session.execute(upsert_dashboard_statistics(enterprize_id=enterprize_id, **counters))
+            return
+
+        # sqlite only, the first two events of an enterprize could both miss the UPDATE
+        updated = self.session.execute(
+            enterprize_statistics.update()
+            .where(enterprize_statistics.c.enterprize_id == enterprize_id)
+            .values({name: enterprize_statistics.c[name] + value for name, value in counters.items()})
+        )
+
+        if updated.rowcount == 0:
+            self.session.execute(enterprize_statistics.insert().values(enterprize_id=enterprize_id, **counters))
+
+    def rebuild_dashboard_statistics(self):
+        event_name = system_event_logs.c.payload['name'].as_string()
+        counted_events = (
+            sqlalchemy.select([system_event_logs.c.stream_reference, event_name.label('event_name')])
+            .where(event_name.in_(DASHBOARD_STATISTICS_EVENTS))
+            .distinct()
+            .alias('counted_events')
         )
+        streams = (
+            sqlalchemy.select(
+                [
+                    counted_events.c.stream_reference,
+                    *(
+                        func.max(sqlalchemy.case([(counted_events.c.event_name == name, 1)], else_=0)).label(name)
+                        for name in DASHBOARD_STATISTICS_EVENTS
+                    ),
+                ]
+            )
+            .group_by(counted_events.c.stream_reference)
+            .alias('streams')
+        )
+        registered, invited = (streams.c[name] for name in DASHBOARD_STATISTICS_EVENTS)
+        counters = (
+            sqlalchemy.select([profiles.c.enterprize_id, func.sum(registered), func.sum(invited)])
+            .select_from(streams.join(profiles, profiles.c.reference == streams.c.stream_reference))
+            .group_by(profiles.c.enterprize_id)
+        )
+
+        self.session.execute(enterprize_statistics.delete())
+        self.session.execute(
+            enterprize_statistics.insert().from_select(['enterprize_id', *PROJECTED_DASHBOARD_STATISTICS], counters)
+        )
+        self.session.execute(enterprize_statistics_events.delete())
+        self.session.execute(
+            enterprize_statistics_events.insert().from_select(
+                ['stream_reference', 'event_name'],
+                sqlalchemy.select([counted_events.c.stream_reference, counted_events.c.event_name]),
+            )
+        )
+
+
+class AsyncProfileRepository:
+    def __init__(self, repository: 'ProfileAbstractRepository'):
+        self.repository = repository
+
+    async def save_profile(self, profile: 'Profile'):
+        return await run_in_threadpool(self.repository.save_profile, profile=profile)
+
+    async def save_profiles(self, profiles: list['Profile']):
+        return await run_in_threadpool(self.repository.save_profiles, profiles=profiles)
+
+    async def create_enterprize(self, enterprize: Enterprize):
+        return await run_in_threadpool(self.repository.create_enterprize, enterprize=enterprize)
+
+    async def retrieve_profile(self, reference: str) -> Profile:
+        return await run_in_threadpool(self.repository.retrieve_profile, reference=reference)
+
+    async def retrieve_profile_for_update(self, reference: str) -> Profile:
+        return await run_in_threadpool(self.repository.retrieve_profile_for_update, reference=reference)
+
+    async def retrieve_photo_version(self, reference: str) -> Optional[str]:
+        return await run_in_threadpool(self.repository.retrieve_photo_version, reference=reference)
+
+    async def retrieve_profiles_for_admin(
+        self,
+        admin_username: str,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> list[Profile]:
+        return await run_in_threadpool(
+            self.repository.retrieve_profiles_for_admin,
+            admin_username=admin_username,
+            limit=limit,
+            after=after,
+            availability=availability,
+            department=department,
+            legal_status=legal_status,
+        )
+
+    async def stream_profiles_for_admin(
+        self,
+        admin_username: str,
+        batch_size: int = 1_000,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> AsyncIterator[Profile]:
+        profiles = await run_in_threadpool(
+            self.repository.stream_profiles_for_admin,
+            admin_username=admin_username,
+            batch_size=batch_size,
+            availability=availability,
+            department=department,
+            legal_status=legal_status,
+        )
+
+        # one thread hop per batch rather than per row
+        while batch := await run_in_threadpool(list, itertools.islice(profiles, batch_size)):
+            for profile in batch:
+                yield profile
+
+    async def retrieve_by_usernames(self, usernames: list[str]) -> list['Profile']:
+        return await run_in_threadpool(self.repository.retrieve_by_usernames, usernames=usernames)
+
+    async def retrieve_by_username(self, username: str) -> 'Profile':
+        return await run_in_threadpool(self.repository.retrieve_by_username, username=username)
+
+    async def retrieve_by_username_for_authentication(self, username: str) -> 'Profile':
+        return await run_in_threadpool(self.repository.retrieve_by_username_for_authentication, username=username)
+
+    async def retrieve_by_username_allowed_to_register(self, username: str) -> Profile:
+        return await run_in_threadpool(self.repository.retrieve_by_username_allowed_to_register, username=username)
+
+    async def retrieve_enterprize(self, enterprize_subdomain: str) -> Enterprize:
+        return await run_in_threadpool(self.repository.retrieve_enterprize, enterprize_subdomain=enterprize_subdomain)
 
-        return {
-            'total_registrations': total_registrations,
-            'active_registrations': active_registrations,
-            'total_invitations': total_invitations,
-            'accepted_invitations': accepted_invitations,
-        }
+    async def retrieve_dashboard_statistics(self, admin_username: str) -> dict[str, int]:
+        return await run_in_threadpool(self.repository.retrieve_dashboard_statistics, admin_username=admin_username)
@@ -0,0 +1,20 @@
+import sqlalchemy
+
+from saas.database.metadata import metadata
+from .enterprizes import enterprizes
+
+enterprize_statistics = sqlalchemy.Table(
+    'enterprize_statistics',
+    metadata,
+    sqlalchemy.Column('enterprize_id', sqlalchemy.Integer, sqlalchemy.ForeignKey(enterprizes.c.id), primary_key=True),
+    sqlalchemy.Column('total_registrations', sqlalchemy.Integer, nullable=False, server_default='0'),
+    sqlalchemy.Column('total_invitations', sqlalchemy.Integer, nullable=False, server_default='0'),
+)
+
+# every (stream, event name) pair counted so far, an event that is delivered again finds its row and counts nothing
+enterprize_statistics_events = sqlalchemy.Table(
+    'enterprize_statistics_events',
+    metadata,
+    sqlalchemy.Column('stream_reference', sqlalchemy.String(36), primary_key=True),
+    sqlalchemy.Column('event_name', sqlalchemy.String(64), primary_key=True),
+)
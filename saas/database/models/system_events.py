@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Dict
+from typing import Dict, Iterable, Optional
 
 import sqlalchemy.exc
 from sqlalchemy.dialects.postgresql import JSONB
@@ -13,6 +13,16 @@ system_event_logs = sqlalchemy.Table(
     sqlalchemy.Column('stream_reference', sqlalchemy.String(36), index=True, nullable=False),
     sqlalchemy.Column('created', sqlalchemy.TIMESTAMP(timezone=True)),
     sqlalchemy.Column('payload', JSONB),
+    sqlalchemy.Column('dispatched_at', sqlalchemy.TIMESTAMP(timezone=True)),
+    sqlalchemy.Column('claimed_until', sqlalchemy.TIMESTAMP(timezone=True)),
+    sqlalchemy.Column('attempts', sqlalchemy.Integer, nullable=False, server_default='0'),
+    sqlalchemy.Column('last_error', sqlalchemy.Text),
+)
+
+sqlalchemy.Index(
+    'ix_system_event_logs_undispatched',
+    system_event_logs.c.id,
+    postgresql_where=system_event_logs.c.dispatched_at.is_(None),
 )
 
 
@@ -21,3 +31,59 @@ class SystemEvent:
         self.created = datetime.now(tz=timezone.utc)
         self.stream_reference = stream_reference
         self.payload = payload
+        self.dispatched_at: Optional[datetime] = None
+        self.claimed_until: Optional[datetime] = None
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+
+    def mark_dispatched(self):
+        self.dispatched_at = datetime.now(tz=timezone.utc)
+
+    def claim(self, until: datetime):
+        self.claimed_until = until
+
+    def record_failure(self, error: str, retry_at: datetime):
+        self.attempts += 1
+        self.last_error = error
+        self.claimed_until = retry_at
+
+
+class SystemEventRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def claim_undispatched_system_events(self, limit: int, until: datetime) -> list['SystemEvent']:
+        # rows locked by another relay are skipped, so any number of relays can drain the outbox concurrently,
+        # the claim outlives the lock and keeps the rows away from other relays while they are delivered
+        now = datetime.now(tz=timezone.utc)
+        system_events = (
+            self.session.query(SystemEvent)
+            .filter(
+                SystemEvent.dispatched_at.is_(None),
+                sqlalchemy.or_(SystemEvent.claimed_until.is_(None), SystemEvent.claimed_until < now),
+            )
+            .order_by(SystemEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        for system_event in system_events:
+            system_event.claim(until=until)
+        self.session.flush()
+
+        return system_events
+
+    def retrieve_system_event(self, system_event_id: int) -> 'SystemEvent':
+        return self.session.query(SystemEvent).filter_by(id=system_event_id).one()
+
+    def mark_system_events_dispatched(self, system_event_ids: Iterable[int]):
+        self.session.execute(
+            system_event_logs.update()
+            .where(system_event_logs.c.id.in_(list(system_event_ids)))
+            .values(dispatched_at=datetime.now(tz=timezone.utc), claimed_until=None)
+        )
+
+    def save_system_event(self, system_event: 'SystemEvent'):
+        self.session.add(system_event)
+        self.session.flush()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import sqlalchemy.exc
+import sqlalchemy.pool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_in_seconds = 0.0
+        self.max_wait_in_seconds = 0.0
+
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_in_seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_in_seconds += wait_in_seconds
+            self.max_wait_in_seconds = max(self.max_wait_in_seconds, wait_in_seconds)
+
+    def record_timeout(self, wait_in_seconds: float):
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait_in_seconds += wait_in_seconds
+            self.max_wait_in_seconds = max(self.max_wait_in_seconds, wait_in_seconds)
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_in_seconds = 0.0
+            self.max_wait_in_seconds = 0.0
+
+    def snapshot(self, pool: 'sqlalchemy.pool.Pool') -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            statistics = dict(
+                pool_class=type(pool).__name__,
+                checkouts=self.checkouts,
+                timeouts=self.timeouts,
+                average_wait_in_ms=self.total_wait_in_seconds / attempts * 1_000 if attempts else 0.0,
+                max_wait_in_ms=self.max_wait_in_seconds * 1_000,
+            )
+
+        # only queue pools keep track of their size, sqlite uses singleton/static/null pools
+        if isinstance(pool, sqlalchemy.pool.QueuePool):
+            statistics.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool.max_overflow if isinstance(pool, InstrumentedQueuePool) else None,
+            )
+
+        return statistics
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(sqlalchemy.pool.QueuePool):
+    metrics = pool_metrics
+
+    def __init__(self, creator, max_overflow: int = 10, **kwargs):
+        # kept as configured, QueuePool only holds it privately
+        self.max_overflow = max_overflow
+        super().__init__(creator, max_overflow=max_overflow, **kwargs)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            self.metrics.record_timeout(wait_in_seconds=time.perf_counter() - start)
+            raise
+
+        self.metrics.record_checkout(wait_in_seconds=time.perf_counter() - start)
+        return connection
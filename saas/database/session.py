@@ -7,6 +7,7 @@ import sqlalchemy.engine.url
 import sqlalchemy.dialects.sqlite
 
 from saas.core.config import configuration
+from saas.database.pool import InstrumentedQueuePool, pool_metrics
 
 
 def _default(value):
@@ -27,17 +28,32 @@ if database_engine_url.get_dialect() == sqlalchemy.dialects.sqlite.pysqlite.SQLi
     database_engine = sqlalchemy.create_engine(database_engine_url, echo=configuration.DEBUG)
 else:
     database_engine = sqlalchemy.create_engine(
-        database_engine_url, pool_size=10, max_overflow=20, echo=configuration.DEBUG, json_serializer=dumps
+        database_engine_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=configuration.DATABASE_POOL_SIZE,
+        max_overflow=configuration.DATABASE_POOL_MAX_OVERFLOW,
+        pool_timeout=configuration.DATABASE_POOL_TIMEOUT_IN_SECONDS,
+        pool_recycle=configuration.DATABASE_POOL_RECYCLE_IN_SECONDS,
+        pool_pre_ping=configuration.DATABASE_POOL_PRE_PING,
+        pool_use_lifo=configuration.DATABASE_POOL_USE_LIFO,
+        executemany_mode='values',
+        echo=configuration.DEBUG,
+        json_serializer=dumps,
     )
 
 
-DatabaseSession = sqlalchemy.orm.sessionmaker(bind=database_engine, autocommit=False, autoflush=False)
+DatabaseSession = sqlalchemy.orm.sessionmaker(
+    bind=database_engine, autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+
+def retrieve_pool_statistics() -> dict:
+    return pool_metrics.snapshot(pool=database_engine.pool)
 
 
 def create_session():
     from .metadata import start_mappers
 
-    session = DatabaseSession()
     start_mappers()
 
-    return session
+    return DatabaseSession()
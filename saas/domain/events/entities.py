@@ -9,6 +9,7 @@ class Event(DomainEntity):
         if not organizer.user.is_admin:
             raise UserNotAdmin(username=organizer.user.username)
 
+        self.enterprize = organizer.enterprize
         self.organizer = organizer
         self.content = content
 
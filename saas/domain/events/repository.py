@@ -1,5 +1,6 @@
 import abc
 
+from saas.domain.users import Enterprize
 from .entities import Event
 
 
@@ -17,5 +18,5 @@ class EventAbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def list_events_for_enterprize(self, enterprize_reference: str):
+    def list_events_for_enterprize(self, enterprize: Enterprize):
         raise NotImplementedError
@@ -13,6 +13,7 @@ class Post(DomainEntity):
     def __init__(self, author: 'Profile', content: 'PostContent'):
         super().__init__()
 
+        self.enterprize = author.enterprize
         self.author = author
         self.content = content
         self.tags: Set = set()
@@ -1,4 +1,6 @@
 import abc
+from datetime import datetime
+from typing import Optional
 
 from saas.domain.users import Enterprize
 from .entities import NewsPost, Question, Answer
@@ -6,7 +8,9 @@ from .entities import NewsPost, Question, Answer
 
 class PostAbstractRepository(abc.ABC):
     @abc.abstractmethod
-    def list_for_enterprize(self, enterprize: Enterprize):
+    def list_for_enterprize(
+        self, enterprize: Enterprize, limit: Optional[int] = None, before: Optional[tuple[datetime, str]] = None
+    ):
         raise NotImplementedError
 
     @abc.abstractmethod
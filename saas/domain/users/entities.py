@@ -46,6 +46,7 @@ class Profile(DomainEntity):
 
         self.photo = bytes()
         self.photo_url = None
+        self.photo_version: Optional[str] = None
         self.availability: Optional[UserAvailability] = None
         self.motivation: list[UserMotivation] = list()
         self.skills: list[dict] = list()
@@ -212,6 +213,9 @@ class User(DomainEntity):
         else:
             self._password = None
 
+    def set_hashed_password(self, hashed_password: Optional[str]):
+        self._password = hashed_password
+
     @property
     def is_admin(self):
         return self.type == UserType.admin
@@ -1,7 +1,9 @@
 import abc
-from typing import Any
+from datetime import datetime
+from typing import Iterator, Optional
 
 from .entities import Enterprize, Profile
+from .value_objects import UserAvailability, LegalStatus
 
 
 class ProfileAbstractRepository(abc.ABC):
@@ -10,29 +12,60 @@ class ProfileAbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def upload_photo(self, profile: Profile, photo: Any):
+    def save_profiles(self, profiles: list['Profile']):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def delete_photo(self, profile: Profile):
+    def create_enterprize(self, enterprize: Enterprize):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def create_enterprize(self, enterprize: Enterprize):
+    def retrieve_profile(self, reference: str) -> Profile:
         raise NotImplementedError
 
     @abc.abstractmethod
-    def retrieve_profile(self, reference: str) -> Profile:
+    def retrieve_profile_for_update(self, reference: str) -> Profile:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def retrieve_photo_version(self, reference: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def retrieve_profiles_for_admin(
+        self,
+        admin_username: str,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> list[Profile]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stream_profiles_for_admin(
+        self,
+        admin_username: str,
+        batch_size: int = 1_000,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> Iterator[Profile]:
         raise NotImplementedError
 
     @abc.abstractmethod
-    def retrieve_profiles_for_admin(self, admin_username: str) -> list[Profile]:
+    def retrieve_by_usernames(self, usernames: list[str]) -> list[Profile]:
         raise NotImplementedError
 
     @abc.abstractmethod
     def retrieve_by_username(self, username: str) -> Profile:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def retrieve_by_username_for_authentication(self, username: str) -> Profile:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def retrieve_by_username_allowed_to_register(self, username: str) -> Profile:
         raise NotImplementedError
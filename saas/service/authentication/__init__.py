@@ -10,10 +10,13 @@ from .security import (
 )
 from .changes import initiate_username_change, initiate_password_change, change_user_password, change_username
 from .authenticate import authenticate_credentials
+from .hashing import PasswordHasher, password_hasher
 
 
 __all__ = [
     'authenticate_credentials',
+    'PasswordHasher',
+    'password_hasher',
     'create_access_token',
     'decode_access_token',
     'create_profile_activation_token',
@@ -1,16 +1,22 @@
+from starlette.concurrency import run_in_threadpool
+
 from saas.domain.users import UserCredentials, ProfileAbstractRepository, User
-from saas.domain.services import verify_hashed_password
 from saas.domain.exceptions import (
     UsernameDoesNotExist,
     UserInactive,
     InvalidPasswordHash,
 )
 from saas.service.exceptions import InvalidCredentials
+from .hashing import password_hasher
 
 
-def authenticate_credentials(*, credentials: 'UserCredentials', repository: 'ProfileAbstractRepository') -> 'User':
+async def authenticate_credentials(
+    *, credentials: 'UserCredentials', repository: 'ProfileAbstractRepository'
+) -> 'User':
     try:
-        profile = repository.retrieve_by_username(username=credentials.username)
+        profile = await run_in_threadpool(
+            repository.retrieve_by_username_for_authentication, username=credentials.username
+        )
     except UsernameDoesNotExist:
         raise InvalidCredentials()
 
@@ -18,7 +24,7 @@ def authenticate_credentials(*, credentials: 'UserCredentials', repository: 'Pro
         raise UserInactive(username=profile.user.username)
 
     try:
-        is_password_verified = verify_hashed_password(
+        is_password_verified = await password_hasher.async_verify(
             plain_password=credentials.plain_password, password=profile.user.password
         )
     except InvalidPasswordHash:
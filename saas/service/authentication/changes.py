@@ -1,3 +1,5 @@
+from starlette.concurrency import run_in_threadpool
+
 from saas.domain.exceptions import UsernameExists, UsernameDoesNotExist
 from saas.domain.users import ProfileAbstractRepository, Profile
 from saas.domain.users.events import (
@@ -7,32 +9,52 @@ from saas.domain.users.events import (
     UsernameChanged,
 )
 from saas.service import message_bus
+from saas.service.unit_of_work import AbstractUnitOfWork
+from .hashing import password_hasher
 from .security import create_password_change_token, create_username_change_token
 
 
-def initiate_password_change(profile: 'Profile', repository: 'ProfileAbstractRepository'):
+def initiate_password_change(
+    profile: 'Profile', repository: 'ProfileAbstractRepository', unit_of_work: 'AbstractUnitOfWork'
+):
     password_change_token = create_password_change_token(username=profile.user.username)
     event = UserPasswordChangeInitiated(username=profile.user.username, password_change_token=password_change_token)
     profile.event_logs = []
     profile.event_logs.append(event)
 
-    repository.save_profile(profile=profile)
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     message_bus.handle(profile.event_logs[-1])
 
 
-def change_user_password(profile: 'Profile', new_plain_password: str, repository: 'ProfileAbstractRepository') -> None:
-    profile.user.password = new_plain_password
+async def change_user_password(
+    profile: 'Profile',
+    new_plain_password: str,
+    repository: 'ProfileAbstractRepository',
+    unit_of_work: 'AbstractUnitOfWork',
+) -> None:
+    hashed_password = await password_hasher.async_hash(plain_password=new_plain_password)
+    profile.user.set_hashed_password(hashed_password=hashed_password)
     event = UserPasswordChanged(username=profile.user.username)
     profile.event_logs = []
     profile.event_logs.append(event)
 
-    repository.save_profile(profile=profile)
+    await run_in_threadpool(_save_password_change, profile=profile, repository=repository, unit_of_work=unit_of_work)
+
+
+def _save_password_change(profile, repository, unit_of_work):
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     message_bus.handle(profile.event_logs[-1])
 
 
-def initiate_username_change(profile: 'Profile', new_username: str, repository: 'ProfileAbstractRepository'):
+def initiate_username_change(
+    profile: 'Profile', new_username: str, repository: 'ProfileAbstractRepository', unit_of_work: 'AbstractUnitOfWork'
+):
     try:
         repository.retrieve_by_username(username=new_username)
     except UsernameDoesNotExist:
@@ -41,19 +63,25 @@ def initiate_username_change(profile: 'Profile', new_username: str, repository:
         event = UsernameChangeInitiated(new_username=new_username, username_change_token=username_change_token)
         profile.event_logs = []
         profile.event_logs.append(event)
-        repository.save_profile(profile=profile)
+        with unit_of_work:
+            repository.save_profile(profile=profile)
+            unit_of_work.commit()
 
         message_bus.handle(profile.event_logs[-1])
     else:
         raise UsernameExists(username=new_username)
 
 
-def change_username(profile: 'Profile', new_username: str, repository: 'ProfileAbstractRepository'):
+def change_username(
+    profile: 'Profile', new_username: str, repository: 'ProfileAbstractRepository', unit_of_work: 'AbstractUnitOfWork'
+):
     profile.user.username = new_username
     event = UsernameChanged(new_username=new_username)
     profile.event_logs = []
     profile.event_logs.append(event)
 
-    repository.save_profile(profile=profile)
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     message_bus.handle(profile.event_logs[-1])
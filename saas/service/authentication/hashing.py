@@ -0,0 +1,68 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from saas.core.config import configuration
+from saas.domain.services import create_hashed_password, verify_hashed_password
+from saas.service.exceptions import PasswordHashingBusy
+
+
+class PasswordHasher:
+    def __init__(self, executor: 'Executor', max_pending: int, retry_after_in_seconds: int = 1):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.retry_after_in_seconds = retry_after_in_seconds
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def hash(self, plain_password: str) -> str:
+        return self._submit(create_hashed_password, plain_password=plain_password).result()
+
+    def verify(self, plain_password: str, password: str) -> bool:
+        return self._submit(verify_hashed_password, plain_password=plain_password, password=password).result()
+
+    async def async_hash(self, plain_password: str) -> str:
+        return await asyncio.wrap_future(self._submit(create_hashed_password, plain_password=plain_password))
+
+    async def async_verify(self, plain_password: str, password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(verify_hashed_password, plain_password=plain_password, password=password)
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def _submit(self, function: Callable, **kwargs) -> 'Future':
+        # rejecting instead of queueing keeps a login storm from piling up requests behind argon2
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy(retry_after_in_seconds=self.retry_after_in_seconds)
+
+        try:
+            future = self.executor.submit(function, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+def create_password_hasher() -> 'PasswordHasher':
+    workers = configuration.PASSWORD_HASHING_WORKERS or os.cpu_count()
+
+    if configuration.PASSWORD_HASHING_EXECUTOR == 'process':
+        executor: 'Executor' = ProcessPoolExecutor(max_workers=workers)
+    else:
+        # argon2-cffi releases the GIL while hashing, so threads scale across cores as well
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+
+    return PasswordHasher(
+        executor=executor,
+        max_pending=configuration.PASSWORD_HASHING_MAX_PENDING,
+        retry_after_in_seconds=configuration.PASSWORD_HASHING_RETRY_AFTER_IN_SECONDS,
+    )
+
+
+password_hasher = create_password_hasher()
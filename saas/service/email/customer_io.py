@@ -1,26 +1,186 @@
+import contextlib
 import dataclasses
-from typing import Optional, Dict
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from saas.core.config import configuration
 from saas.domain.base import DomainEvent
 from saas.domain.users import Profile
 from .base import AbstractEmailSender
 
+logger = logging.getLogger(__name__)
 
-class CustomerIOEmailSender(AbstractEmailSender):
-    CUSTOMER_IO_SITE_ID = configuration.CUSTOMER_IO_SITE_ID
-    CUSTOMER_IO_API_KEY = configuration.CUSTOMER_IO_API_KEY
-    AUTHENTICATION_CREDENTIALS = (CUSTOMER_IO_SITE_ID, CUSTOMER_IO_API_KEY)
 
-    CUSTOMER_IO_DOMAIN = 'https://track.customer.io'
-    CREATE_PERSON_URL = f'{CUSTOMER_IO_DOMAIN}/api/v1/customers'
-    CREATE_ANONYMOUS_EVENT_URL = f'{CUSTOMER_IO_DOMAIN}/api/v1/events'
+class CustomerIORetry(Retry):
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        # a 429 is refused before anything happened, any other status may come after a POST was accepted
+        # and repeating it would send the email twice
+        if method.upper() == 'POST':
+            return bool(self.total) and status_code == 429
+
+        return super().is_retry(method=method, status_code=status_code, has_retry_after=has_retry_after)
+
+
+class CustomerIOClient:
+    CREATE_PERSON_PATH = '/api/v1/customers'
+    CREATE_ANONYMOUS_EVENT_PATH = '/api/v1/events'
+    BATCH_PATH = '/api/v2/batch'
+
+    def __init__(
+        self,
+        site_id: str,
+        api_key: str,
+        domain: str = 'https://track.customer.io',
+        timeout_in_seconds: float = 3,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_size: int = 10,
+        person_cache_size: int = 10_000,
+        batch_size: int = 100,
+    ):
+        self.domain = domain
+        self.timeout_in_seconds = timeout_in_seconds
+        self.person_cache_size = person_cache_size
+        self.batch_size = batch_size
+
+        # one keep-alive session for the whole process, handlers on different threads share its connection pool
+        self.session = requests.Session()
+        self.session.auth = (site_id, api_key)
+        # connect errors are retried for every method, read errors and 5xx only for idempotent ones
+        retry = CustomerIORetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        self.session.mount(domain, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+
+        self._person_fingerprints: OrderedDict[str, str] = OrderedDict()
+        self._person_fingerprints_lock = threading.Lock()
+        self._batches = threading.local()
+
+    def identify_person(self, reference: str, attributes: Dict):
+        fingerprint = hashlib.sha1(json.dumps(attributes, sort_keys=True, default=str).encode()).hexdigest()
+
+        with self._person_fingerprints_lock:
+            if self._person_fingerprints.get(reference) == fingerprint:
+                self._person_fingerprints.move_to_end(reference)
+                return
+
+        operation = {
+            'type': 'person',
+            'identifiers': {'id': reference},
+            'action': 'identify',
+            'attributes': attributes,
+        }
+        if not self._add_to_batch(operation=operation):
+            self._request(method='PUT', path=f'{self.CREATE_PERSON_PATH}/{reference}', payload=attributes)
+
+        self._remember_person(reference=reference, fingerprint=fingerprint)
+
+    def track_person_event(self, reference: str, name: str, data: Dict):
+        operation = {
+            'type': 'person',
+            'identifiers': {'id': reference},
+            'action': 'event',
+            'name': name,
+            'attributes': data,
+        }
+        if not self._add_to_batch(operation=operation):
+            self._request(
+                method='POST',
+                path=f'{self.CREATE_PERSON_PATH}/{reference}/events',
+                payload={'name': name, 'data': data},
+            )
+
+    def track_anonymous_event(self, name: str, data: Dict):
+        # the batch api has no equivalent for anonymous events with a recipient, so these are always sent directly
+        self._request(method='POST', path=self.CREATE_ANONYMOUS_EVENT_PATH, payload={'name': name, 'data': data})
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        if getattr(self._batches, 'operations', None) is not None:
+            yield
+            return
+
+        self._batches.operations = list()
+        try:
+            yield
+        finally:
+            operations, self._batches.operations = self._batches.operations, None
+            error = self._flush(operations=operations)
+
+        # every chunk was attempted, the caller learns that some did not arrive and retries its events
+        if error is not None:
+            raise error
+
+    def forget_person(self, reference: str):
+        with self._person_fingerprints_lock:
+            self._person_fingerprints.pop(reference, None)
+
+    def close(self):
+        self.session.close()
+
+    def _flush(self, operations: list[Dict]) -> Optional[Exception]:
+        error = None
 
-    def __init__(self, event: 'DomainEvent', profile: Optional['Profile'] = None):
+        for start in range(0, len(operations), self.batch_size):
+            chunk = operations[start : start + self.batch_size]
+            try:
+                self._request(method='POST', path=self.BATCH_PATH, payload={'batch': chunk})
+            except requests.RequestException as exc:
+                logger.exception('Customer.io batch of %s operations failed', len(chunk))
+                error = error or exc
+
+                for operation in chunk:
+                    if operation['action'] == 'identify':
+                        self.forget_person(reference=operation['identifiers']['id'])
+
+        return error
+
+    def _add_to_batch(self, operation: Dict) -> bool:
+        operations = getattr(self._batches, 'operations', None)
+        if operations is None:
+            return False
+
+        operations.append(operation)
+        return True
+
+    def _remember_person(self, reference: str, fingerprint: str):
+        with self._person_fingerprints_lock:
+            self._person_fingerprints[reference] = fingerprint
+            self._person_fingerprints.move_to_end(reference)
+
+            while len(self._person_fingerprints) > self.person_cache_size:
+                self._person_fingerprints.popitem(last=False)
+
+    def _request(self, method: str, path: str, payload: Dict):
+        response = self.session.request(
+            method=method, url=f'{self.domain}{path}', json=payload, timeout=self.timeout_in_seconds
+        )
+        response.raise_for_status()
+
+
+customer_io_client = CustomerIOClient(
+    site_id=configuration.CUSTOMER_IO_SITE_ID, api_key=configuration.CUSTOMER_IO_API_KEY
+)
+
+
+class CustomerIOEmailSender(AbstractEmailSender):
+    def __init__(
+        self, event: 'DomainEvent', profile: Optional['Profile'] = None, client: Optional['CustomerIOClient'] = None
+    ):
         self.event = event
         self.profile = profile
+        self.client = client or customer_io_client
         self.recipient = None
         self.person_payload: Dict = {}
         self.event_payload: Dict = {
@@ -39,37 +199,19 @@ class CustomerIOEmailSender(AbstractEmailSender):
                 'enterprize_subdomain': self.profile.enterprize.subdomain,
                 'created_at': self.profile.created.timestamp(),
             }
-            self._send_person_request()
-
-    def _send_person_request(self):
-        requests.put(
-            url=f'{self.CREATE_PERSON_URL}/{self.profile.reference}',
-            json=self.person_payload,
-            auth=self.AUTHENTICATION_CREDENTIALS,
-            timeout=3,
-        )
+            self.client.identify_person(reference=self.profile.reference, attributes=self.person_payload)
 
     def create_email_subject(self, subject: Optional[str] = None):
         pass
 
     def create_email_message(self, message: Optional[str] = None):
-        if getattr(self.profile, 'user', None) is not None:
-            self._create_person_email_message()
-        else:
-            self._create_anonymous_email_message()
-
-    def _create_person_email_message(self):
-        self.CREATE_EVENT_URL = f'{self.CREATE_PERSON_URL}/{self.profile.reference}/events'
-        self.event_payload.update({'id': self.profile.reference})
-
-    def _create_anonymous_email_message(self):
-        self.CREATE_EVENT_URL = self.CREATE_ANONYMOUS_EVENT_URL
-        self.event_payload['data'].update({'recipient': self.recipient})
+        if getattr(self.profile, 'user', None) is None:
+            self.event_payload['data'].update({'recipient': self.recipient})
 
     def send_email(self):
-        requests.post(
-            url=self.CREATE_EVENT_URL,
-            json=self.event_payload,
-            auth=self.AUTHENTICATION_CREDENTIALS,
-            timeout=3,
-        )
+        if getattr(self.profile, 'user', None) is not None:
+            self.client.track_person_event(
+                reference=self.profile.reference, name=self.event_payload['name'], data=self.event_payload['data']
+            )
+        else:
+            self.client.track_anonymous_event(name=self.event_payload['name'], data=self.event_payload['data'])
@@ -1,9 +1,14 @@
 from saas.domain.users import ProfileAbstractRepository, Enterprize
+from saas.service.unit_of_work import AbstractUnitOfWork
 
 
-def create_enterprize(name: str, subdomain: str, repository: 'ProfileAbstractRepository') -> 'Enterprize':
+def create_enterprize(
+    name: str, subdomain: str, repository: 'ProfileAbstractRepository', unit_of_work: 'AbstractUnitOfWork'
+) -> 'Enterprize':
     enterprize = Enterprize(name=name, subdomain=subdomain)
 
-    repository.create_enterprize(enterprize=enterprize)
+    with unit_of_work:
+        repository.create_enterprize(enterprize=enterprize)
+        unit_of_work.commit()
 
     return enterprize
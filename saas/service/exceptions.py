@@ -25,3 +25,50 @@ class InvalidPassword(Exception):
     def __init__(self, old_password: str):
         self.message = f'Old password \'{old_password}\' is invalid.'
         super().__init__(self.message)
+
+
+class InvalidCursor(Exception):
+    def __init__(self, cursor: str):
+        self.message = f'Invalid pagination cursor \'{cursor}\'.'
+        super().__init__(self.message)
+
+
+class ServiceBusy(Exception):
+    def __init__(self, message: str, retry_after_in_seconds: int):
+        self.retry_after_in_seconds = retry_after_in_seconds
+        self.message = message
+        super().__init__(self.message)
+
+
+class PasswordHashingBusy(ServiceBusy):
+    def __init__(self, retry_after_in_seconds: int):
+        super().__init__(
+            message='Too many password checks in progress, try again later.',
+            retry_after_in_seconds=retry_after_in_seconds,
+        )
+
+
+class InvalidPhoto(Exception):
+    def __init__(self, reason: str):
+        self.message = f'Invalid photo: {reason}.'
+        super().__init__(self.message)
+
+
+class PhotoTooLarge(Exception):
+    def __init__(self, size_in_bytes: int, max_size_in_bytes: int):
+        self.message = f'Photo of {size_in_bytes} bytes exceeds the limit of {max_size_in_bytes} bytes.'
+        super().__init__(self.message)
+
+
+class BlobDoesNotExist(Exception):
+    def __init__(self, name: str):
+        self.message = f'Blob \'{name}\' does not exist.'
+        super().__init__(self.message)
+
+
+class PhotoPipelineBusy(ServiceBusy):
+    def __init__(self, retry_after_in_seconds: int):
+        super().__init__(
+            message='Too many photos are being processed, try again later.',
+            retry_after_in_seconds=retry_after_in_seconds,
+        )
@@ -1,6 +1,35 @@
 from saas.domain.base import DomainEvent
-from .handlers import HANDLERS
 from saas.core.config import configuration
+from .dispatcher import AbstractDispatcher, InlineDispatcher, OutboxDispatcher, ThreadPoolDispatcher, run_handlers
+from .outbox import OutboxRelay
+from saas.service.email.customer_io import customer_io_client
+
+
+def create_dispatcher() -> 'AbstractDispatcher':
+    if configuration.MESSAGE_BUS_DISPATCHER == 'inline':
+        return InlineDispatcher()
+
+    if configuration.MESSAGE_BUS_DISPATCHER == 'outbox':
+        return OutboxDispatcher(relay=create_outbox_relay())
+
+    return ThreadPoolDispatcher(
+        workers=configuration.MESSAGE_BUS_WORKERS, max_queue_size=configuration.MESSAGE_BUS_QUEUE_MAX_SIZE
+    )
+
+
+def create_outbox_relay() -> 'OutboxRelay':
+    return OutboxRelay(
+        deliver=run_handlers,
+        batch_size=configuration.OUTBOX_BATCH_SIZE,
+        poll_interval_in_seconds=configuration.OUTBOX_POLL_INTERVAL_IN_SECONDS,
+        batch=customer_io_client.batch,
+        claim_timeout_in_seconds=configuration.OUTBOX_CLAIM_TIMEOUT_IN_SECONDS,
+        retry_delay_in_seconds=configuration.OUTBOX_RETRY_DELAY_IN_SECONDS,
+        max_retry_delay_in_seconds=configuration.OUTBOX_MAX_RETRY_DELAY_IN_SECONDS,
+    )
+
+
+dispatcher = create_dispatcher()
 
 
 def handle(event: DomainEvent):
@@ -10,5 +39,13 @@ def handle(event: DomainEvent):
         print(f'{Fore.GREEN}{vars(event)}{Style.RESET_ALL}')
         return
 
-    for handler in HANDLERS[type(event)]:
-        handler(event=event)  # type: ignore
+    dispatcher.dispatch(event=event)
+
+
+def start():
+    if not configuration.DEBUG:
+        dispatcher.start()
+
+
+def shutdown():
+    dispatcher.stop(timeout=configuration.MESSAGE_BUS_SHUTDOWN_TIMEOUT_IN_SECONDS)
@@ -0,0 +1,123 @@
+import abc
+import atexit
+import logging
+import queue
+import threading
+from typing import Optional
+
+from saas.domain.base import DomainEvent
+from .handlers import HANDLERS
+from .outbox import OutboxRelay
+
+logger = logging.getLogger(__name__)
+
+
+def run_handlers(event: 'DomainEvent'):
+    # every handler gets its chance, the first failure is raised afterwards so the outbox retries the event
+    error: Optional[Exception] = None
+    for handler in HANDLERS[type(event)]:
+        try:
+            handler(event=event)  # type: ignore
+        except Exception as exc:
+            logger.exception('Handler %s failed for event %s', handler.__name__, event.reference)
+            error = error or exc
+
+    if error is not None:
+        raise error
+
+
+def run_handlers_once(event: 'DomainEvent'):
+    # without an outbox there is nothing to retry from, failures were logged by run_handlers
+    try:
+        run_handlers(event=event)
+    except Exception:
+        pass
+
+
+class AbstractDispatcher(abc.ABC):
+    @abc.abstractmethod
+    def dispatch(self, event: 'DomainEvent'):
+        raise NotImplementedError
+
+    def start(self):
+        pass
+
+    def stop(self, timeout: Optional[float] = None):
+        pass
+
+
+class InlineDispatcher(AbstractDispatcher):
+    def dispatch(self, event: 'DomainEvent'):
+        run_handlers_once(event=event)
+
+
+class OutboxDispatcher(AbstractDispatcher):
+    def __init__(self, relay: 'OutboxRelay'):
+        self.relay = relay
+
+    def dispatch(self, event: 'DomainEvent'):
+        # the event is already in system_event_logs, committed together with the change that raised it,
+        # the relay delivers it from there
+        pass
+
+    def start(self):
+        self.relay.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self.relay.stop(timeout=timeout)
+
+
+class ThreadPoolDispatcher(AbstractDispatcher):
+    _stop_signal = object()
+
+    def __init__(self, workers: int, max_queue_size: int = 0):
+        self.workers = workers
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+
+        self._threads: list[threading.Thread] = list()
+        self._lock = threading.Lock()
+
+        # registered once, stopping a dispatcher without workers does nothing
+        atexit.register(self.stop)
+
+    def dispatch(self, event: 'DomainEvent'):
+        self._start()
+        # a full queue blocks the caller, which is the backpressure we want when handlers fall behind
+        self.queue.put(event)
+
+    def join(self):
+        self.queue.join()
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._lock:
+            threads, self._threads = self._threads, list()
+
+            for _ in threads:
+                self.queue.put(self._stop_signal)
+
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def _start(self):
+        if self._threads:
+            return
+
+        with self._lock:
+            if self._threads:
+                return
+
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'message-bus-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is self._stop_signal:
+                    return
+
+                run_handlers_once(event=event)
+            finally:
+                self.queue.task_done()
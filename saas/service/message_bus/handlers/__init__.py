@@ -13,12 +13,13 @@ from .email_handlers import (
     send_initiate_password_change_email,
     send_initiate_username_change_email,
 )
+from .statistics_handlers import count_user_event
 
 
 HANDLERS: dict = {
-    UserRegistered: {send_activation_code_email},
+    UserRegistered: {send_activation_code_email, count_user_event},
     UserActivated: {},
-    UserInvited: {send_invitation_email},
+    UserInvited: {send_invitation_email, count_user_event},
     UserPasswordChangeInitiated: {send_initiate_password_change_email},
     UserPasswordChanged: {},
     UsernameChangeInitiated: {send_initiate_username_change_email},
@@ -6,8 +6,11 @@ from saas.service.email.customer_io import CustomerIOEmailSender
 def send_activation_code_email(event: 'UserRegistered'):
     from saas.database.models import ProfileRepository
 
-    repository = ProfileRepository(session=DatabaseSession())
-    profile = repository.retrieve_by_username(username=event.username)
+    session = DatabaseSession()
+    try:
+        profile = ProfileRepository(session=session).retrieve_by_username(username=event.username)
+    finally:
+        session.close()
 
     email_sender = CustomerIOEmailSender(event=event, profile=profile)
     email_sender.create_receiver()
@@ -18,8 +21,11 @@ def send_activation_code_email(event: 'UserRegistered'):
 def send_invitation_email(event: 'UserInvited'):
     from saas.database.models import ProfileRepository
 
-    repository = ProfileRepository(session=DatabaseSession())
-    profile = repository.retrieve_by_username(username=event.invited_email_address)
+    session = DatabaseSession()
+    try:
+        profile = ProfileRepository(session=session).retrieve_by_username(username=event.invited_email_address)
+    finally:
+        session.close()
 
     email_sender = CustomerIOEmailSender(event=event, profile=profile)
     email_sender.create_receiver(email_address=event.invited_email_address)
@@ -30,8 +36,11 @@ def send_invitation_email(event: 'UserInvited'):
 def send_initiate_password_change_email(event: 'UserPasswordChangeInitiated'):
     from saas.database.models import ProfileRepository
 
-    repository = ProfileRepository(session=DatabaseSession())
-    profile = repository.retrieve_by_username(username=event.username)
+    session = DatabaseSession()
+    try:
+        profile = ProfileRepository(session=session).retrieve_by_username(username=event.username)
+    finally:
+        session.close()
 
     email_sender = CustomerIOEmailSender(event=event, profile=profile)
     email_sender.create_receiver()
@@ -0,0 +1,31 @@
+from typing import Union
+
+from saas.database.session import DatabaseSession
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+from saas.domain.users.events import UserRegistered, UserInvited, UserEvents
+
+COUNTERS = {
+    UserEvents.UserRegistered.name: 'total_registrations',
+    UserEvents.UserInvited.name: 'total_invitations',
+}
+
+
+def count_user_event(event: Union['UserRegistered', 'UserInvited']):
+    from saas.database.models import ProfileRepository
+
+    username = event.invited_email_address if isinstance(event, UserInvited) else event.username
+
+    session = DatabaseSession()
+    try:
+        repository = ProfileRepository(session=session)
+        profile = repository.retrieve_by_username(username=username)
+
+        # the stream is counted once per event name, in the same transaction as the increment
+        with SqlAlchemyUnitOfWork(session=session) as unit_of_work:
+            if repository.record_statistics_event(stream_reference=profile.reference, event_name=event.name):
+                repository.increment_dashboard_statistics(
+                    enterprize_id=profile.enterprize_id, **{COUNTERS[event.name]: 1}
+                )
+            unit_of_work.commit()
+    finally:
+        session.close()
@@ -0,0 +1,152 @@
+import contextlib
+import dataclasses
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, ContextManager, Optional
+
+from saas.database.session import DatabaseSession
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+from saas.domain.base import DomainEvent
+from .handlers import HANDLERS
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES: dict = {event_type.__name__: event_type for event_type in HANDLERS}
+
+
+def deserialize_event(payload: dict) -> Optional['DomainEvent']:
+    event_type = EVENT_TYPES.get(payload.get('name'))
+    if event_type is None:
+        return None
+
+    fields = {field.name: payload[field.name] for field in dataclasses.fields(event_type) if field.init}
+    event = event_type(**fields)
+    object.__setattr__(event, 'reference', payload['reference'])
+
+    return event
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        deliver: Callable[['DomainEvent'], None],
+        batch_size: int,
+        poll_interval_in_seconds: float,
+        session_factory: Callable = DatabaseSession,
+        batch: Callable[[], ContextManager] = contextlib.nullcontext,
+        claim_timeout_in_seconds: float = 300,
+        retry_delay_in_seconds: float = 30,
+        max_retry_delay_in_seconds: float = 3_600,
+    ):
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.poll_interval_in_seconds = poll_interval_in_seconds
+        self.session_factory = session_factory
+        self.batch = batch
+        self.claim_timeout_in_seconds = claim_timeout_in_seconds
+        self.retry_delay_in_seconds = retry_delay_in_seconds
+        self.max_retry_delay_in_seconds = max_retry_delay_in_seconds
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def relay_once(self) -> int:
+        # rows are claimed and committed first, so no lock or connection is held while handlers call out,
+        # a relay that dies mid batch leaves its claims to expire and the rows are delivered again (at-least-once)
+        claimed_events = self._claim()
+
+        delivered: list[int] = []
+        failed: dict[int, Exception] = {}
+        try:
+            with self.batch():
+                for system_event_id, payload in claimed_events:
+                    event = deserialize_event(payload=payload)
+                    try:
+                        if event is not None:
+                            self.deliver(event=event)
+                    except Exception as exc:
+                        failed[system_event_id] = exc
+                    else:
+                        delivered.append(system_event_id)
+        except Exception as exc:
+            # batched operations are only sent when the batch closes, if that fails none of them arrived
+            logger.exception('Outbox batch of %s events failed', len(delivered))
+            failed.update(dict.fromkeys(delivered, exc))
+            delivered = []
+
+        self._complete(delivered=delivered, failed=failed)
+
+        return len(claimed_events)
+
+    def _claim(self) -> list[tuple[int, dict]]:
+        from saas.database.models import SystemEventRepository
+
+        until = datetime.now(tz=timezone.utc) + timedelta(seconds=self.claim_timeout_in_seconds)
+
+        session = self.session_factory()
+        try:
+            with SqlAlchemyUnitOfWork(session=session) as unit_of_work:
+                system_events = SystemEventRepository(session=session).claim_undispatched_system_events(
+                    limit=self.batch_size, until=until
+                )
+                claimed_events = [(system_event.id, system_event.payload) for system_event in system_events]
+                unit_of_work.commit()
+        finally:
+            session.close()
+
+        return claimed_events
+
+    def _complete(self, delivered: list[int], failed: dict[int, Exception]):
+        from saas.database.models import SystemEventRepository
+
+        if not delivered and not failed:
+            return
+
+        now = datetime.now(tz=timezone.utc)
+
+        session = self.session_factory()
+        try:
+            repository = SystemEventRepository(session=session)
+
+            with SqlAlchemyUnitOfWork(session=session) as unit_of_work:
+                if delivered:
+                    repository.mark_system_events_dispatched(system_event_ids=delivered)
+
+                for system_event_id, error in failed.items():
+                    system_event = repository.retrieve_system_event(system_event_id=system_event_id)
+                    delay = min(
+                        self.retry_delay_in_seconds * 2**system_event.attempts, self.max_retry_delay_in_seconds
+                    )
+                    system_event.record_failure(error=repr(error), retry_at=now + timedelta(seconds=delay))
+                    repository.save_system_event(system_event=system_event)
+
+                unit_of_work.commit()
+        finally:
+            session.close()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                relayed = self.relay_once()
+            except Exception:
+                logger.exception('Outbox relay failed')
+                relayed = 0
+
+            if relayed < self.batch_size:
+                self._stopped.wait(timeout=self.poll_interval_in_seconds)
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name='outbox-relay', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
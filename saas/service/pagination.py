@@ -0,0 +1,19 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from saas.service.exceptions import InvalidCursor
+
+
+def encode_cursor(*, created: datetime, reference: str) -> str:
+    position = json.dumps([created.isoformat(), reference]).encode()
+    return base64.urlsafe_b64encode(position).decode()
+
+
+def decode_cursor(*, cursor: str) -> tuple[datetime, str]:
+    try:
+        created, reference = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created), reference
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor=cursor)
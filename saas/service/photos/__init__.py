@@ -0,0 +1,83 @@
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from saas.core.config import configuration
+from saas.service.storage import blob_store
+from .pipeline import PhotoPipeline
+from .cache import PhotoCache
+from .processing import (
+    PHOTO_VARIANTS,
+    PROFILE_PHOTO_VARIANT,
+    PhotoVariant,
+    create_photo_variants,
+    create_photo_version,
+    photo_blob_name,
+    photo_cache_key,
+    photo_path,
+)
+from .validation import PhotoHeader, read_photo_header, validate_photo
+
+
+def process_spooled_photo(reference: str, path: Path, replaces_version: Optional[str]):
+    from saas.database.models import ProfileRepository
+    from saas.database.session import DatabaseSession
+    from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+    from saas.service.profile import upload_user_photo
+
+    session = DatabaseSession()
+    try:
+        with path.open('rb') as photo:
+            upload_user_photo(
+                reference=reference,
+                photo=photo,
+                replaces_version=replaces_version,
+                blob_store=blob_store,
+                photo_cache=photo_cache,
+                repository=ProfileRepository(session=session),
+                unit_of_work=SqlAlchemyUnitOfWork(session=session),
+            )
+    finally:
+        session.close()
+
+
+def create_photo_pipeline() -> 'PhotoPipeline':
+    return PhotoPipeline(
+        spool_path=configuration.PHOTO_PIPELINE_SPOOL_PATH or str(Path(tempfile.gettempdir()) / 'saas-photo-spool'),
+        process=process_spooled_photo,
+        workers=configuration.PHOTO_PIPELINE_WORKERS,
+        max_pending=configuration.PHOTO_PIPELINE_MAX_PENDING,
+        retry_after_in_seconds=configuration.PHOTO_PIPELINE_RETRY_AFTER_IN_SECONDS,
+        max_attempts=configuration.PHOTO_PIPELINE_MAX_ATTEMPTS,
+        retry_delay_in_seconds=configuration.PHOTO_PIPELINE_RETRY_DELAY_IN_SECONDS,
+    )
+
+
+photo_pipeline = create_photo_pipeline()
+
+photo_cache = PhotoCache(
+    path=configuration.PHOTO_CACHE_PATH or str(Path(tempfile.gettempdir()) / 'saas-photo-cache'),
+    max_size_in_bytes=configuration.PHOTO_CACHE_MAX_SIZE_IN_BYTES,
+    slots=configuration.PHOTO_CACHE_SLOTS,
+)
+
+
+__all__ = [
+    'PHOTO_VARIANTS',
+    'PROFILE_PHOTO_VARIANT',
+    'PhotoCache',
+    'PhotoHeader',
+    'PhotoPipeline',
+    'PhotoVariant',
+    'create_photo_pipeline',
+    'create_photo_variants',
+    'create_photo_version',
+    'photo_blob_name',
+    'photo_cache',
+    'photo_cache_key',
+    'photo_path',
+    'photo_pipeline',
+    'process_spooled_photo',
+    'read_photo_header',
+    'validate_photo',
+]
@@ -0,0 +1,162 @@
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = '.partial'
+SLOT_LOCK_SUFFIX = '.lock'
+
+
+class PhotoCache:
+    def __init__(self, path: str, max_size_in_bytes: int, slots: int = 1, fill_lock_stripes: int = 64):
+        self.root_path = Path(path)
+        # every worker process owns one slot directory and its share of the budget,
+        # together they never use more than max_size_in_bytes
+        self.max_size_in_bytes = max_size_in_bytes // slots
+        self.path: Optional[Path] = None
+
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size_in_bytes = 0
+        self._lock = threading.Lock()
+        self._fill_locks = [threading.Lock() for _ in range(fill_lock_stripes)]
+        self._slot_lock: Optional[BinaryIO] = None
+
+        self._claim_slot(slots=slots)
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self._size_in_bytes
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        with self._lock:
+            if self.path is None or key not in self._entries:
+                return None
+
+            self._entries.move_to_end(key)
+
+            # the file is opened under the lock, an eviction right after unlinks it but the handle stays readable
+            try:
+                return (self.path / key).open('rb')
+            except FileNotFoundError:
+                self._remove(key=key)
+                return None
+
+    def fill(self, key: str, write: Callable[[BinaryIO], None]) -> BinaryIO:
+        # concurrent misses for the same photo fetch it from upstream only once
+        with self._fill_locks[hash(key) % len(self._fill_locks)]:
+            cached = self.open(key=key)
+            if cached is not None:
+                return cached
+            if self.path is None:
+                return self._pass_through(write=write)
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            partial = self.path / f'.{key}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}'
+            try:
+                with partial.open('wb') as file_obj:
+                    write(file_obj)
+                size = partial.stat().st_size
+
+                with self._lock:
+                    os.replace(partial, self.path / key)
+                    self._add(key=key, size=size)
+                    self._evict(keep=key)
+
+                    return (self.path / key).open('rb')
+            finally:
+                partial.unlink(missing_ok=True)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._remove(key=key)
+
+        # the other processes find the file gone on their next open and drop their entry
+        for slot_path in self.root_path.glob(f'*{SLOT_LOCK_SUFFIX}'):
+            (self.root_path / slot_path.stem / key).unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key=key)
+
+    def close(self):
+        # hands the slot over to the next worker process
+        if self._slot_lock is not None:
+            self._slot_lock.close()
+            self._slot_lock = None
+
+    def _claim_slot(self, slots: int):
+        self.root_path.mkdir(parents=True, exist_ok=True)
+
+        # the lock is released by the kernel when its process dies, a restarted worker takes over a free slot
+        for slot in range(slots):
+            slot_lock = (self.root_path / f'{slot}{SLOT_LOCK_SUFFIX}').open('ab')
+            try:
+                fcntl.flock(slot_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                slot_lock.close()
+                continue
+
+            self._slot_lock = slot_lock
+            self.path = self.root_path / str(slot)
+            return
+
+        logger.warning('All %s photo cache slots in %s are taken, photos are not cached.', slots, self.root_path)
+
+    def _pass_through(self, write: Callable[[BinaryIO], None]) -> BinaryIO:
+        file_obj = tempfile.TemporaryFile(dir=self.root_path)
+        try:
+            write(file_obj)
+            file_obj.seek(0)
+        except BaseException:
+            file_obj.close()
+            raise
+
+        return file_obj
+
+    def _load(self):
+        # the cache survives restarts, files are taken over from least to most recently used
+        if self.path is None or not self.path.is_dir():
+            return
+
+        files = []
+        for path in self.path.iterdir():
+            if path.name.startswith('.'):
+                # the slot is owned by this process alone, partial files were left by one that died mid fill
+                path.unlink(missing_ok=True)
+            elif path.is_file():
+                stat = path.stat()
+                files.append((stat.st_atime, path.name, stat.st_size))
+
+        with self._lock:
+            for _, key, size in sorted(files):
+                self._add(key=key, size=size)
+            self._evict()
+
+    def _add(self, key: str, size: int):
+        self._size_in_bytes += size - self._entries.get(key, 0)
+        self._entries[key] = size
+        self._entries.move_to_end(key)
+
+    def _evict(self, keep: Optional[str] = None):
+        while self._size_in_bytes > self.max_size_in_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._remove(key=key)
+
+    def _remove(self, key: str):
+        self._size_in_bytes -= self._entries.pop(key, 0)
+        if self.path is not None:
+            (self.path / key).unlink(missing_ok=True)
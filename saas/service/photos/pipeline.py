@@ -0,0 +1,192 @@
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from saas.service.exceptions import InvalidPhoto, PhotoPipelineBusy
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.photo'
+SPOOL_CHUNK_SIZE = 64 * 1024
+FAILED_DIRECTORY = 'failed'
+# stands in for the version a photo replaces when the profile had none
+NO_PHOTO_VERSION = 'none'
+
+
+def read_spool_stamp(path: Path) -> tuple[str, Optional[str]]:
+    reference, stamp, _ = path.name.split('.', 2)
+    return reference, None if stamp == NO_PHOTO_VERSION else stamp
+
+
+class PhotoPipeline:
+    def __init__(
+        self,
+        spool_path: str,
+        process: Callable[[str, Path, Optional[str]], None],
+        workers: int,
+        max_pending: int,
+        retry_after_in_seconds: int = 5,
+        max_attempts: int = 3,
+        retry_delay_in_seconds: float = 30,
+    ):
+        self.spool_path = Path(spool_path)
+        self.process = process
+        self.max_pending = max_pending
+        self.retry_after_in_seconds = retry_after_in_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_in_seconds = retry_delay_in_seconds
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='photo-pipeline')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stopped = False
+
+    def accept(self, reference: str, file_obj: BinaryIO, replaces_version: Optional[str]) -> 'Future':
+        # the slot is taken before spooling, a saturated pipeline rejects the upload without touching the disk
+        if not self._slots.acquire(blocking=False):
+            raise PhotoPipelineBusy(retry_after_in_seconds=self.retry_after_in_seconds)
+
+        try:
+            path, spool_file = self._spool(reference=reference, replaces_version=replaces_version, file_obj=file_obj)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        return self._submit(path=path, spool_file=spool_file, attempt=1)
+
+    def recover(self) -> int:
+        # photos spooled before a restart are still on disk and processed again
+        recovered = 0
+
+        for path in sorted(self.spool_path.glob(f'*{SPOOL_SUFFIX}')):
+            if not self._slots.acquire(blocking=False):
+                break
+
+            spool_file = self._claim(path=path)
+            if spool_file is None:
+                self._slots.release()
+                continue
+
+            self._submit(path=path, spool_file=spool_file, attempt=1)
+            recovered += 1
+
+        return recovered
+
+    def shutdown(self, wait: bool = True):
+        # photos waiting for a retry stay in the spool for the next recover
+        self._stopped = True
+        self.executor.shutdown(wait=wait)
+
+    def _spool(self, reference: str, replaces_version: Optional[str], file_obj: BinaryIO) -> tuple[Path, BinaryIO]:
+        self.spool_path.mkdir(parents=True, exist_ok=True)
+
+        # the name carries the version the photo replaces, it survives restarts along with the photo
+        stamp = replaces_version or NO_PHOTO_VERSION
+        path = self.spool_path / f'{reference}.{stamp}.{uuid.uuid4().hex}{SPOOL_SUFFIX}'
+        partial = path.with_suffix('.partial')
+
+        # locked before it is visible, another process recovering the spool cannot claim it as well
+        spool_file = partial.open('wb')
+        try:
+            fcntl.flock(spool_file.fileno(), fcntl.LOCK_EX)
+            shutil.copyfileobj(file_obj, spool_file, SPOOL_CHUNK_SIZE)
+            spool_file.flush()
+            # renamed once complete, recover never picks up a half written upload
+            partial.rename(path)
+        except BaseException:
+            spool_file.close()
+            partial.unlink(missing_ok=True)
+            raise
+
+        return path, spool_file
+
+    @staticmethod
+    def _claim(path: Path) -> Optional[BinaryIO]:
+        # every process recovers the same spool, the lock decides which one processes a photo
+        # and is released by the kernel when its holder dies
+        try:
+            spool_file = path.open('rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            fcntl.flock(spool_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            spool_file.close()
+            return None
+
+        # processed and removed by the previous holder between the glob and the lock
+        if os.fstat(spool_file.fileno()).st_nlink == 0:
+            spool_file.close()
+            return None
+
+        return spool_file
+
+    def _submit(self, path: Path, spool_file: BinaryIO, attempt: int) -> 'Future':
+        try:
+            future = self.executor.submit(self._run, path=path, spool_file=spool_file, attempt=attempt)
+        except BaseException:
+            spool_file.close()
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, path: Path, spool_file: BinaryIO, attempt: int):
+        reference, replaces_version = read_spool_stamp(path=path)
+
+        try:
+            self.process(reference=reference, path=path, replaces_version=replaces_version)
+        except InvalidPhoto as exception:
+            # a photo that cannot be decoded never will be, it is dropped
+            logger.warning('Discarding photo %s for profile %s: %s', path.name, reference, exception.message)
+        except Exception:
+            if attempt < self.max_attempts:
+                logger.exception('Processing photo %s for profile %s failed, retrying', path.name, reference)
+                spool_file.close()
+                self._retry_later(path=path, attempt=attempt + 1)
+                return
+
+            logger.exception('Processing photo %s for profile %s failed, giving up', path.name, reference)
+            self._fail(path=path)
+            spool_file.close()
+            return
+
+        # removed while still locked, a concurrent recover sees it gone once it gets the lock
+        path.unlink(missing_ok=True)
+        spool_file.close()
+
+    def _retry_later(self, path: Path, attempt: int):
+        timer = threading.Timer(self.retry_delay_in_seconds, self._retry, kwargs=dict(path=path, attempt=attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self, path: Path, attempt: int):
+        if self._stopped:
+            return
+        if not self._slots.acquire(blocking=False):
+            self._retry_later(path=path, attempt=attempt)
+            return
+
+        spool_file = self._claim(path=path)
+        if spool_file is None:
+            self._slots.release()
+            return
+
+        try:
+            self._submit(path=path, spool_file=spool_file, attempt=attempt)
+        except RuntimeError:
+            # shut down in the meantime, the photo stays in the spool
+            pass
+
+    def _fail(self, path: Path):
+        # kept out of the spool for inspection, recover only looks at its top level
+        failed_path = self.spool_path / FAILED_DIRECTORY
+        failed_path.mkdir(parents=True, exist_ok=True)
+        path.rename(failed_path / path.name)
@@ -0,0 +1,82 @@
+import dataclasses
+import hashlib
+import io
+from typing import BinaryIO, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from saas.core.config import configuration
+from saas.service.exceptions import InvalidPhoto
+
+ALLOWED_PHOTO_FORMATS = frozenset({'JPEG', 'PNG', 'GIF', 'WEBP'})
+
+PHOTO_VARIANTS = {
+    'thumbnail': (128, 128),
+    'medium': (512, 512),
+}
+
+# variant linked from profile.photo_url
+PROFILE_PHOTO_VARIANT = 'medium'
+
+
+@dataclasses.dataclass(frozen=True)
+class PhotoVariant:
+    name: str
+    content_type: str
+    data: bytes
+
+
+def photo_blob_name(reference: str, version: str, variant: str) -> str:
+    return f'{reference}/{version}/{variant}'
+
+
+def photo_cache_key(reference: str, version: str, variant: str) -> str:
+    return f'{reference}.{version}.{variant}'
+
+
+def photo_path(reference: str, version: str, variant: str) -> str:
+    return f'{configuration.PHOTO_URL_PREFIX}/{reference}/{version}/{variant}'
+
+
+def create_photo_version(variants: list['PhotoVariant']) -> str:
+    digest = hashlib.sha1()
+    for variant in variants:
+        digest.update(variant.data)
+
+    return digest.hexdigest()[:16]
+
+
+def create_photo_variants(photo: BinaryIO, max_pixels: Optional[int] = None) -> list['PhotoVariant']:
+    try:
+        image = Image.open(fp=photo)
+        if image.format not in ALLOWED_PHOTO_FORMATS:
+            raise InvalidPhoto(reason=f'unsupported format {image.format}')
+        # open only parsed the header, the limit is checked again before the full decode
+        if max_pixels is not None and image.width * image.height > max_pixels:
+            raise InvalidPhoto(reason=f'{image.width}x{image.height} exceeds {max_pixels} pixels')
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise InvalidPhoto(reason=str(exc))
+
+    # the orientation is applied before the metadata, exif included, is dropped
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    image.info.clear()
+
+    variants = []
+    for name, size in PHOTO_VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail(size=size, resample=Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if has_alpha:
+            variant.save(buffer, format='PNG', optimize=True)
+            content_type = 'image/png'
+        else:
+            variant.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+            content_type = 'image/jpeg'
+
+        variants.append(PhotoVariant(name=name, content_type=content_type, data=buffer.getvalue()))
+
+    return variants
@@ -0,0 +1,159 @@
+import dataclasses
+import os
+import struct
+from typing import BinaryIO, Callable, Optional
+
+from saas.service.exceptions import InvalidPhoto, PhotoTooLarge
+
+# a jpeg may carry large exif/icc segments before its frame header, anything beyond this is rejected
+MAX_HEADER_SCAN_IN_BYTES = 256 * 1024
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SIGNATURE = b'\xff\xd8\xff'
+GIF_SIGNATURES = (b'GIF87a', b'GIF89a')
+
+# start of frame markers carry the dimensions, c4 (huffman), c8 (reserved) and cc (arithmetic) do not
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+
+
+@dataclasses.dataclass(frozen=True)
+class PhotoHeader:
+    format: str
+    width: int
+    height: int
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+def validate_photo(
+    photo: BinaryIO, max_size_in_bytes: int, max_pixels: int, max_dimension: Optional[int] = None
+) -> 'PhotoHeader':
+    size = _remaining_size(photo=photo)
+    if size > max_size_in_bytes:
+        raise PhotoTooLarge(size_in_bytes=size, max_size_in_bytes=max_size_in_bytes)
+
+    header = read_photo_header(photo=photo)
+
+    # decompression bombs are tiny files with huge dimensions, they are rejected before anything decodes them
+    if header.width <= 0 or header.height <= 0:
+        raise InvalidPhoto(reason='empty dimensions')
+    if header.pixels > max_pixels:
+        raise InvalidPhoto(reason=f'{header.width}x{header.height} exceeds {max_pixels} pixels')
+    if max_dimension is not None and max(header.width, header.height) > max_dimension:
+        raise InvalidPhoto(reason=f'{header.width}x{header.height} exceeds {max_dimension} pixels per side')
+
+    return header
+
+
+def read_photo_header(photo: BinaryIO) -> 'PhotoHeader':
+    start = photo.tell()
+    try:
+        signature = photo.read(32)
+
+        for sniff, parse in HEADER_PARSERS:
+            if sniff(signature):
+                photo.seek(start)
+                return parse(photo)
+
+        raise InvalidPhoto(reason='unsupported format')
+    except (struct.error, ValueError) as exc:
+        raise InvalidPhoto(reason=f'malformed header ({exc})')
+    finally:
+        photo.seek(start)
+
+
+def _read_png_header(photo: BinaryIO) -> 'PhotoHeader':
+    chunk = _read_exactly(photo=photo, size=24)
+    if chunk[12:16] != b'IHDR':
+        raise InvalidPhoto(reason='png without IHDR chunk')
+
+    width, height = struct.unpack('>II', chunk[16:24])
+    return PhotoHeader(format='PNG', width=width, height=height)
+
+
+def _read_gif_header(photo: BinaryIO) -> 'PhotoHeader':
+    chunk = _read_exactly(photo=photo, size=10)
+
+    width, height = struct.unpack('<HH', chunk[6:10])
+    return PhotoHeader(format='GIF', width=width, height=height)
+
+
+def _read_webp_header(photo: BinaryIO) -> 'PhotoHeader':
+    chunk = _read_exactly(photo=photo, size=30)
+    kind = chunk[12:16]
+
+    if kind == b'VP8X':
+        width = int.from_bytes(chunk[24:27], 'little') + 1
+        height = int.from_bytes(chunk[27:30], 'little') + 1
+    elif kind == b'VP8L':
+        if chunk[20] != 0x2F:
+            raise InvalidPhoto(reason='webp lossless without signature')
+        (bits,) = struct.unpack('<I', chunk[21:25])
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif kind == b'VP8 ':
+        if chunk[23:26] != b'\x9d\x01\x2a':
+            raise InvalidPhoto(reason='webp lossy without start code')
+        width, height = (value & 0x3FFF for value in struct.unpack('<HH', chunk[26:30]))
+    else:
+        raise InvalidPhoto(reason='unknown webp chunk')
+
+    return PhotoHeader(format='WEBP', width=width, height=height)
+
+
+def _read_jpeg_header(photo: BinaryIO) -> 'PhotoHeader':
+    start = photo.tell()
+    photo.seek(2, os.SEEK_CUR)
+
+    # segments are skipped with seek, only their two byte markers and lengths are read
+    while photo.tell() - start < MAX_HEADER_SCAN_IN_BYTES:
+        prefix, marker = _read_exactly(photo=photo, size=2)
+        if prefix != 0xFF:
+            raise InvalidPhoto(reason='jpeg segment without marker')
+
+        if marker == 0xFF:
+            photo.seek(-1, os.SEEK_CUR)
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise InvalidPhoto(reason='jpeg without frame header')
+
+        (length,) = struct.unpack('>H', _read_exactly(photo=photo, size=2))
+        if length < 2:
+            raise InvalidPhoto(reason='jpeg segment with invalid length')
+
+        if marker in JPEG_FRAME_MARKERS:
+            _, height, width = struct.unpack('>BHH', _read_exactly(photo=photo, size=5))
+            return PhotoHeader(format='JPEG', width=width, height=height)
+
+        photo.seek(length - 2, os.SEEK_CUR)
+
+    raise InvalidPhoto(reason=f'jpeg frame header not within the first {MAX_HEADER_SCAN_IN_BYTES} bytes')
+
+
+HEADER_PARSERS: tuple[tuple[Callable[[bytes], bool], Callable[[BinaryIO], 'PhotoHeader']], ...] = (
+    (lambda signature: signature.startswith(PNG_SIGNATURE), _read_png_header),
+    (lambda signature: signature.startswith(JPEG_SIGNATURE), _read_jpeg_header),
+    (lambda signature: signature.startswith(GIF_SIGNATURES), _read_gif_header),
+    (lambda signature: signature[:4] == b'RIFF' and signature[8:12] == b'WEBP', _read_webp_header),
+)
+
+
+def _read_exactly(photo: BinaryIO, size: int) -> bytes:
+    data = photo.read(size)
+    if len(data) != size:
+        raise InvalidPhoto(reason='truncated header')
+
+    return data
+
+
+def _remaining_size(photo: BinaryIO) -> int:
+    position = photo.tell()
+    size = photo.seek(0, os.SEEK_END) - position
+    photo.seek(position)
+
+    return size
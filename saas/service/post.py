@@ -2,22 +2,40 @@ from typing import Optional
 from saas.domain.posts import NewsPost, PostContent, PostAbstractRepository, Question, Answer
 from saas.domain.users import Enterprize, Profile
 from saas.domain.exceptions import PostDoesNotExist
+from saas.service.pagination import decode_cursor
+from saas.service.unit_of_work import AbstractUnitOfWork
 
 
-def create_post(repository: 'PostAbstractRepository', author: 'Profile', content: 'PostContent') -> 'NewsPost':
+def create_post(
+    repository: 'PostAbstractRepository',
+    unit_of_work: 'AbstractUnitOfWork',
+    author: 'Profile',
+    content: 'PostContent',
+) -> 'NewsPost':
     post = NewsPost(author=author, content=content)
 
-    repository.add_news_post(post=post)
+    with unit_of_work:
+        repository.add_news_post(post=post)
+        unit_of_work.commit()
 
     return post
 
 
-def list_posts_by_enterprize(enterprize: 'Enterprize', repository: 'PostAbstractRepository') -> list['NewsPost']:
-    posts = repository.list_for_enterprize(enterprize=enterprize)
+def list_posts_by_enterprize(
+    enterprize: 'Enterprize',
+    repository: 'PostAbstractRepository',
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+) -> list['NewsPost']:
+    position = decode_cursor(cursor=before) if before is not None else None
+
+    posts = repository.list_for_enterprize(enterprize=enterprize, limit=limit, before=position)
     return posts
 
 
-def delete_news_post(news_post_id: str, admin_username: str, repository: 'PostAbstractRepository'):
+def delete_news_post(
+    news_post_id: str, admin_username: str, repository: 'PostAbstractRepository', unit_of_work: 'AbstractUnitOfWork'
+):
     news_post = repository.retrieve_news_post_by_admin(reference=news_post_id, admin_username=admin_username)
 
     if news_post.deleted is not None:
@@ -25,16 +43,24 @@ def delete_news_post(news_post_id: str, admin_username: str, repository: 'PostAb
 
     news_post.delete()
 
-    repository.add_news_post(post=news_post)
+    with unit_of_work:
+        repository.add_news_post(post=news_post)
+        unit_of_work.commit()
 
 
 def post_question(
-    repository: 'PostAbstractRepository', author: 'Profile', content: 'PostContent', tags: Optional[set] = None
+    repository: 'PostAbstractRepository',
+    unit_of_work: 'AbstractUnitOfWork',
+    author: 'Profile',
+    content: 'PostContent',
+    tags: Optional[set] = None,
 ) -> 'Question':
     question = Question(author=author, content=content)
     question.tags = tags
 
-    repository.add_question(question=question)
+    with unit_of_work:
+        repository.add_question(question=question)
+        unit_of_work.commit()
 
     return question
 
@@ -46,11 +72,17 @@ def retrieve_question(reference: str, repository: 'PostAbstractRepository') -> '
 
 
 def create_answer(
-    author: 'Profile', content: 'PostContent', question: 'Question', repository: 'PostAbstractRepository'
+    author: 'Profile',
+    content: 'PostContent',
+    question: 'Question',
+    repository: 'PostAbstractRepository',
+    unit_of_work: 'AbstractUnitOfWork',
 ) -> 'Answer':
     answer = Answer(author=author, content=content, question=question)
 
-    repository.add_answer(answer=answer)
+    with unit_of_work:
+        repository.add_answer(answer=answer)
+        unit_of_work.commit()
 
     return answer
 
@@ -1,13 +1,33 @@
-from typing import Any, Optional
+import io
+import logging
+from typing import BinaryIO, Iterator, Optional
 
+from saas.core.config import configuration
 from saas.domain.exceptions import UsernameDoesNotExist
 from saas.domain.users import (
     ProfileAbstractRepository,
     FullName,
     Profile,
     Enterprize,
+    UserAvailability,
+    LegalStatus,
 )
 from saas.service import message_bus
+from saas.service.pagination import decode_cursor
+from saas.service.photos.processing import (
+    PHOTO_VARIANTS,
+    PROFILE_PHOTO_VARIANT,
+    create_photo_variants,
+    create_photo_version,
+    photo_blob_name,
+    photo_cache_key,
+    photo_path,
+)
+from saas.service.photos.cache import PhotoCache
+from saas.service.storage import AbstractBlobStore
+from saas.service.unit_of_work import AbstractUnitOfWork
+
+logger = logging.getLogger(__name__)
 
 
 def create_profile(
@@ -20,12 +40,44 @@ def create_profile(
     return profile
 
 
-def retrieve_profiles(admin_username: str, repository: ProfileAbstractRepository) -> list:
-    profiles = repository.retrieve_profiles_for_admin(admin_username=admin_username)
+def retrieve_profiles(
+    admin_username: str,
+    repository: ProfileAbstractRepository,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    availability: Optional[UserAvailability] = None,
+    department: Optional[str] = None,
+    legal_status: Optional[LegalStatus] = None,
+) -> list:
+    after = decode_cursor(cursor=cursor) if cursor is not None else None
+
+    profiles = repository.retrieve_profiles_for_admin(
+        admin_username=admin_username,
+        limit=limit,
+        after=after,
+        availability=availability,
+        department=department,
+        legal_status=legal_status,
+    )
+    return profiles
+
+
+def export_profiles(
+    admin_username: str,
+    repository: ProfileAbstractRepository,
+    availability: Optional[UserAvailability] = None,
+    department: Optional[str] = None,
+    legal_status: Optional[LegalStatus] = None,
+) -> Iterator['Profile']:
+    profiles = repository.stream_profiles_for_admin(
+        admin_username=admin_username, availability=availability, department=department, legal_status=legal_status
+    )
     return profiles
 
 
-def update_profile(username: str, repository: ProfileAbstractRepository, **kwargs) -> 'Profile':
+def update_profile(
+    username: str, repository: ProfileAbstractRepository, unit_of_work: AbstractUnitOfWork, **kwargs
+) -> 'Profile':
     profile = repository.retrieve_by_username(username=username)
 
     new_address = profile.address.create_with_changed_atrributes(**kwargs)
@@ -44,48 +96,167 @@ def update_profile(username: str, repository: ProfileAbstractRepository, **kwarg
     profile.availability = kwargs.get('availability') or profile.availability
     profile.motivation = kwargs.get('motivation') or profile.motivation
 
-    repository.save_profile(profile=profile)
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     return profile
 
 
-def upload_user_photo(username: str, photo: Any, repository: ProfileAbstractRepository) -> str:
-    profile = repository.retrieve_by_username(username=username)
+def upload_user_photo(
+    reference: str,
+    photo: BinaryIO,
+    replaces_version: Optional[str],
+    blob_store: 'AbstractBlobStore',
+    photo_cache: 'PhotoCache',
+    repository: ProfileAbstractRepository,
+    unit_of_work: AbstractUnitOfWork,
+) -> Optional[str]:
+    variants = create_photo_variants(photo=photo, max_pixels=configuration.PHOTO_MAX_PIXELS)
+    version = create_photo_version(variants=variants)
+
+    # every version gets its own blobs, so a url once served never changes its content
+    for variant in variants:
+        blob_store.upload(
+            name=photo_blob_name(reference=reference, version=version, variant=variant.name),
+            file_obj=io.BytesIO(variant.data),
+            content_type=variant.content_type,
+        )
+
+    with unit_of_work:
+        # locked while it is compared, a delete or another upload committed after this one was accepted wins
+        profile = repository.retrieve_profile_for_update(reference=reference)
+        current_version = profile.photo_version
+
+        if current_version != replaces_version:
+            unit_of_work.rollback()
+            logger.info(
+                'Discarding photo %s for profile %s, it replaced %s but the profile is at %s',
+                version,
+                reference,
+                replaces_version,
+                current_version,
+            )
+            if version != current_version:
+                _delete_photo_blobs(
+                    reference=reference, version=version, blob_store=blob_store, photo_cache=photo_cache
+                )
+            return None
+
+        profile.photo_version = version
+        profile.photo_url = photo_path(reference=reference, version=version, variant=PROFILE_PHOTO_VARIANT)
+
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
+
+    if current_version is not None and current_version != version:
+        _delete_photo_blobs(
+            reference=reference, version=current_version, blob_store=blob_store, photo_cache=photo_cache
+        )
+
+    return profile.photo_url
+
+
+def delete_user_photo(
+    username: str,
+    blob_store: 'AbstractBlobStore',
+    photo_cache: 'PhotoCache',
+    repository: ProfileAbstractRepository,
+    unit_of_work: AbstractUnitOfWork,
+) -> None:
+    reference = repository.retrieve_by_username(username=username).reference
+
+    with unit_of_work:
+        # the cached profile may predate an upload, the version whose blobs are deleted is read under the lock
+        profile = repository.retrieve_profile_for_update(reference=reference)
+        previous_version = profile.photo_version
+
+        profile.photo_url = None
+        profile.photo_version = None
+
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
+
+    # photos uploaded before the variants existed were stored under the bare reference
+    blob_store.delete(name=reference)
+    if previous_version is not None:
+        _delete_photo_blobs(
+            reference=reference, version=previous_version, blob_store=blob_store, photo_cache=photo_cache
+        )
+
+
+def _delete_photo_blobs(reference: str, version: str, blob_store: 'AbstractBlobStore', photo_cache: 'PhotoCache'):
+    for variant in PHOTO_VARIANTS:
+        blob_store.delete(name=photo_blob_name(reference=reference, version=version, variant=variant))
+        # the url of a deleted version must not keep being served from disk
+        photo_cache.discard(key=photo_cache_key(reference=reference, version=version, variant=variant))
+
+
+def invite_user_to_register(
+    username: str, creator: Profile, repository: ProfileAbstractRepository, unit_of_work: AbstractUnitOfWork
+) -> 'Profile':
+    with unit_of_work:
+        try:
+            profile = repository.retrieve_by_username(username=username)
+        except UsernameDoesNotExist:
+            profile = create_profile(repository=repository, enterprize=creator.enterprize)
+            profile.preregister_username(email_address=username)
 
-    photo_url = repository.upload_photo(profile=profile, photo=photo)
+        profile.invite_to_register(creator=creator)
 
-    return photo_url
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
+    message_bus.handle(profile.event_logs[-1])
 
-def delete_user_photo(username: str, repository: ProfileAbstractRepository) -> None:
-    profile = repository.retrieve_by_username(username=username)
+    return profile
 
-    repository.delete_photo(profile=profile)
 
+def invite_users_to_register(
+    usernames: list[str], creator: Profile, repository: ProfileAbstractRepository, unit_of_work: AbstractUnitOfWork
+) -> dict[str, Optional['Profile']]:
+    usernames = list(dict.fromkeys(username.lower() for username in usernames))
+    invited_profiles: dict[str, Optional['Profile']] = dict()
 
-def invite_user_to_register(username: str, creator: Profile, repository: ProfileAbstractRepository) -> 'Profile':
-    try:
-        profile = repository.retrieve_by_username(username=username)
-    except UsernameDoesNotExist:
-        profile = create_profile(repository=repository, enterprize=creator.enterprize)
-        profile.preregister_username(email_address=username)
+    with unit_of_work:
+        existing_profiles = {
+            profile.user.username.lower(): profile for profile in repository.retrieve_by_usernames(usernames=usernames)
+        }
 
-    profile.invite_to_register(creator=creator)
+        for username in usernames:
+            profile = existing_profiles.get(username)
 
-    repository.save_profile(profile=profile)
+            if profile is None:
+                profile = Profile(enterprize=creator.enterprize)
+                profile.preregister_username(email_address=username)
+            elif profile.enterprize != creator.enterprize:
+                invited_profiles[username] = None
+                continue
 
-    message_bus.handle(profile.event_logs[-1])
+            profile.invite_to_register(creator=creator)
+            invited_profiles[username] = profile
 
-    return profile
+        repository.save_profiles(profiles=[profile for profile in invited_profiles.values() if profile is not None])
+        unit_of_work.commit()
+
+    for profile in invited_profiles.values():
+        if profile is not None:
+            message_bus.handle(profile.event_logs[-1])
 
+    return invited_profiles
 
-def update_non_public_profile(profile_id: str, repository: ProfileAbstractRepository, **kwargs) -> Profile:
+
+def update_non_public_profile(
+    profile_id: str, repository: ProfileAbstractRepository, unit_of_work: AbstractUnitOfWork, **kwargs
+) -> Profile:
     profile = repository.retrieve_profile(reference=profile_id)
 
     new_enterprize_notes = profile.enterprize_notes.create_with_changed_atrributes(**kwargs)
 
     profile.enterprize_notes = new_enterprize_notes
 
-    repository.save_profile(profile=profile)
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     return profile
@@ -1,55 +1,97 @@
+from starlette.concurrency import run_in_threadpool
+
 from saas.domain.exceptions import (
     UserAlreadyActive,
     UsernameDoesNotExist,
     UserInactive,
     UsernameExists,
 )
-from saas.domain.services import create_hashed_password
 from saas.domain.users import User, ProfileAbstractRepository, UserCredentials
 from saas.service import message_bus
+from saas.service.authentication.hashing import password_hasher
 from saas.service.authentication.security import decode_profile_activation_token, create_profile_activation_token
 from saas.service.exceptions import InvalidToken, InvalidActivationCode
 from saas.service.profile import create_profile
+from saas.service.unit_of_work import AbstractUnitOfWork
 
 
-def register_user(
-    credentials: 'UserCredentials', enterprize_subdomain: str, repository: 'ProfileAbstractRepository'
+async def register_user(
+    credentials: 'UserCredentials',
+    enterprize_subdomain: str,
+    repository: 'ProfileAbstractRepository',
+    unit_of_work: 'AbstractUnitOfWork',
 ) -> 'User':
+    enterprize, profile = await run_in_threadpool(
+        _retrieve_registration_target,
+        credentials=credentials,
+        enterprize_subdomain=enterprize_subdomain,
+        repository=repository,
+    )
+
+    # hashed before the writes, so argon2 never runs inside the unit of work
+    hashed_password = await password_hasher.async_hash(plain_password=credentials.plain_password)
+
+    profile = await run_in_threadpool(
+        _save_registration,
+        credentials=credentials,
+        hashed_password=hashed_password,
+        enterprize=enterprize,
+        profile=profile,
+        repository=repository,
+        unit_of_work=unit_of_work,
+    )
+
+    return profile.user
+
+
+def _retrieve_registration_target(credentials, enterprize_subdomain, repository):
     enterprize = repository.retrieve_enterprize(enterprize_subdomain=enterprize_subdomain)
 
+    # a taken username is rejected before argon2 spends any time on it
     try:
         profile = repository.retrieve_by_username(username=credentials.username)
     except UsernameDoesNotExist:
-        profile = _create_profile_and_register_user(
-            credentials=credentials, enterprize=enterprize, repository=repository
-        )
-    else:
-        if profile.user.is_active:
-            raise UsernameExists(username=credentials.username)
+        return enterprize, None
+
+    if profile.user.is_active:
+        raise UsernameExists(username=credentials.username)
+    if profile.user.password is not None:
+        raise UserInactive(username=credentials.username)
+
+    return enterprize, profile
+
+
+def _save_registration(credentials, hashed_password, enterprize, profile, repository, unit_of_work):
+    with unit_of_work:
+        if profile is None:
+            profile = _create_profile_and_register_user(
+                credentials=credentials, hashed_password=hashed_password, enterprize=enterprize, repository=repository
+            )
         else:
-            if profile.user.password is None:
-                profile.user.password = create_hashed_password(plain_password=credentials.plain_password)
-            else:
-                raise UserInactive(username=credentials.username)
+            profile.user.set_hashed_password(hashed_password=hashed_password)
 
-    token = create_profile_activation_token(username=credentials.username)
-    profile.publish_profile_registered_event(profile_activation_token=token)
+        token = create_profile_activation_token(username=credentials.username)
+        profile.publish_profile_registered_event(profile_activation_token=token)
 
-    repository.save_profile(profile=profile)
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     message_bus.handle(profile.event_logs[-1])
 
-    return profile.user
+    return profile
 
 
-def _create_profile_and_register_user(credentials, enterprize, repository):
+def _create_profile_and_register_user(credentials, hashed_password, enterprize, repository):
     profile = create_profile(repository=repository, enterprize=enterprize)
-    profile.register_user(credentials=credentials)
+    profile.register_user(credentials=credentials.create_with_changed_atrributes(plain_password=None))
+    profile.user.set_hashed_password(hashed_password=hashed_password)
 
     return profile
 
 
-def activate_profile(profile_activation_token: str, repository: ProfileAbstractRepository) -> User:
+def activate_profile(
+    profile_activation_token: str, repository: ProfileAbstractRepository, unit_of_work: AbstractUnitOfWork
+) -> User:
     try:
         username = decode_profile_activation_token(token=profile_activation_token)
     except InvalidToken:
@@ -61,7 +103,10 @@ def activate_profile(profile_activation_token: str, repository: ProfileAbstractR
         raise UserAlreadyActive(username=profile.user.username)
 
     profile.activate()
-    repository.save_profile(profile=profile)
+
+    with unit_of_work:
+        repository.save_profile(profile=profile)
+        unit_of_work.commit()
 
     message_bus.handle(profile.event_logs[-1])
 
@@ -0,0 +1,25 @@
+from saas.core.config import configuration
+from .base import AbstractBlobStore
+from .google_cloud import GoogleCloudBlobStore
+from .local import LocalBlobStore
+
+
+def create_blob_store() -> 'AbstractBlobStore':
+    if configuration.BLOB_STORE_BACKEND == 'local':
+        return LocalBlobStore(
+            root=configuration.BLOB_STORE_LOCAL_PATH, base_url=configuration.BLOB_STORE_LOCAL_BASE_URL
+        )
+
+    return GoogleCloudBlobStore(
+        bucket_name=configuration.GOOGLE_CLOUD_STORAGE_BUCKET_NAME,
+        credentials_path=configuration.GOOGLE_CLOUD_STORAGE_CREDENTIALS_PATH,
+        pool_size=configuration.BLOB_STORE_POOL_SIZE,
+        chunk_size_in_bytes=configuration.BLOB_STORE_CHUNK_SIZE_IN_BYTES,
+        resumable_threshold_in_bytes=configuration.BLOB_STORE_RESUMABLE_THRESHOLD_IN_BYTES,
+    )
+
+
+blob_store = create_blob_store()
+
+
+__all__ = ['AbstractBlobStore', 'GoogleCloudBlobStore', 'LocalBlobStore', 'blob_store', 'create_blob_store']
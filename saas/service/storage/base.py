@@ -0,0 +1,23 @@
+import abc
+from typing import BinaryIO
+
+
+class AbstractBlobStore(abc.ABC):
+    @abc.abstractmethod
+    def upload(self, name: str, file_obj: BinaryIO, content_type: str, public: bool = False):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def download(self, name: str, file_obj: BinaryIO):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, name: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def public_url(self, name: str) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
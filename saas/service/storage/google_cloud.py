@@ -0,0 +1,114 @@
+import os
+import threading
+from typing import BinaryIO, Optional
+
+import google.auth
+from google.api_core.exceptions import NotFound
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+
+from saas.service.exceptions import BlobDoesNotExist
+from .base import AbstractBlobStore
+
+# resumable chunks have to be a multiple of 256 KiB
+CHUNK_SIZE_MULTIPLE = 256 * 1024
+
+
+class GoogleCloudBlobStore(AbstractBlobStore):
+    def __init__(
+        self,
+        bucket_name: str,
+        credentials_path: Optional[str] = None,
+        pool_size: int = 10,
+        chunk_size_in_bytes: int = 8 * 1024 * 1024,
+        resumable_threshold_in_bytes: int = 8 * 1024 * 1024,
+        client: Optional['storage.Client'] = None,
+    ):
+        if chunk_size_in_bytes % CHUNK_SIZE_MULTIPLE:
+            raise ValueError(f'Chunk size has to be a multiple of {CHUNK_SIZE_MULTIPLE} bytes.')
+
+        self.bucket_name = bucket_name
+        self.credentials_path = credentials_path
+        self.pool_size = pool_size
+        self.chunk_size_in_bytes = chunk_size_in_bytes
+        self.resumable_threshold_in_bytes = resumable_threshold_in_bytes
+
+        self._client = client
+        self._bucket: Optional['storage.Bucket'] = None
+        self._lock = threading.Lock()
+
+    @property
+    def bucket(self) -> 'storage.Bucket':
+        # created on first use, importing the module must not require credentials
+        if self._bucket is None:
+            with self._lock:
+                if self._bucket is None:
+                    if self._client is None:
+                        self._client = self._create_client()
+                    self._bucket = self._client.bucket(bucket_name=self.bucket_name)
+
+        return self._bucket
+
+    def upload(self, name: str, file_obj: BinaryIO, content_type: str, public: bool = False):
+        blob = self.bucket.blob(blob_name=name)
+
+        # small files go up in a single request, large or unsized ones as a resumable upload in chunks,
+        # so neither side holds the whole document in memory and a dropped connection resumes the last chunk
+        size = _remaining_size(file_obj=file_obj)
+        if size is None or size > self.resumable_threshold_in_bytes:
+            blob.chunk_size = self.chunk_size_in_bytes
+
+        blob.upload_from_file(
+            file_obj=file_obj,
+            size=size,
+            content_type=content_type,
+            predefined_acl='publicRead' if public else 'private',
+        )
+
+    def download(self, name: str, file_obj: BinaryIO):
+        try:
+            self.bucket.blob(blob_name=name, chunk_size=self.chunk_size_in_bytes).download_to_file(file_obj=file_obj)
+        except NotFound:
+            raise BlobDoesNotExist(name=name)
+
+    def delete(self, name: str):
+        try:
+            self.bucket.blob(blob_name=name).delete()
+        except NotFound:
+            pass
+
+    def public_url(self, name: str) -> str:
+        return self.bucket.blob(blob_name=name).public_url
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+
+    def _create_client(self) -> 'storage.Client':
+        if self.credentials_path:
+            credentials = service_account.Credentials.from_service_account_file(
+                self.credentials_path, scopes=storage.Client.SCOPE
+            )
+            project = credentials.project_id
+        else:
+            credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+
+        # one authorized keep-alive session for the whole process, shared by every request and worker thread
+        session = AuthorizedSession(credentials=credentials)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+
+        return storage.Client(project=project, credentials=credentials, _http=session)
+
+
+def _remaining_size(file_obj: BinaryIO) -> Optional[int]:
+    try:
+        position = file_obj.tell()
+        size = file_obj.seek(0, os.SEEK_END) - position
+        file_obj.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+    return size
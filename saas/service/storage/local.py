@@ -0,0 +1,48 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from saas.service.exceptions import BlobDoesNotExist
+from .base import AbstractBlobStore
+
+CHUNK_SIZE_IN_BYTES = 1024 * 1024
+
+
+class LocalBlobStore(AbstractBlobStore):
+    def __init__(self, root: str, base_url: Optional[str] = None):
+        self.root = Path(root).resolve()
+        self.base_url = (base_url or self.root.as_uri()).rstrip('/')
+
+    def upload(self, name: str, file_obj: BinaryIO, content_type: str, public: bool = False):
+        path = self.path(name=name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # written next to the target and renamed, readers never see a half written blob
+        partial = path.with_name(f'.{path.name}.partial')
+        with partial.open('wb') as blob:
+            shutil.copyfileobj(file_obj, blob, CHUNK_SIZE_IN_BYTES)
+        os.replace(partial, path)
+
+    def download(self, name: str, file_obj: BinaryIO):
+        try:
+            with self.path(name=name).open('rb') as blob:
+                shutil.copyfileobj(blob, file_obj, CHUNK_SIZE_IN_BYTES)
+        except (FileNotFoundError, IsADirectoryError):
+            raise BlobDoesNotExist(name=name)
+
+    def delete(self, name: str):
+        path = self.path(name=name)
+        # a name can also be the prefix of other blobs, which is a directory on disk
+        if path.is_file():
+            path.unlink()
+
+    def public_url(self, name: str) -> str:
+        return f'{self.base_url}/{name}'
+
+    def path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f'Blob name \'{name}\' points outside of {self.root}.')
+
+        return path
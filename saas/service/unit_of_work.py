@@ -0,0 +1,18 @@
+import abc
+
+
+class AbstractUnitOfWork(abc.ABC):
+    def __enter__(self) -> 'AbstractUnitOfWork':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+
+    @abc.abstractmethod
+    def commit(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def rollback(self):
+        raise NotImplementedError
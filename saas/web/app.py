@@ -1,16 +1,26 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from saas.core.config import configuration
 from saas.database.metadata import start_mappers
+from saas.service import message_bus
+from saas.service.authentication.hashing import password_hasher
+from saas.service.exceptions import ServiceBusy
+from saas.service.photos import photo_cache, photo_pipeline
+from saas.service.storage import blob_store
 from saas.web.controllers import (
     registration_router,
     admin_router,
     authentication_router,
     users_router,
+    metrics_router,
+    photos_router,
 )
+from saas.web.middleware import RequestSizeLimitMiddleware
 from saas.web.ws.endpoints import websocket_router
+from saas.web.ws.hub import broadcast_hub
 
 web_app = FastAPI(title='SaaS REST API')
 
@@ -23,17 +33,69 @@ web_app.add_middleware(
     allow_headers=["*"],
 )
 
+# room for the multipart boundaries and part headers around the photo itself
+MULTIPART_ENVELOPE_IN_BYTES = 64 * 1024
+
+web_app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={'/profile/photo': configuration.PHOTO_MAX_SIZE_IN_BYTES + MULTIPART_ENVELOPE_IN_BYTES},
+)
+
 web_app.include_router(router=registration_router)
 web_app.include_router(router=admin_router)
 web_app.include_router(router=authentication_router)
 web_app.include_router(router=users_router)
+web_app.include_router(router=metrics_router)
+web_app.include_router(router=photos_router)
 web_app.include_router(router=websocket_router)
 
 
+@web_app.exception_handler(ServiceBusy)
+async def service_busy(request: Request, exc: ServiceBusy):
+    # every bounded pool that turns work away is answered the same way, whichever endpoint hit it
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={'detail': exc.message},
+        headers={'Retry-After': str(exc.retry_after_in_seconds)},
+    )
+
+
 @web_app.on_event('startup')
 def mappers():
     start_mappers()
 
 
+@web_app.on_event('startup')
+def start_message_bus():
+    message_bus.start()
+
+
+@web_app.on_event('startup')
+def recover_spooled_photos():
+    photo_pipeline.recover()
+
+
+@web_app.on_event('shutdown')
+def drain_message_bus():
+    message_bus.shutdown()
+
+
+@web_app.on_event('shutdown')
+def drain_photo_pipeline():
+    photo_pipeline.shutdown()
+    photo_cache.close()
+    blob_store.close()
+
+
+@web_app.on_event('shutdown')
+def drain_password_hasher():
+    password_hasher.shutdown()
+
+
+@web_app.on_event('shutdown')
+async def close_websockets():
+    await broadcast_hub.close()
+
+
 if __name__ == '__main__':
     uvicorn.run(web_app, host='0.0.0.0', port=8000)
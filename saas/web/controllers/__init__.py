@@ -5,6 +5,8 @@ from .registration import (
 )
 from .admin_users import invite_user_controller, admin_router
 from .authentication import authenticate_user_controller, authentication_router
+from .metrics import database_pool_metrics_controller, metrics_router
+from .photos import retrieve_photo_controller, photos_router
 from .profiles import (
     create_enterprize_controller,
     retrieve_profile_controller,
@@ -19,6 +21,10 @@ __all__ = [
     'admin_router',
     'authenticate_user_controller',
     'authentication_router',
+    'database_pool_metrics_controller',
+    'metrics_router',
+    'retrieve_photo_controller',
+    'photos_router',
     'create_enterprize_controller',
     'retrieve_profile_controller',
     'users_router',
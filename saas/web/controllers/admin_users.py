@@ -1,22 +1,43 @@
-from fastapi import APIRouter, status, Depends, HTTPException, UploadFile, File, Response
-from google.cloud import storage
+import csv
+import io
+import json
+from pathlib import PurePosixPath
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, status, Depends, HTTPException, UploadFile, File, Response, Query
+from fastapi.responses import StreamingResponse
+from pydantic import validate_email
 
-from saas.core.config import configuration
 from saas.database.models import ProfileRepository, PostRepository, EventRepository
 from saas.domain.events import EventContent
 from saas.domain.exceptions import UserDoesNotExist, EventDoesNotExist, PostDoesNotExist
 from saas.domain.posts import PostContent
-from saas.domain.users import Profile
+from saas.domain.users import Profile, UserAvailability, LegalStatus
 from saas.service.event import create_event, delete_event
 from saas.service.post import create_post, delete_news_post
-from saas.service.profile import retrieve_profiles, invite_user_to_register, update_non_public_profile
+from saas.service.exceptions import InvalidCursor
+from saas.service.pagination import encode_cursor
+from saas.service.storage import AbstractBlobStore
+from saas.service.unit_of_work import AbstractUnitOfWork
+from saas.service.profile import (
+    retrieve_profiles,
+    export_profiles,
+    invite_user_to_register,
+    invite_users_to_register,
+    update_non_public_profile,
+)
 from saas.web.security import get_admin_profile
 from saas.web.serializers import (
     InviteUserRequest,
     InviteUserResponse,
+    BulkInviteUsersRequest,
+    BulkInviteUsersResponse,
+    BulkInvitationResult,
+    InvitationStatus,
     UserInvitationResponse,
     ListProfilesResponse,
-    ProfileSerializer,
+    AdminProfileSerializer,
+    ExportFormat,
     CreatePostRequest,
     CreatePostResponse,
     ListUserInvitationsResponse,
@@ -27,10 +48,13 @@ from saas.web.serializers import (
     AdminUpdateProfileRequest,
     AdminUpdateProfileResponse,
 )
-from saas.web.session import profile_database, post_database, event_database
+from saas.web.session import profile_database, post_database, event_database, database_unit_of_work, blob_storage
 
 admin_router = APIRouter()
 
+MAX_BULK_INVITATIONS = 10_000
+PROFILES_PAGE_SIZE = 100
+
 
 @admin_router.post(
     path='/users/actions/invitation',
@@ -43,12 +67,108 @@ def invite_user_controller(
     request: 'InviteUserRequest',
     admin_profile: 'Profile' = Depends(get_admin_profile),
     repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
-    admin_profile = invite_user_to_register(username=request.email, creator=admin_profile, repository=repository)
+    admin_profile = invite_user_to_register(
+        username=request.email, creator=admin_profile, repository=repository, unit_of_work=unit_of_work
+    )
 
     return InviteUserResponse(email=admin_profile.user.username)
 
 
+@admin_router.post(
+    path='/users/actions/bulk-invitation',
+    status_code=status.HTTP_200_OK,
+    response_model=BulkInviteUsersResponse,
+    name='Invite new users in bulk',
+    tags=['administration'],
+)
+def bulk_invite_users_controller(
+    request: 'BulkInviteUsersRequest',
+    admin_profile: 'Profile' = Depends(get_admin_profile),
+    repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
+):
+    return _invite_users_in_bulk(
+        emails=request.emails, admin_profile=admin_profile, repository=repository, unit_of_work=unit_of_work
+    )
+
+
+@admin_router.post(
+    path='/users/actions/bulk-invitation/csv',
+    status_code=status.HTTP_200_OK,
+    response_model=BulkInviteUsersResponse,
+    name='Invite new users in bulk from a CSV file',
+    tags=['administration'],
+)
+def bulk_invite_users_from_csv_controller(
+    document: UploadFile = File(...),
+    admin_profile: 'Profile' = Depends(get_admin_profile),
+    repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
+):
+    try:
+        rows = csv.reader(document.file.read().decode('utf-8-sig').splitlines())
+        emails = [row[0].strip() for row in rows if row and row[0].strip()]
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid CSV file.')
+
+    if emails and emails[0].lower() == 'email':
+        emails = emails[1:]
+
+    return _invite_users_in_bulk(
+        emails=emails, admin_profile=admin_profile, repository=repository, unit_of_work=unit_of_work
+    )
+
+
+def _invite_users_in_bulk(
+    emails: list[str], admin_profile: 'Profile', repository: 'ProfileRepository', unit_of_work: 'AbstractUnitOfWork'
+) -> 'BulkInviteUsersResponse':
+    if len(emails) > MAX_BULK_INVITATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'At most {MAX_BULK_INVITATIONS} users can be invited at once.',
+        )
+
+    statuses: list[tuple[str, Optional[InvitationStatus]]] = list()
+    usernames: set[str] = set()
+
+    for email in emails:
+        email = email.strip()
+        try:
+            validate_email(email)
+        except ValueError:
+            statuses.append((email, InvitationStatus.invalid))
+            continue
+
+        if email.lower() in usernames:
+            statuses.append((email, InvitationStatus.duplicate))
+        else:
+            usernames.add(email.lower())
+            statuses.append((email, None))
+
+    invited_profiles = invite_users_to_register(
+        usernames=[email for email, invitation_status in statuses if invitation_status is None],
+        creator=admin_profile,
+        repository=repository,
+        unit_of_work=unit_of_work,
+    )
+
+    results = [
+        BulkInvitationResult(
+            email=email,
+            status=invitation_status
+            or (
+                InvitationStatus.invited if invited_profiles[email.lower()] is not None else InvitationStatus.rejected
+            ),
+        )
+        for email, invitation_status in statuses
+    ]
+    return BulkInviteUsersResponse(
+        invited=sum(result.status == InvitationStatus.invited for result in results), results=results
+    )
+
+
 @admin_router.get(
     path='/users/actions/invitation',
     status_code=status.HTTP_200_OK,
@@ -83,39 +203,72 @@ def list_invitations_controller(
     tags=['administration'],
 )
 def list_profiles_controller(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    availability: Optional[UserAvailability] = None,
+    department: Optional[str] = None,
+    legal_status: Optional[LegalStatus] = None,
     admin_profile: 'Profile' = Depends(get_admin_profile),
     repository: 'ProfileRepository' = Depends(profile_database),
 ):
-    profiles = retrieve_profiles(admin_username=admin_profile.user.username, repository=repository)
-    profiles_response = [
-        ProfileSerializer(
-            reference=profile.reference,
-            first_name=profile.first_name,
-            last_name=profile.last_name,
-            email=profile.user.username if profile.user is not None else None,
-            role=profile.user.type.name if profile.user is not None else None,
-            activated=bool(profile.user.activated) if profile.user is not None else None,
-            invited=bool(profile.user.invited) if profile.user is not None else None,
-            street=profile.contact.address.street,
-            town=profile.contact.address.town,
-            zip_code=profile.contact.address.zip_code,
-            country=profile.contact.address.country,
-            phone_number=profile.contact.phone_number,
-            position=profile.company_status.position,
-            department=profile.company_status.department,
-            photo_url=profile.photo_url,
-            skills=profile.skills,
-            descriptions=profile.descriptions,
-            availability=profile.availability,
-            motivation=profile.motivation,
-            legal_status=profile.legal_status,
-            exit_notes=profile.exit_notes,
-            enter_date=profile.enter_date,
-            exit_date=profile.exit_date,
+    # clients that never paginated still get every profile, a cursor alone pages with the default size
+    if limit is None and cursor is not None:
+        limit = PROFILES_PAGE_SIZE
+
+    try:
+        profiles = retrieve_profiles(
+            admin_username=admin_profile.user.username,
+            repository=repository,
+            limit=limit,
+            cursor=cursor,
+            availability=availability,
+            department=department,
+            legal_status=legal_status,
         )
-        for profile in profiles
-    ]
-    return ListProfilesResponse(profiles=profiles_response)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+
+    profiles_response = [_admin_profile_serializer(profile=profile) for profile in profiles]
+    next_cursor = (
+        encode_cursor(created=profiles[-1].created, reference=profiles[-1].reference)
+        if limit is not None and len(profiles) == limit
+        else None
+    )
+    return ListProfilesResponse(profiles=profiles_response, next_cursor=next_cursor)
+
+
+@admin_router.get(
+    path='/users/profiles/export',
+    status_code=status.HTTP_200_OK,
+    name='Export all user profiles',
+    tags=['administration'],
+)
+def export_profiles_controller(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias='format'),
+    availability: Optional[UserAvailability] = None,
+    department: Optional[str] = None,
+    legal_status: Optional[LegalStatus] = None,
+    admin_profile: 'Profile' = Depends(get_admin_profile),
+    repository: 'ProfileRepository' = Depends(profile_database),
+):
+    profiles = export_profiles(
+        admin_username=admin_profile.user.username,
+        repository=repository,
+        availability=availability,
+        department=department,
+        legal_status=legal_status,
+    )
+
+    if export_format == ExportFormat.csv:
+        content, media_type = _export_csv_rows(profiles=profiles), 'text/csv'
+    else:
+        content, media_type = _export_ndjson_rows(profiles=profiles), 'application/x-ndjson'
+
+    return StreamingResponse(
+        content=content,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="profiles.{export_format.value}"'},
+    )
 
 
 @admin_router.get(
@@ -182,9 +335,12 @@ def update_non_public_profile_controller(
     request: AdminUpdateProfileRequest,
     admin_profile: 'Profile' = Depends(get_admin_profile),
     repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        profile = update_non_public_profile(profile_id=profile_id, repository=repository, **dict(request))
+        profile = update_non_public_profile(
+            profile_id=profile_id, repository=repository, unit_of_work=unit_of_work, **dict(request)
+        )
     except UserDoesNotExist as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
 
@@ -202,9 +358,10 @@ def create_post_controller(
     request: 'CreatePostRequest',
     admin_profile: 'Profile' = Depends(get_admin_profile),
     repository: 'PostRepository' = Depends(post_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     content = PostContent(title=request.title, body=request.body)
-    post = create_post(author=admin_profile, content=content, repository=repository)
+    post = create_post(author=admin_profile, content=content, repository=repository, unit_of_work=unit_of_work)
 
     return CreatePostResponse(author=admin_profile.user.username, created=post.created)
 
@@ -216,9 +373,15 @@ def delete_news_post_controller(
     post_id: str,
     admin_profile: Profile = Depends(get_admin_profile),
     repository: PostRepository = Depends(post_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        delete_news_post(news_post_id=post_id, admin_username=admin_profile.username, repository=repository)
+        delete_news_post(
+            news_post_id=post_id,
+            admin_username=admin_profile.username,
+            repository=repository,
+            unit_of_work=unit_of_work,
+        )
     except PostDoesNotExist as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
 
@@ -236,6 +399,7 @@ def create_event_controller(
     request: 'CreateEventRequest',
     admin_profile: 'Profile' = Depends(get_admin_profile),
     event_repo: 'EventRepository' = Depends(event_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     content = EventContent(
         title=request.title,
@@ -244,7 +408,7 @@ def create_event_controller(
         starts_at=request.starts_at,
         ends_at=request.ends_at,
     )
-    event = create_event(organizer=admin_profile, content=content, repository=event_repo)
+    event = create_event(organizer=admin_profile, content=content, repository=event_repo, unit_of_work=unit_of_work)
 
     return CreateEventResponse(organizer=admin_profile.user.username, created=event.created)
 
@@ -256,9 +420,12 @@ def delete_event_controller(
     event_id: str,
     admin_profile: Profile = Depends(get_admin_profile),
     repository: EventRepository = Depends(event_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        delete_event(event_id=event_id, admin_username=admin_profile.username, repository=repository)
+        delete_event(
+            event_id=event_id, admin_username=admin_profile.username, repository=repository, unit_of_work=unit_of_work
+        )
     except EventDoesNotExist as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
 
@@ -281,9 +448,67 @@ def dashboard_controller(
 
 
 @admin_router.post(path='/users/actions/upload', status_code=status.HTTP_202_ACCEPTED)
-def upload_file_controller(admin_profile: 'Profile' = Depends(get_admin_profile), document: UploadFile = File(...)):
-    client = storage.Client()
-    bucket = client.bucket(bucket_name=configuration.GOOGLE_CLOUD_STORAGE_BUCKET_NAME)
-    blob = storage.Blob(name=f'{admin_profile.enterprize.subdomain}/{document.filename}', bucket=bucket)
-    blob.upload_from_file(file_obj=document.file, content_type=document.content_type)
-    blob.make_private()
+def upload_file_controller(
+    admin_profile: 'Profile' = Depends(get_admin_profile),
+    document: UploadFile = File(...),
+    blob_store: 'AbstractBlobStore' = Depends(blob_storage),
+):
+    # only the base name is kept, a crafted filename must not escape the enterprize prefix
+    filename = PurePosixPath(document.filename.replace('\\', '/')).name
+    if not filename:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='Filename is missing.')
+
+    blob_store.upload(
+        name=f'{admin_profile.enterprize.subdomain}/{filename}',
+        file_obj=document.file,
+        content_type=document.content_type,
+    )
+
+
+def _admin_profile_serializer(profile: 'Profile') -> 'AdminProfileSerializer':
+    return AdminProfileSerializer(
+        reference=profile.reference,
+        first_name=profile.first_name,
+        last_name=profile.last_name,
+        email=profile.user.username if profile.user is not None else None,
+        role=profile.user.type.name if profile.user is not None else None,
+        activated=bool(profile.user.activated) if profile.user is not None else None,
+        invited=bool(profile.user.invited) if profile.user is not None else None,
+        street=profile.contact.address.street,
+        town=profile.contact.address.town,
+        zip_code=profile.contact.address.zip_code,
+        country=profile.contact.address.country,
+        phone_number=profile.contact.phone_number,
+        position=profile.company_status.position,
+        department=profile.company_status.department,
+        photo_url=profile.photo_url,
+        skills=profile.skills,
+        descriptions=profile.descriptions,
+        availability=profile.availability,
+        motivation=profile.motivation,
+        legal_status=profile.legal_status,
+        exit_notes=profile.exit_notes,
+        enter_date=profile.enter_date,
+        exit_date=profile.exit_date,
+    )
+
+
+def _export_ndjson_rows(profiles: Iterator['Profile']) -> Iterator[str]:
+    for profile in profiles:
+        yield _admin_profile_serializer(profile=profile).json() + '\n'
+
+
+def _export_csv_rows(profiles: Iterator['Profile']) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(AdminProfileSerializer.__fields__))
+
+    writer.writeheader()
+    for profile in profiles:
+        row = json.loads(_admin_profile_serializer(profile=profile).json())
+        writer.writerow({key: json.dumps(value) if isinstance(value, list) else value for key, value in row.items()})
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
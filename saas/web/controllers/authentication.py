@@ -1,5 +1,6 @@
 from fastapi import APIRouter, status, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 
 from saas.database.models import ProfileRepository
 from saas.domain.users import UserCredentials, Profile
@@ -15,6 +16,7 @@ from saas.service.authentication import (
 )
 from saas.domain.exceptions import UsernameDoesNotExist, UsernameExists, UserInactive
 from saas.service.exceptions import InvalidCredentials, InvalidToken
+from saas.service.unit_of_work import AbstractUnitOfWork
 from saas.web.security import get_profile
 from saas.web.serializers import (
     LoginResponse,
@@ -25,7 +27,7 @@ from saas.web.serializers import (
     ChangeUsernameRequest,
     ChangeUsernameResponse,
 )
-from saas.web.session import profile_database
+from saas.web.session import profile_database, database_unit_of_work
 
 authentication_router = APIRouter()
 
@@ -37,14 +39,14 @@ authentication_router = APIRouter()
     name='Login',
     tags=['login'],
 )
-def authenticate_user_controller(
+async def authenticate_user_controller(
     request: OAuth2PasswordRequestForm = Depends(),
     user_repo: ProfileRepository = Depends(profile_database),
 ):
     credentials = UserCredentials(username=request.username, plain_password=request.password)
 
     try:
-        user = authenticate_credentials(credentials=credentials, repository=user_repo)
+        user = await authenticate_credentials(credentials=credentials, repository=user_repo)
         access_token = create_access_token(username=user.username)
 
     except (InvalidCredentials, UserInactive) as exc:
@@ -63,14 +65,16 @@ def authenticate_user_controller(
     tags=['login'],
 )
 def initiate_change_password_controller(
-    request: 'InitiateChangePasswordRequest', user_repo: 'ProfileRepository' = Depends(profile_database)
+    request: 'InitiateChangePasswordRequest',
+    user_repo: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
         profile = user_repo.retrieve_by_username(username=request.username)
     except UsernameDoesNotExist as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
     else:
-        initiate_password_change(profile=profile, repository=user_repo)
+        initiate_password_change(profile=profile, repository=user_repo, unit_of_work=unit_of_work)
 
 
 @authentication_router.post(
@@ -80,16 +84,20 @@ def initiate_change_password_controller(
     name='Change password',
     tags=['login'],
 )
-def change_user_password_controller(
-    request: 'ChangePasswordRequest', user_repo: 'ProfileRepository' = Depends(profile_database)
+async def change_user_password_controller(
+    request: 'ChangePasswordRequest',
+    user_repo: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
         username = decode_password_change_token(password_change_token=request.password_change_token)
-        profile = user_repo.retrieve_by_username(username=username)
+        profile = await run_in_threadpool(user_repo.retrieve_by_username, username=username)
     except (InvalidToken, UsernameDoesNotExist):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    change_user_password(profile=profile, new_plain_password=request.new_password, repository=user_repo)
+    await change_user_password(
+        profile=profile, new_plain_password=request.new_password, repository=user_repo, unit_of_work=unit_of_work
+    )
     access_token = create_access_token(username=profile.user.username)
 
     return ChangePasswordResponse(access_token=access_token)
@@ -105,9 +113,12 @@ def initiate_username_change_controller(
     request: 'InitiateChangeUsernameRequest',
     profile: 'Profile' = Depends(get_profile),
     user_repo: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        initiate_username_change(profile=profile, new_username=request.new_username, repository=user_repo)
+        initiate_username_change(
+            profile=profile, new_username=request.new_username, repository=user_repo, unit_of_work=unit_of_work
+        )
     except UsernameExists as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
 
@@ -116,7 +127,9 @@ def initiate_username_change_controller(
     path='/users/actions/username/change', status_code=status.HTTP_200_OK, name='Change username', tags=['login']
 )
 def change_username_controller(
-    request: 'ChangeUsernameRequest', user_repo: 'ProfileRepository' = Depends(profile_database)
+    request: 'ChangeUsernameRequest',
+    user_repo: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
         username, new_username = decode_username_change_token(username_change_token=request.username_change_token)
@@ -124,7 +137,7 @@ def change_username_controller(
     except (InvalidToken, UsernameDoesNotExist):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    change_username(profile=profile, new_username=new_username, repository=user_repo)
+    change_username(profile=profile, new_username=new_username, repository=user_repo, unit_of_work=unit_of_work)
     access_token = create_access_token(username=profile.user.username)
 
     return ChangeUsernameResponse(access_token=access_token, new_username=profile.user.username)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, status, Depends
+
+from saas.database.session import retrieve_pool_statistics
+from saas.domain.users import Profile
+from saas.web.security import get_super_admin_profile
+from saas.web.serializers import DatabasePoolStatisticsResponse
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    path='/metrics/database-pool',
+    status_code=status.HTTP_200_OK,
+    response_model=DatabasePoolStatisticsResponse,
+    name='Database connection pool statistics',
+    tags=['metrics'],
+)
+def database_pool_metrics_controller(profile: 'Profile' = Depends(get_super_admin_profile)):
+    return DatabasePoolStatisticsResponse(**retrieve_pool_statistics())
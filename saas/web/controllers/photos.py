@@ -0,0 +1,81 @@
+import functools
+from typing import Optional
+
+from fastapi import APIRouter, status, Depends, HTTPException, Path, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from saas.core.config import configuration
+from saas.service.exceptions import BlobDoesNotExist, InvalidPhoto
+from saas.service.photos import PHOTO_VARIANTS, PhotoCache, photo_blob_name, photo_cache_key, read_photo_header
+from saas.service.storage import AbstractBlobStore
+from saas.web.responses import FileRangeResponse
+from saas.web.session import blob_storage, photo_disk_cache
+
+photos_router = APIRouter()
+
+REFERENCE_PATTERN = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+VERSION_PATTERN = r'^[0-9a-f]{16}$'
+
+MEDIA_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'GIF': 'image/gif', 'WEBP': 'image/webp'}
+
+
+@photos_router.get(
+    path=f'{configuration.PHOTO_URL_PREFIX}/{{reference}}/{{version}}/{{variant}}',
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+    name='Retrieve profile photo',
+    tags=['profiles'],
+)
+async def retrieve_photo_controller(
+    request: Request,
+    reference: str = Path(..., regex=REFERENCE_PATTERN),
+    version: str = Path(..., regex=VERSION_PATTERN),
+    variant: str = Path(...),
+    cache: 'PhotoCache' = Depends(photo_disk_cache),
+    blob_store: 'AbstractBlobStore' = Depends(blob_storage),
+):
+    if variant not in PHOTO_VARIANTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Unknown photo variant \'{variant}\'.')
+
+    # a version is never overwritten, so reference, version and variant identify the bytes exactly
+    etag = f'"{reference}.{version}.{variant}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={configuration.PHOTO_CACHE_MAX_AGE_IN_SECONDS}, immutable',
+    }
+
+    # revalidation is answered from the url alone, without touching the disk or object storage
+    if _etag_matches(if_none_match=request.headers.get('if-none-match'), etag=etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = photo_cache_key(reference=reference, version=version, variant=variant)
+    photo = await run_in_threadpool(cache.open, key=key)
+    if photo is None:
+        name = photo_blob_name(reference=reference, version=version, variant=variant)
+        try:
+            photo = await run_in_threadpool(cache.fill, key=key, write=functools.partial(blob_store.download, name))
+        except BlobDoesNotExist as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
+
+    try:
+        media_type = MEDIA_TYPES[read_photo_header(photo=photo).format]
+    except InvalidPhoto:
+        media_type = 'application/octet-stream'
+
+    return FileRangeResponse(
+        file=photo,
+        media_type=media_type,
+        headers=headers,
+        range_header=request.headers.get('range'),
+        if_range=request.headers.get('if-range'),
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    # if-none-match uses the weak comparison, a W/ prefix does not prevent a match
+    return etag in (candidate.strip().removeprefix('W/') for candidate in if_none_match.split(','))
@@ -1,16 +1,27 @@
-from PIL import Image, UnidentifiedImageError
-from fastapi import APIRouter, status, Depends, HTTPException, File, UploadFile, Response
+from typing import Optional
 
-from saas.database.models import ProfileRepository, PostRepository, EventRepository
+from fastapi import APIRouter, status, Depends, HTTPException, File, UploadFile, Response, Query
+
+from saas.core.config import configuration
+from saas.database.models import (
+    ProfileRepository,
+    PostRepository,
+    AsyncPostRepository,
+    AsyncEventRepository,
+)
 from saas.domain.exceptions import EnterprizeExists, PostDoesNotExist
 from saas.domain.posts import PostContent
 from saas.domain.users import User, Profile
 from saas.service.enterprize import create_enterprize
-from saas.service.event import list_events_by_enterprize
 from saas.domain.exceptions import EnterprizeExists, PostDoesNotExist
-from saas.service.post import post_question, create_answer
-from saas.service.profile import update_profile, upload_user_photo, delete_user_photo
-from saas.web.security import get_profile, get_super_admin_profile
+from saas.service.exceptions import InvalidCursor, InvalidPhoto, PhotoTooLarge
+from saas.service.pagination import encode_cursor
+from saas.service.post import post_question, create_answer, list_posts_by_enterprize
+from saas.service.photos import PhotoCache, PhotoPipeline, validate_photo
+from saas.service.profile import update_profile, delete_user_photo
+from saas.service.storage import AbstractBlobStore
+from saas.service.unit_of_work import AbstractUnitOfWork
+from saas.web.security import get_profile, get_super_admin_profile, async_get_profile
 from saas.web.serializers import (
     CreateEnterprizeRequest,
     CreateEnterprizeResponse,
@@ -32,7 +43,16 @@ from saas.web.serializers import (
     EventSerializer,
     ListEventsResponse,
 )
-from saas.web.session import profile_database, post_database, event_database
+from saas.web.session import (
+    profile_database,
+    post_database,
+    async_post_database,
+    async_event_database,
+    database_unit_of_work,
+    photo_processing_pipeline,
+    photo_disk_cache,
+    blob_storage,
+)
 
 users_router = APIRouter()
 
@@ -48,9 +68,12 @@ def create_enterprize_controller(
     request: 'CreateEnterprizeRequest',
     profile: 'Profile' = Depends(get_super_admin_profile),
     repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        enterprize = create_enterprize(name=request.name, subdomain=request.subdomain, repository=repository)
+        enterprize = create_enterprize(
+            name=request.name, subdomain=request.subdomain, repository=repository, unit_of_work=unit_of_work
+        )
     except EnterprizeExists as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
 
@@ -102,50 +125,70 @@ def update_profile_controller(
     request: 'UpdateProfileRequest',
     profile: 'Profile' = Depends(get_profile),
     user_repo: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     cleaned_request = request.dict(exclude_unset=True)
 
-    profile = update_profile(username=profile.user.username, repository=user_repo, **cleaned_request)
+    profile = update_profile(
+        username=profile.user.username, repository=user_repo, unit_of_work=unit_of_work, **cleaned_request
+    )
 
     return UpdateProfileResponse.from_orm(profile)
 
 
 @users_router.post(
     path='/profile/photo',
-    status_code=status.HTTP_201_CREATED,
+    status_code=status.HTTP_202_ACCEPTED,
     response_model=UploadPhotoResponse,
     name='Upload user photo',
     tags=['profiles'],
 )
 def upload_photo_controller(
     photo: UploadFile = File(...),
-    authenticated_user: User = Depends(get_profile),
+    profile: 'Profile' = Depends(get_profile),
     user_repo: ProfileRepository = Depends(profile_database),
+    pipeline: 'PhotoPipeline' = Depends(photo_processing_pipeline),
 ):
+    # only the header is read here, nothing is decoded before the limits are known to hold
     try:
-        Image.open(fp=photo.file)
-    except UnidentifiedImageError:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail='File probably not a valid image.',
+        validate_photo(
+            photo=photo.file,
+            max_size_in_bytes=configuration.PHOTO_MAX_SIZE_IN_BYTES,
+            max_pixels=configuration.PHOTO_MAX_PIXELS,
+            max_dimension=configuration.PHOTO_MAX_DIMENSION,
         )
-    finally:
-        photo.file.seek(0)
+    except PhotoTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=exc.message)
+    except InvalidPhoto as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.message)
 
-    photo_url = upload_user_photo(username=authenticated_user.username, photo=photo, repository=user_repo)
+    # resizing and uploading happen on the pipeline workers, photo_url is updated once they are done
+    # and only if the photo is still the one this upload replaces
+    replaces_version = user_repo.retrieve_photo_version(reference=profile.reference)
+    pipeline.accept(reference=profile.reference, file_obj=photo.file, replaces_version=replaces_version)
 
-    return UploadPhotoResponse(photo_url=photo_url)
+    return UploadPhotoResponse()
 
 
 @users_router.delete(
     path='/profile/photo', status_code=status.HTTP_204_NO_CONTENT, name='Delete user photo', tags=['profiles']
 )
 def delete_uploaded_photo_controller(
-    authenticated_user: User = Depends(get_profile), user_repo: ProfileRepository = Depends(profile_database)
+    authenticated_user: User = Depends(get_profile),
+    user_repo: ProfileRepository = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
+    blob_store: 'AbstractBlobStore' = Depends(blob_storage),
+    cache: 'PhotoCache' = Depends(photo_disk_cache),
 ):
-    delete_user_photo(username=authenticated_user.username, repository=user_repo)
+    delete_user_photo(
+        username=authenticated_user.username,
+        blob_store=blob_store,
+        photo_cache=cache,
+        repository=user_repo,
+        unit_of_work=unit_of_work,
+    )
 
-    return Response()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @users_router.get(
@@ -156,10 +199,17 @@ def delete_uploaded_photo_controller(
     tags=['newsfeed'],
 )
 def list_posts_controller(
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
     profile: 'Profile' = Depends(get_profile),
     post_repo: 'PostRepository' = Depends(post_database),
 ):
-    posts = post_repo.list_for_enterprize(enterprize=profile.enterprize)
+    try:
+        posts = list_posts_by_enterprize(
+            enterprize=profile.enterprize, repository=post_repo, limit=limit, before=before
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
 
     posts_response = [
         Post(
@@ -172,7 +222,10 @@ def list_posts_controller(
         for post in posts
         if post
     ]
-    return ListPostsResponse(posts=posts_response)
+    next_cursor = (
+        encode_cursor(created=posts[-1].created, reference=posts[-1].reference) if len(posts) == limit else None
+    )
+    return ListPostsResponse(posts=posts_response, next_cursor=next_cursor)
 
 
 @users_router.get(
@@ -212,9 +265,12 @@ def create_question_controller(
     request: 'CreateQuestionRequest',
     profile: 'Profile' = Depends(get_profile),
     post_repo: 'PostRepository' = Depends(post_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     question_content = PostContent(title=request.title, body=request.body)
-    question = post_question(author=profile, content=question_content, repository=post_repo, tags=request.tags)
+    question = post_question(
+        author=profile, content=question_content, repository=post_repo, tags=request.tags, unit_of_work=unit_of_work
+    )
 
     return CreateQuestionResponse(
         id=question.reference, author=question.author.user.username, tags=question.tags, created=question.created
@@ -233,11 +289,14 @@ def create_answer_controller(
     request: 'CreateAnswerRequest',
     profile: 'Profile' = Depends(get_profile),
     post_repo: 'PostRepository' = Depends(post_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     answer_content = PostContent(title=None, body=request.body)
 
     question = post_repo.retrieve_question(reference=question_id)
-    answer = create_answer(author=profile, content=answer_content, question=question, repository=post_repo)
+    answer = create_answer(
+        author=profile, content=answer_content, question=question, repository=post_repo, unit_of_work=unit_of_work
+    )
 
     return CreateAnswerResponse(
         id=answer.reference,
@@ -254,10 +313,10 @@ def create_answer_controller(
     name='List all Q&A questions',
     tags=['Q&A'],
 )
-def list_questions_controller(
-    profile: 'Profile' = Depends(get_profile), post_repo: 'PostRepository' = Depends(post_database)
+async def list_questions_controller(
+    profile: 'Profile' = Depends(async_get_profile), post_repo: 'AsyncPostRepository' = Depends(async_post_database)
 ):
-    questions = post_repo.list_questions_for_enterprize(enterprize=profile.enterprize)
+    questions = await post_repo.list_questions_for_enterprize(enterprize=profile.enterprize)
 
     questions_response = [
         Question(
@@ -285,10 +344,12 @@ def list_questions_controller(
     name='Retrieve Q&A question',
     tags=['Q&A'],
 )
-def retrieve_question_controller(
-    question_id: str, profile: 'Profile' = Depends(get_profile), post_repo: 'PostRepository' = Depends(post_database)
+async def retrieve_question_controller(
+    question_id: str,
+    profile: 'Profile' = Depends(async_get_profile),
+    post_repo: 'AsyncPostRepository' = Depends(async_post_database),
 ):
-    question = post_repo.retrieve_question(reference=question_id)
+    question = await post_repo.retrieve_question(reference=question_id)
 
     return RetrieveQuestionResponse(
         id=question.reference,
@@ -310,10 +371,10 @@ def retrieve_question_controller(
     name='List all events',
     tags=['events'],
 )
-def list_events_controller(
-    profile: 'Profile' = Depends(get_profile),
-    event_repo: 'EventRepository' = Depends(event_database),
+async def list_events_controller(
+    profile: 'Profile' = Depends(async_get_profile),
+    event_repo: 'AsyncEventRepository' = Depends(async_event_database),
 ):
-    events = list_events_by_enterprize(enterprize=profile.enterprize, repository=event_repo)
+    events = await event_repo.list_events_for_enterprize(enterprize=profile.enterprize)
 
     return ListEventsResponse(events=[EventSerializer.from_orm(event) for event in events])
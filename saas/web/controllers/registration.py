@@ -5,13 +5,14 @@ from saas.domain.exceptions import UserAlreadyActive, EnterprizeDoesNotExist, Us
 from saas.domain.users import UserCredentials
 from saas.service.exceptions import InvalidActivationCode
 from saas.service.registration import register_user, activate_profile
+from saas.service.unit_of_work import AbstractUnitOfWork
 from saas.web.serializers import (
     RegisterUserRequest,
     RegisterUserResponse,
     ActivateUserResponse,
     ActicateUserRequest,
 )
-from saas.web.session import profile_database
+from saas.web.session import profile_database, database_unit_of_work
 
 registration_router = APIRouter()
 
@@ -23,19 +24,21 @@ registration_router = APIRouter()
     name='Register new user',
     tags=['registration'],
 )
-def register_user_controller(
+async def register_user_controller(
     request: 'RegisterUserRequest',
     repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     credentials = UserCredentials(username=request.email, plain_password=request.password)
     # full_name = FullName(first_name=request.first_name, last_name=request.last_name)
     enterprize_subdomain = request.enterprize_subdomain
 
     try:
-        user = register_user(
+        user = await register_user(
             credentials=credentials,
             enterprize_subdomain=enterprize_subdomain,
             repository=repository,
+            unit_of_work=unit_of_work,
         )
     except (UsernameExists, EnterprizeDoesNotExist, UserInactive) as exc:
         raise HTTPException(
@@ -54,10 +57,14 @@ def register_user_controller(
     tags=['registration'],
 )
 def activate_user_controller(
-    request: 'ActicateUserRequest', repository: 'ProfileRepository' = Depends(profile_database)
+    request: 'ActicateUserRequest',
+    repository: 'ProfileRepository' = Depends(profile_database),
+    unit_of_work: 'AbstractUnitOfWork' = Depends(database_unit_of_work),
 ):
     try:
-        user = activate_profile(profile_activation_token=request.activation_code, repository=repository)
+        user = activate_profile(
+            profile_activation_token=request.activation_code, repository=repository, unit_of_work=unit_of_work
+        )
 
     except UserAlreadyActive as exc:
         raise HTTPException(
@@ -0,0 +1,72 @@
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope['path']) if scope['type'] == 'http' else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        # an honest client announces the size, it is turned away before a single byte of the body is read
+        content_length = Headers(scope=scope).get('content-length', '')
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope=scope, receive=receive, send=send, limit=limit)
+            return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+
+            if rejected:
+                return {'type': 'http.disconnect'}
+
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    if response_started:
+                        raise RequestTooLarge()
+
+                    # the 413 goes out from here, whatever the app makes of the disconnect (fastapi turns a failed
+                    # form parse into a 400) is never sent
+                    await self._reject(scope=scope, receive=receive, send=send, limit=limit)
+                    rejected = True
+                    return {'type': 'http.disconnect'}
+
+            return message
+
+        async def tracked_send(message: Message):
+            nonlocal response_started
+
+            if rejected:
+                return
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, limit: int):
+        response = JSONResponse(
+            status_code=413, content={'detail': f'Request body exceeds the limit of {limit} bytes.'}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,118 @@
+import os
+import re
+from typing import BinaryIO, Optional
+
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$', re.IGNORECASE)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    # multiple ranges would need a multipart body, anything but a single range serves the whole file
+    match = BYTE_RANGE.match(range_header.strip())
+    if match is None or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+
+    end = int(last) if last else size - 1
+
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        media_type: str,
+        headers: dict[str, str],
+        range_header: Optional[str] = None,
+        if_range: Optional[str] = None,
+        background: Optional['BackgroundTask'] = None,
+    ):
+        self.file = file
+        self.media_type = media_type
+        self.background = background
+        self.body = b''
+
+        size = os.fstat(file.fileno()).st_size
+        self.offset, self.count = 0, size
+        self.status_code = 200
+        headers = dict(headers, **{'accept-ranges': 'bytes', 'content-type': media_type})
+
+        # a range only applies to the representation the client already has part of
+        if range_header is not None and (if_range is None or if_range == headers.get('ETag')):
+            try:
+                byte_range = parse_byte_range(range_header=range_header, size=size)
+            except RangeNotSatisfiable:
+                self.status_code, self.count = 416, 0
+                headers['content-range'] = f'bytes */{size}'
+            else:
+                if byte_range is not None:
+                    start, end = byte_range
+                    self.status_code, self.offset, self.count = 206, start, end - start + 1
+                    headers['content-range'] = f'bytes {start}-{end}/{size}'
+
+        headers['content-length'] = str(self.count)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+
+            if self.count == 0 or scope.get('method') == 'HEAD':
+                await send({'type': 'http.response.body', 'body': b''})
+            elif 'http.response.zerocopysend' in scope.get('extensions', {}):
+                # servers implementing the extension hand the file descriptor to sendfile, no bytes pass through python
+                await send(
+                    {
+                        'type': 'http.response.zerocopysend',
+                        'file': self.file,
+                        'offset': self.offset,
+                        'count': self.count,
+                    }
+                )
+            else:
+                await self._send_chunks(send=send)
+        finally:
+            self.file.close()
+
+        if self.background is not None:
+            await self.background()
+
+    async def _send_chunks(self, send: Send):
+        position, remaining = self.offset, self.count
+
+        while remaining > 0:
+            chunk = await run_in_threadpool(os.pread, self.file.fileno(), min(self.chunk_size, remaining), position)
+            if not chunk:
+                break
+
+            position += len(chunk)
+            remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+
+        if remaining > 0:
+            await send({'type': 'http.response.body', 'body': b''})
@@ -1,12 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from saas.database.models import ProfileRepository
+from saas.database.models import ProfileRepository, AsyncProfileRepository
 from saas.domain.exceptions import UsernameDoesNotExist
 from saas.domain.users import Profile
 from saas.service.authentication import decode_access_token
 from saas.service.exceptions import InvalidToken
-from saas.web.session import profile_database
+from saas.web.session import profile_database, async_profile_database
 
 oauth2 = OAuth2PasswordBearer(tokenUrl='/users/actions/login')
 
@@ -28,6 +28,23 @@ def get_profile(
         return profile
 
 
+async def async_get_profile(
+    access_token: str = Depends(oauth2),
+    user_repo: 'AsyncProfileRepository' = Depends(async_profile_database),
+) -> 'Profile':
+    try:
+        decoded_username = decode_access_token(access_token=access_token)
+        profile = await user_repo.retrieve_by_username(username=decoded_username)
+
+    except (InvalidToken, UsernameDoesNotExist) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=exc.message,
+        )
+    else:
+        return profile
+
+
 def get_admin_profile(profile: 'Profile' = Depends(get_profile)) -> 'Profile':
     if not (profile.user.is_admin or profile.user.is_super_admin):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin permission required.')
@@ -1,4 +1,5 @@
 import datetime
+import enum
 from typing import Optional, Any
 
 from pydantic import BaseModel, Field, EmailStr, validator
@@ -47,6 +48,12 @@ class AdminProfileSerializer(ProfileSerializer):
     exit_date: Optional[datetime.date]
 
 
+@enum.unique
+class ExportFormat(str, enum.Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
 class RegisterUserRequest(BaseModelWithValidator):
     enterprize_subdomain: str
     email: EmailStr
@@ -119,8 +126,29 @@ class InviteUserResponse(InviteUserRequest):
     pass
 
 
+class InvitationStatus(str, enum.Enum):
+    invited = 'invited'
+    rejected = 'rejected'
+    invalid = 'invalid'
+    duplicate = 'duplicate'
+
+
+class BulkInviteUsersRequest(BaseModelWithValidator):
+    emails: list[str] = Field(..., min_items=1)
+
+
+class BulkInvitationResult(BaseModelWithValidator):
+    email: str
+    status: InvitationStatus
+
+
+class BulkInviteUsersResponse(BaseModelWithValidator):
+    invited: int
+    results: list[BulkInvitationResult]
+
+
 class UploadPhotoResponse(BaseModelWithValidator):
-    photo_url: str
+    status: str = 'processing'
 
 
 class CreatePostRequest(BaseModelWithValidator):
@@ -165,6 +193,7 @@ class ListEventsResponse(BaseModelWithValidator):
 
 class ListProfilesResponse(BaseModelWithValidator):
     profiles: list[AdminProfileSerializer]
+    next_cursor: Optional[str]
 
 
 class Post(BaseModelWithValidator):
@@ -177,6 +206,7 @@ class Post(BaseModelWithValidator):
 
 class ListPostsResponse(BaseModelWithValidator):
     posts: Optional[list[Post]]
+    next_cursor: Optional[str]
 
 
 class RetrievePostResponse(Post):
@@ -293,3 +323,16 @@ class AdminUpdateProfileResponse(AdminUpdateProfileRequest):
 
     class Config:
         orm_mode = True
+
+
+class DatabasePoolStatisticsResponse(BaseModelWithValidator):
+    pool_class: str
+    checkouts: int
+    timeouts: int
+    average_wait_in_ms: float
+    max_wait_in_ms: float
+    size: Optional[int]
+    checked_in: Optional[int]
+    checked_out: Optional[int]
+    overflow: Optional[int]
+    max_overflow: Optional[int]
@@ -1,18 +1,33 @@
 from fastapi import Depends
 
-from saas.database.models import ProfileRepository, PostRepository, EventRepository
+from saas.database.models import (
+    ProfileRepository,
+    PostRepository,
+    EventRepository,
+    AsyncProfileRepository,
+    AsyncPostRepository,
+    AsyncEventRepository,
+)
 from saas.database.session import DatabaseSession
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+from saas.service.photos import PhotoCache, PhotoPipeline, photo_cache, photo_pipeline
+from saas.service.storage import AbstractBlobStore, blob_store
+from saas.web.ws.hub import BroadcastHub, broadcast_hub
 
 
 def database_session():
     session = DatabaseSession()
     try:
-        return session
+        yield session
 
     finally:
         session.close()
 
 
+def database_unit_of_work(session: DatabaseSession = Depends(database_session)):
+    return SqlAlchemyUnitOfWork(session=session)
+
+
 def profile_database(session: DatabaseSession = Depends(database_session)):
     return ProfileRepository(session=session)
 
@@ -23,3 +38,32 @@ def post_database(session: DatabaseSession = Depends(database_session)):
 
 def event_database(session: DatabaseSession = Depends(database_session)):
     return EventRepository(session=session)
+
+
+# the async repositories wrap the request's sync repositories, so both share one session and one set of overrides
+async def async_profile_database(repository: 'ProfileRepository' = Depends(profile_database)):
+    return AsyncProfileRepository(repository=repository)
+
+
+async def async_post_database(repository: 'PostRepository' = Depends(post_database)):
+    return AsyncPostRepository(repository=repository)
+
+
+async def async_event_database(repository: 'EventRepository' = Depends(event_database)):
+    return AsyncEventRepository(repository=repository)
+
+
+def photo_processing_pipeline() -> 'PhotoPipeline':
+    return photo_pipeline
+
+
+def photo_disk_cache() -> 'PhotoCache':
+    return photo_cache
+
+
+def blob_storage() -> 'AbstractBlobStore':
+    return blob_store
+
+
+def websocket_broadcast() -> 'BroadcastHub':
+    return broadcast_hub
@@ -1,19 +1,50 @@
 import asyncio
+from typing import AsyncIterator
 
-from fastapi import APIRouter, WebSocket
-from websockets.exceptions import ConnectionClosedError
+from fastapi import APIRouter, Depends, WebSocket
+from websockets.exceptions import ConnectionClosed
+
+from saas.web.session import websocket_broadcast
+from .hub import BroadcastHub, Subscription
 
 websocket_router = APIRouter()
 
+TIMER_INTERVAL_IN_SECONDS = 1
+
+
+async def timer() -> AsyncIterator[str]:
+    ticks = 0
+    while True:
+        await asyncio.sleep(TIMER_INTERVAL_IN_SECONDS)
+        ticks += 1
+        yield str(ticks)
+
 
 @websocket_router.websocket('/timer')
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, hub: 'BroadcastHub' = Depends(websocket_broadcast)):
     await websocket.accept()
 
-    timer = 0
+    subscription = hub.subscribe(topic='timer', producer=timer)
+    sender = asyncio.ensure_future(_send(websocket=websocket, subscription=subscription))
+    try:
+        await _wait_for_disconnect(websocket=websocket)
+    finally:
+        sender.cancel()
+        hub.unsubscribe(subscription=subscription)
+
+
+async def _send(websocket: 'WebSocket', subscription: 'Subscription'):
     try:
-        while timer := timer + 1:
-            await asyncio.sleep(1)
-            await websocket.send_text(str(timer))
-    except ConnectionClosedError:
-        await websocket.close()
+        async for message in subscription:
+            await websocket.send_text(message)
+
+        await websocket.close(code=subscription.close_code)
+    except (ConnectionClosed, OSError):
+        # uvicorn reports a client that went away mid send as an OSError
+        pass
+
+
+async def _wait_for_disconnect(websocket: 'WebSocket'):
+    # clients only listen, anything they send is discarded
+    while (await websocket.receive())['type'] != 'websocket.disconnect':
+        pass
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Optional
+
+from starlette import status
+
+from saas.core.config import configuration
+
+logger = logging.getLogger(__name__)
+
+Producer = Callable[[], AsyncIterator[str]]
+
+HEARTBEAT_MESSAGE = 'heartbeat'
+
+
+class Subscription:
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.close_code: Optional[int] = None
+        # the handshake just happened, the first heartbeat is due one full interval later
+        self.idle = False
+
+        self._queue: 'asyncio.Queue[Optional[str]]' = asyncio.Queue(maxsize=queue_size)
+
+    @property
+    def closed(self) -> bool:
+        return self.close_code is not None
+
+    def deliver(self, message: str) -> bool:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+
+        self.idle = False
+        return True
+
+    def close(self, code: int):
+        if self.closed:
+            return
+
+        # whatever is still queued is discarded, the sentinel wakes the sender up so it can close the socket
+        self.close_code = code
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while (message := await self._queue.get()) is not None:
+            yield message
+
+
+class BroadcastHub:
+    def __init__(self, queue_size: int, heartbeat_interval_in_seconds: float):
+        self.queue_size = queue_size
+        self.heartbeat_interval_in_seconds = heartbeat_interval_in_seconds
+
+        self._subscriptions: dict[str, set['Subscription']] = {}
+        self._producers: dict[str, 'asyncio.Task'] = {}
+        self._heartbeat: Optional['asyncio.Task'] = None
+
+    def subscribe(self, topic: str, producer: 'Producer') -> 'Subscription':
+        subscription = Subscription(topic=topic, queue_size=self.queue_size)
+        self._subscriptions.setdefault(topic, set()).add(subscription)
+
+        # one producer per topic, however many sockets listen to it
+        if topic not in self._producers:
+            self._producers[topic] = asyncio.ensure_future(self._produce(topic=topic, producer=producer))
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.ensure_future(self._send_heartbeats())
+
+        return subscription
+
+    def unsubscribe(self, subscription: 'Subscription'):
+        subscriptions = self._subscriptions.get(subscription.topic, set())
+        subscriptions.discard(subscription)
+
+        if not subscriptions:
+            self._subscriptions.pop(subscription.topic, None)
+            producer = self._producers.pop(subscription.topic, None)
+            if producer is not None:
+                producer.cancel()
+
+        if not self._subscriptions and self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def publish(self, topic: str, message: str):
+        for subscription in list(self._subscriptions.get(topic, ())):
+            if not subscription.deliver(message=message):
+                # a consumer that cannot keep up is disconnected rather than buffered or waited for,
+                # so one slow socket never delays or bloats the broadcast for everybody else
+                logger.warning('Dropping slow consumer of %s after %s queued messages.', topic, self.queue_size)
+                self._drop(subscription=subscription, code=status.WS_1013_TRY_AGAIN_LATER)
+
+    def subscribers(self, topic: str) -> int:
+        return len(self._subscriptions.get(topic, ()))
+
+    async def close(self):
+        tasks = [*self._producers.values(), *([self._heartbeat] if self._heartbeat is not None else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for topic in list(self._subscriptions):
+            self._close_topic(topic=topic, code=status.WS_1001_GOING_AWAY)
+
+        self._producers.clear()
+        self._heartbeat = None
+
+    async def _produce(self, topic: str, producer: 'Producer'):
+        try:
+            async for message in producer():
+                self.publish(topic=topic, message=message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Producer of %s failed.', topic)
+
+        # a topic without a producer would leave its sockets waiting forever
+        if self._producers.get(topic) is asyncio.current_task():
+            del self._producers[topic]
+        self._close_topic(topic=topic, code=status.WS_1011_INTERNAL_ERROR)
+
+    async def _send_heartbeats(self):
+        # one timer for every socket, only those that were sent nothing since the last beat get one
+        while True:
+            await asyncio.sleep(self.heartbeat_interval_in_seconds)
+
+            for subscriptions in list(self._subscriptions.values()):
+                for subscription in list(subscriptions):
+                    if not subscription.idle:
+                        subscription.idle = True
+                    elif not subscription.deliver(message=HEARTBEAT_MESSAGE):
+                        self._drop(subscription=subscription, code=status.WS_1013_TRY_AGAIN_LATER)
+
+    def _close_topic(self, topic: str, code: int):
+        for subscription in list(self._subscriptions.get(topic, ())):
+            self._drop(subscription=subscription, code=code)
+
+    def _drop(self, subscription: 'Subscription', code: int):
+        subscription.close(code=code)
+        self.unsubscribe(subscription=subscription)
+
+
+def create_broadcast_hub() -> 'BroadcastHub':
+    return BroadcastHub(
+        queue_size=configuration.WEBSOCKET_SEND_QUEUE_SIZE,
+        heartbeat_interval_in_seconds=configuration.WEBSOCKET_HEARTBEAT_INTERVAL_IN_SECONDS,
+    )
+
+
+broadcast_hub = create_broadcast_hub()
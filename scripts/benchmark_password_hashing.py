@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from saas.domain.services import create_hashed_password
+from saas.service.authentication import PasswordHasher
+
+LOGINS = 200
+
+PLAIN_PASSWORD = 'benchmark-password'
+
+EXECUTORS = {
+    'thread': lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing'),
+    'process': lambda workers: ProcessPoolExecutor(max_workers=workers),
+}
+
+
+async def login_storm(password_hasher: 'PasswordHasher', password: str, logins: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(password_hasher.async_verify(plain_password=PLAIN_PASSWORD, password=password) for _ in range(logins))
+    )
+
+    return time.perf_counter() - start
+
+
+def measure(executor_name: str, workers: int, password: str, logins: int) -> float:
+    # every login is admitted, the benchmark measures throughput rather than backpressure
+    password_hasher = PasswordHasher(executor=EXECUTORS[executor_name](workers), max_pending=logins)
+    try:
+        # warm the workers up, processes pay their import cost on the first task
+        asyncio.run(login_storm(password_hasher=password_hasher, password=password, logins=workers))
+        elapsed = asyncio.run(login_storm(password_hasher=password_hasher, password=password, logins=logins))
+    finally:
+        password_hasher.shutdown()
+
+    return logins / elapsed
+
+
+def run(logins: int):
+    password = create_hashed_password(plain_password=PLAIN_PASSWORD)
+    cores = os.cpu_count()
+
+    start = time.perf_counter()
+    for _ in range(10):
+        create_hashed_password(plain_password=PLAIN_PASSWORD)
+    print(f'single argon2 hash: {(time.perf_counter() - start) / 10 * 1_000:.1f} ms, {cores} cores\n')
+
+    print(f'{"executor":>10} {"workers":>8} {"logins/s":>10} {"logins/s/core":>14}')
+
+    for executor_name in EXECUTORS:
+        for workers in sorted({1, max(cores // 2, 1), cores}):
+            throughput = measure(executor_name=executor_name, workers=workers, password=password, logins=logins)
+            print(f'{executor_name:>10} {workers:>8} {throughput:>10.1f} {throughput / workers:>14.1f}')
+
+
+if __name__ == '__main__':
+    run(logins=int(sys.argv[1]) if len(sys.argv) > 1 else LOGINS)
@@ -0,0 +1,106 @@
+import sys
+import time
+import uuid
+
+from sqlalchemy import event
+
+from saas.database.models import PostRepository
+from saas.database.session import create_session, database_engine
+from saas.domain.posts import Question, Answer, PostContent
+from saas.domain.users import Enterprize, Profile, UserCredentials
+
+QUESTIONS = 1_000
+ANSWERS_PER_QUESTION = 10
+AUTHORS = 50
+
+
+def create_questions(session, questions_count: int, answers_count: int) -> 'Enterprize':
+    enterprize = Enterprize(name='Benchmark', subdomain=f'benchmark-{uuid.uuid4().hex[:8]}')
+
+    authors = []
+    for index in range(AUTHORS):
+        author = Profile(enterprize=enterprize)
+        author.register_user(
+            credentials=UserCredentials(username=f'{enterprize.subdomain}-{index}@example.com', plain_password=None)
+        )
+        authors.append(author)
+
+    for index in range(questions_count):
+        question = Question(author=authors[index % AUTHORS], content=PostContent(title='Title', body='Text'))
+        for answer_index in range(answers_count):
+            Answer(
+                author=authors[(index + answer_index) % AUTHORS],
+                question=question,
+                content=PostContent(title=None, body='Text'),
+            )
+
+    session.add(enterprize)
+    session.flush()
+
+    return enterprize
+
+
+def list_questions_lazily(session, enterprize: 'Enterprize') -> list['Question']:
+    profile_ids = session.query(Profile.id).filter_by(enterprize_id=enterprize.id)
+
+    return list(
+        session.query(Question)
+        .filter(Question.author_id.in_(profile_ids), Question.parent_id.is_(None))
+        .order_by(Question.created.desc())
+    )
+
+
+def serialize(questions: list['Question']):
+    return [
+        (
+            question.reference,
+            question.author.user.username,
+            [(answer.reference, answer.author.user.username) for answer in question.answers],
+        )
+        for question in questions
+    ]
+
+
+def measure(session, list_questions) -> tuple[float, int]:
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args)
+
+    session.expunge_all()
+    event.listen(database_engine, 'before_cursor_execute', count_statement)
+    try:
+        start = time.perf_counter()
+        serialize(questions=list_questions())
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(database_engine, 'before_cursor_execute', count_statement)
+
+    return elapsed * 1_000, len(statements)
+
+
+def run(questions_count: int, answers_count: int):
+    session = create_session()
+
+    try:
+        enterprize = create_questions(session=session, questions_count=questions_count, answers_count=answers_count)
+        repository = PostRepository(session=session)
+
+        lazy = measure(session=session, list_questions=lambda: list_questions_lazily(session, enterprize))
+        eager = measure(session=session, list_questions=lambda: repository.list_questions_for_enterprize(enterprize))
+    finally:
+        session.rollback()
+        session.close()
+
+    print(f'{questions_count} questions, {answers_count} answers each')
+    print(f'{"loading":>10} {"time (ms)":>12} {"statements":>12}')
+    print(f'{"lazy":>10} {lazy[0]:>12.1f} {lazy[1]:>12}')
+    print(f'{"eager":>10} {eager[0]:>12.1f} {eager[1]:>12}')
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    run(
+        questions_count=arguments[0] if arguments else QUESTIONS,
+        answers_count=arguments[1] if len(arguments) > 1 else ANSWERS_PER_QUESTION,
+    )
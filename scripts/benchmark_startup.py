@@ -0,0 +1,59 @@
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RUNS = 5
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# every target runs in a fresh interpreter, so import and mapper configuration cost are measured cold
+TARGETS = {
+    'web app': '''
+import time
+start = time.perf_counter()
+from saas.web.app import web_app
+from saas.database.metadata import start_mappers
+start_mappers()
+print(time.perf_counter() - start)
+''',
+    'cli script': '''
+import time
+start = time.perf_counter()
+from saas.database.session import create_session
+create_session().close()
+print(time.perf_counter() - start)
+''',
+    '1000 sessions': '''
+import time
+from saas.database.session import create_session
+create_session().close()
+start = time.perf_counter()
+for _ in range(1_000):
+    create_session().close()
+print(time.perf_counter() - start)
+''',
+}
+
+
+def measure(code: str, runs: int) -> float:
+    timings = []
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=PROJECT_ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+
+    return statistics.median(timings) * 1_000
+
+
+def run(runs: int):
+    print(f'{"target":>15} {"median (ms)":>12}')
+
+    for name, code in TARGETS.items():
+        print(f'{name:>15} {measure(code=code, runs=runs):>12.1f}')
+
+
+if __name__ == '__main__':
+    run(runs=int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,57 @@
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from saas.database.session import database_engine
+
+SIZES = (100_000, 1_000_000)
+LOOKUPS = 500
+
+LOOKUP_QUERY = text('SELECT id FROM benchmark_users WHERE lower(username) = :username')
+
+
+def create_users_table(connection, size: int):
+    connection.execute(text('DROP TABLE IF EXISTS benchmark_users'))
+    connection.execute(text('CREATE TEMPORARY TABLE benchmark_users (id serial PRIMARY KEY, username varchar UNIQUE)'))
+    connection.execute(
+        text(
+            'INSERT INTO benchmark_users (username) '
+            "SELECT 'User' || n || '@Example.com' FROM generate_series(1, :size) AS n"
+        ),
+        size=size,
+    )
+    connection.execute(text('ANALYZE benchmark_users'))
+
+
+def measure_lookups(connection, size: int) -> float:
+    timings = []
+
+    for _ in range(LOOKUPS):
+        username = f'user{random.randint(1, size)}@example.com'
+        start = time.perf_counter()
+        connection.execute(LOOKUP_QUERY, username=username).fetchall()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1_000
+
+
+def run(sizes: tuple[int, ...]):
+    print(f'{"users":>10} {"seq scan (ms)":>15} {"lower() index (ms)":>20}')
+
+    with database_engine.connect() as connection:
+        for size in sizes:
+            create_users_table(connection=connection, size=size)
+            without_index = measure_lookups(connection=connection, size=size)
+
+            connection.execute(text('CREATE UNIQUE INDEX ON benchmark_users (lower(username))'))
+            connection.execute(text('ANALYZE benchmark_users'))
+            with_index = measure_lookups(connection=connection, size=size)
+
+            print(f'{size:>10} {without_index:>15.3f} {with_index:>20.3f}')
+
+
+if __name__ == '__main__':
+    run(sizes=tuple(int(size) for size in sys.argv[1:]) or SIZES)
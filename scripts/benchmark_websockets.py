@@ -0,0 +1,118 @@
+import asyncio
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI
+from websockets.asyncio.client import connect
+
+from saas.web.ws.endpoints import websocket_router
+from saas.web.ws.hub import HEARTBEAT_MESSAGE
+
+SOCKETS = 10_000
+TICKS = 5
+CONNECT_CONCURRENCY = 200
+
+HOST, PORT = '127.0.0.1', 8765
+
+
+def raise_open_files_limit():
+    # every socket is a file descriptor on both ends
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def serve():
+    raise_open_files_limit()
+
+    app = FastAPI()
+    app.include_router(router=websocket_router)
+
+    # protocol pings are left to the hub heartbeats, a client process busy with thousands of sockets
+    # would otherwise miss a pong deadline and have the server close it mid measurement
+    uvicorn.run(app, host=HOST, port=PORT, workers=1, log_level='warning', backlog=4096, ws_ping_interval=None)
+
+
+def cpu_time_in_seconds(pid: int) -> float:
+    fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def resident_memory_in_mb(pid: int) -> float:
+    for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) / 1024
+
+    return float('nan')
+
+
+async def open_sockets(sockets: int) -> list:
+    slots = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def open_socket():
+        async with slots:
+            # no compression and no client pings, the server side is what is measured
+            return await connect(f'ws://{HOST}:{PORT}/timer', compression=None, ping_interval=None, open_timeout=60)
+
+    return await asyncio.gather(*(open_socket() for _ in range(sockets)))
+
+
+async def receive_ticks(connections: list, first: int, ticks: int) -> list[list[float]]:
+    async def receive(connection) -> dict[int, float]:
+        arrivals = {}
+        while len(arrivals) < ticks:
+            message = await connection.recv()
+            if message != HEARTBEAT_MESSAGE and int(message) >= first:
+                arrivals[int(message)] = time.perf_counter()
+        return arrivals
+
+    arrivals = await asyncio.gather(*(receive(connection) for connection in connections))
+    return [[received[tick] for received in arrivals] for tick in range(first, first + ticks)]
+
+
+async def run(sockets: int, ticks: int, server_pid: int):
+    idle_memory = resident_memory_in_mb(pid=server_pid)
+
+    start = time.perf_counter()
+    connections = await open_sockets(sockets=sockets)
+    print(f'opened {sockets} sockets in {time.perf_counter() - start:.1f} s')
+
+    # every tick is one shared counter, ticks buffered while the others were still connecting are skipped
+    while (message := await connections[-1].recv()) == HEARTBEAT_MESSAGE:
+        pass
+    first = int(message) + 1
+    cpu_time = cpu_time_in_seconds(pid=server_pid)
+    arrivals = await receive_ticks(connections=connections, first=first, ticks=ticks)
+    cpu_time = cpu_time_in_seconds(pid=server_pid) - cpu_time
+    spreads = [(max(tick) - min(tick)) * 1_000 for tick in arrivals]
+
+    memory = resident_memory_in_mb(pid=server_pid)
+    print(f'every socket received ticks {first} to {first + ticks - 1}')
+    print(f'fan-out spread per tick: median {statistics.median(spreads):.0f} ms, max {max(spreads):.0f} ms')
+    print(f'server cpu per broadcast: {cpu_time / ticks * 1_000:.0f} ms')
+    print(f'server memory: {idle_memory:.0f} MB idle, {memory:.0f} MB with sockets')
+    print(f'per socket: {(memory - idle_memory) * 1024 / sockets:.1f} KB')
+
+    await asyncio.gather(*(connection.close() for connection in connections))
+
+
+def main(sockets: int, ticks: int):
+    raise_open_files_limit()
+
+    server = multiprocessing.Process(target=serve, daemon=True)
+    server.start()
+    try:
+        time.sleep(3)
+        asyncio.run(run(sockets=sockets, ticks=ticks, server_pid=server.pid))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    main(sockets=int(sys.argv[1]) if len(sys.argv) > 1 else SOCKETS, ticks=TICKS)
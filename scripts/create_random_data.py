@@ -1,56 +1,453 @@
+import argparse
+import csv
+import dataclasses
+import io
+import json
+import multiprocessing
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+import sqlalchemy
 from faker import Faker
+from passlib.hash import argon2
 
 from saas.core.config import configuration
-from saas.database.models import ProfileRepository, PostRepository
-from saas.database.session import create_session
+from saas.database.models import (
+    ProfileRepository,
+    PostRepository,
+    enterprizes,
+    profiles,
+    users,
+    posts,
+    qa_posts,
+    events,
+    system_event_logs,
+    enterprize_statistics,
+    enterprize_statistics_events,
+    SystemEvent,
+)
+from saas.database.session import create_session, database_engine
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
 from saas.domain.posts import PostContent
 from saas.domain.users import FullName, UserCredentials, Contact, Address, UserAvailability, Gender, LegalStatus
+from saas.domain.users.events import UserRegistered, UserActivated, UserEvents
 from saas.service.post import create_post
 from saas.service.profile import create_profile
 
-fake = Faker(locale='de_at')
-Faker.seed()
-
 gender = [element.value for element in list(Gender)]
 availability = [element.value for element in list(UserAvailability)]
 legal_status = [element.value for element in list(LegalStatus)]
 
-session = create_session()
-profile_repository = ProfileRepository(session=session)
-post_repository = PostRepository(session=session)
-enterprize = profile_repository.retrieve_enterprize(enterprize_subdomain='staging')
-admin = profile_repository.retrieve_by_username(username=configuration.SUPERADMIN_USERNAME)
+# bulk mode samples from small per tenant vocabularies, calling faker for every row would dominate the run time
+VOCABULARY_SIZE = 200
+NULL = '\\N'
+
+
+def seeding_password_hasher(arguments: 'argparse.Namespace'):
+    # every seeded user gets its own salted hash, at a cost low enough to hash every row,
+    # verification reads the parameters from the hash itself
+    return argon2.using(memory_cost=arguments.password_memory_cost, rounds=arguments.password_rounds, parallelism=1)
+
+
+def registration_payload(username: str) -> dict:
+    return dataclasses.asdict(UserRegistered(username=username, activation_code=''))
+
+
+def create_staging_data(profiles_count: int, posts_count: int, arguments: 'argparse.Namespace'):
+    fake = Faker(locale='de_at')
+    Faker.seed()
+
+    session = create_session()
+    profile_repository = ProfileRepository(session=session)
+    post_repository = PostRepository(session=session)
+    unit_of_work = SqlAlchemyUnitOfWork(session=session)
+    enterprize = profile_repository.retrieve_enterprize(enterprize_subdomain='staging')
+    admin = profile_repository.retrieve_by_username(username=configuration.SUPERADMIN_USERNAME)
+    password_hasher = seeding_password_hasher(arguments=arguments)
+
+    for _ in range(profiles_count):
+        full_name = FullName(first_name=fake.first_name(), last_name=fake.last_name())
+        credentials = UserCredentials(username=fake.company_email(), plain_password=None)
+        address = Address(street=fake.street_address(), zip_code=fake.postcode(), town=fake.city(), country='AT')
+        contact = Contact(address=address, phone_number=fake.phone_number())
+
+        profile = create_profile(repository=profile_repository, enterprize=enterprize, full_name=full_name)
+        profile.register_user(credentials=credentials)
+        profile.user.set_hashed_password(hashed_password=password_hasher.hash(arguments.password))
+        profile.activate()
+
+        profile.gender = fake.words(1, gender, True)[0]
+        profile.availability = fake.words(1, availability, True)[0]
+        profile.legal_status = fake.words(1, legal_status, True)[0]
+        profile.contact = contact
+        profile.birthdate = fake.date_of_birth(minimum_age=30, maximum_age=67)
+        profile.position = fake.job()
+
+        # logged as already delivered, seeded users must not be sent activation emails
+        registered = SystemEvent(
+            stream_reference=profile.reference, payload=registration_payload(credentials.username)
+        )
+        registered.mark_dispatched()
+
+        with unit_of_work:
+            profile_repository.save_profile(profile=profile)
+            session.add(registered)
+            if profile_repository.record_statistics_event(
+                stream_reference=profile.reference, event_name=UserEvents.UserRegistered.name
+            ):
+                profile_repository.increment_dashboard_statistics(enterprize_id=enterprize.id, total_registrations=1)
+            unit_of_work.commit()
+
+    for _ in range(posts_count):
+        post_content = PostContent(title=fake.sentence(6), body=fake.paragraph(20))
+        create_post(author=admin, content=post_content, repository=post_repository, unit_of_work=unit_of_work)
+
+    session.close()
+
+
+def tenant_sizes(users_count: int, tenants_count: int, distribution: str, pareto_alpha: float, seed: int) -> list[int]:
+    if distribution == 'uniform':
+        weights = [1.0] * tenants_count
+    else:
+        rng = random.Random(seed)
+        weights = [rng.paretovariate(pareto_alpha) for _ in range(tenants_count)]
+
+    # every tenant gets its admin, the remaining users are shared out by weight
+    spare = users_count - tenants_count
+    shares = [spare * weight / sum(weights) for weight in weights]
+    sizes = [1 + int(share) for share in shares]
+
+    # the users lost to rounding down go to the tenants with the largest remainders
+    remainders = sorted(range(tenants_count), key=lambda index: shares[index] - int(shares[index]), reverse=True)
+    for index in remainders[: users_count - sum(sizes)]:
+        sizes[index] += 1
+
+    return sizes
+
+
+class TenantGenerator:
+    def __init__(self, tenant_index: int, seed: int, arguments: 'argparse.Namespace'):
+        self.tenant_index = tenant_index
+        self.password_hasher = seeding_password_hasher(arguments=arguments)
+        self.arguments = arguments
+        self.rng = random.Random(f'{seed}-{tenant_index}')
+        self.now = datetime.combine(arguments.reference_date, datetime.min.time(), tzinfo=timezone.utc)
+        self.subdomain = f'{arguments.subdomain_prefix}-{seed}-{tenant_index}'
+
+        fake = Faker(locale='de_at')
+        fake.seed_instance(f'{seed}-{tenant_index}')
+        self.first_names = [fake.first_name() for _ in range(VOCABULARY_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(VOCABULARY_SIZE)]
+        self.streets = [fake.street_address() for _ in range(VOCABULARY_SIZE)]
+        self.towns = [(fake.postcode(), fake.city()) for _ in range(VOCABULARY_SIZE)]
+        self.jobs = [fake.job() for _ in range(VOCABULARY_SIZE)]
+        self.sentences = [fake.sentence(6) for _ in range(VOCABULARY_SIZE)]
+        self.paragraphs = [fake.paragraph(5) for _ in range(VOCABULARY_SIZE)]
+        self.company = fake.company()
+
+    def created(self) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(365 * 24 * 3_600))
+
+    def enterprize(self) -> dict:
+        return dict(reference=self.uuid(), name=self.company, subdomain=self.subdomain, created=self.created())
+
+    def profile(self, enterprize_id: int) -> dict:
+        postcode, town = self.rng.choice(self.towns)
+
+        return dict(
+            reference=self.uuid(),
+            created=self.created(),
+            first_name=self.rng.choice(self.first_names),
+            last_name=self.rng.choice(self.last_names),
+            birthdate=(self.now - timedelta(days=self.rng.randrange(30 * 365, 67 * 365))).date(),
+            gender=self.rng.choice(gender),
+            street=self.rng.choice(self.streets),
+            town=town,
+            zip_code=postcode,
+            country='AT',
+            position=self.rng.choice(self.jobs),
+            availability=self.rng.choice(availability),
+            enterprize_id=enterprize_id,
+        )
+
+    def user(self, profile_id: int, index: int) -> dict:
+        created = self.created()
+
+        return dict(
+            reference=self.uuid(),
+            created=created,
+            username=f'user{index}@{self.subdomain}.example.com',
+            password=self.password_hasher.hash(self.arguments.password),
+            is_active=True,
+            activated=created,
+            invited=None,
+            type='admin' if index == 0 else 'user',
+            profile_id=profile_id,
+        )
+
+    def system_events(self, profile: dict, user: dict) -> list[dict]:
+        payloads = (
+            registration_payload(username=user['username']),
+            dataclasses.asdict(UserActivated(username=user['username'])),
+        )
+
+        # logged as already delivered, seeded users must not be sent activation emails
+        return [
+            dict(
+                stream_reference=profile['reference'],
+                created=user['created'],
+                payload=payload,
+                dispatched_at=user['created'],
+                claimed_until=None,
+                attempts=0,
+                last_error=None,
+            )
+            for payload in payloads
+        ]
+
+    def news_post(self, author_id: int, enterprize_id: int) -> dict:
+        return dict(
+            reference=self.uuid(),
+            title=self.rng.choice(self.sentences),
+            body=self.rng.choice(self.paragraphs),
+            created=self.created(),
+            deleted=None,
+            author_id=author_id,
+            enterprize_id=enterprize_id,
+        )
+
+    def question(self, author_id: int, enterprize_id: int, parent_id: Optional[int] = None) -> dict:
+        return dict(
+            reference=self.uuid(),
+            title=self.rng.choice(self.sentences) if parent_id is None else None,
+            body=self.rng.choice(self.paragraphs),
+            created=self.created(),
+            deleted=None,
+            author_id=author_id,
+            parent_id=parent_id,
+            enterprize_id=enterprize_id,
+        )
+
+    def event(self, organizer_id: int, enterprize_id: int) -> dict:
+        starts_at = self.now + timedelta(hours=self.rng.randrange(-24 * 90, 24 * 90))
+
+        return dict(
+            reference=self.uuid(),
+            title=self.rng.choice(self.sentences),
+            body=self.rng.choice(self.paragraphs),
+            location=self.rng.choice(self.towns)[1],
+            starts_at=starts_at,
+            ends_at=starts_at + timedelta(hours=self.rng.randrange(1, 9)),
+            created=self.created(),
+            deleted=None,
+            organizer_id=organizer_id,
+            enterprize_id=enterprize_id,
+        )
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+
+def reserve_primary_keys(connection, table: 'sqlalchemy.Table', count: int) -> list[int]:
+    if connection.dialect.name != 'postgresql':
+        # sqlite has no sequences, but it also has a single writer that can hand out the ids itself
+        maximum = connection.execute(sqlalchemy.select([sqlalchemy.func.max(table.c.id)])).scalar() or 0
+        return list(range(maximum + 1, maximum + count + 1))
+
+    return [
+        primary_key
+        for primary_key, in connection.execute(
+            sqlalchemy.text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            table=table.name,
+            count=count,
+        )
+    ]
+
+
+def write_rows(connection, table: 'sqlalchemy.Table', rows: list[dict]):
+    if not rows:
+        return
+
+    if connection.dialect.name != 'postgresql':
+        connection.execute(table.insert(), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(value=row[column]) for column in columns])
+    buffer.seek(0)
+
+    cursor = connection.connection.cursor()
+    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buffer)
+
+
+def _copy_value(value):
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+
+    return value
+
+
+def batches(count: int, batch_size: int) -> Iterator[range]:
+    for start in range(0, count, batch_size):
+        yield range(start, min(start + batch_size, count))
+
+
+def seed_tenant(task: tuple[int, int, int, 'argparse.Namespace']) -> int:
+    tenant_index, size, seed, arguments = task
+    generator = TenantGenerator(tenant_index=tenant_index, seed=seed, arguments=arguments)
+
+    with database_engine.begin() as connection:
+        enterprize = generator.enterprize()
+        enterprize_id = connection.execute(enterprizes.insert().values(**enterprize)).inserted_primary_key[0]
+        profile_ids: list[int] = list()
+
+        for batch in batches(count=size, batch_size=arguments.batch_size):
+            ids = reserve_primary_keys(connection=connection, table=profiles, count=len(batch))
+            profile_rows = [dict(id=id, **generator.profile(enterprize_id=enterprize_id)) for id in ids]
+            user_rows = [generator.user(profile_id=id, index=index) for id, index in zip(ids, batch)]
+            write_rows(connection=connection, table=profiles, rows=profile_rows)
+            write_rows(connection=connection, table=users, rows=user_rows)
+            write_rows(
+                connection=connection,
+                table=system_event_logs,
+                rows=[
+                    system_event
+                    for profile, user in zip(profile_rows, user_rows)
+                    for system_event in generator.system_events(profile=profile, user=user)
+                ],
+            )
+            # the dashboard projection sees the registrations as if its handler had counted them
+            write_rows(
+                connection=connection,
+                table=enterprize_statistics_events,
+                rows=[
+                    dict(stream_reference=profile['reference'], event_name=UserEvents.UserRegistered.name)
+                    for profile in profile_rows
+                ],
+            )
+            profile_ids.extend(ids)
+
+        connection.execute(
+            enterprize_statistics.insert().values(
+                enterprize_id=enterprize_id, total_registrations=size, total_invitations=0
+            )
+        )
+
+        admin_id = profile_ids[0]
+        write_rows(
+            connection=connection,
+            table=posts,
+            rows=[
+                generator.news_post(author_id=admin_id, enterprize_id=enterprize_id)
+                for _ in range(arguments.news_posts_per_tenant)
+            ],
+        )
+        write_rows(
+            connection=connection,
+            table=events,
+            rows=[
+                generator.event(organizer_id=admin_id, enterprize_id=enterprize_id)
+                for _ in range(arguments.events_per_tenant)
+            ],
+        )
+
+        questions_count = int(size * arguments.questions_per_user)
+        for batch in batches(count=questions_count, batch_size=arguments.batch_size):
+            ids = reserve_primary_keys(connection=connection, table=qa_posts, count=len(batch))
+            question_rows = [
+                dict(
+                    id=id,
+                    **generator.question(author_id=generator.rng.choice(profile_ids), enterprize_id=enterprize_id),
+                )
+                for id in ids
+            ]
+            answer_rows = [
+                generator.question(
+                    author_id=generator.rng.choice(profile_ids), enterprize_id=enterprize_id, parent_id=id
+                )
+                for id in ids
+                for _ in range(generator.rng.randrange(arguments.answers_per_question * 2 + 1))
+            ]
+            write_rows(connection=connection, table=qa_posts, rows=question_rows)
+            write_rows(connection=connection, table=qa_posts, rows=answer_rows)
+
+    return size
+
 
+def create_bulk_data(arguments: 'argparse.Namespace'):
+    sizes = tenant_sizes(
+        users_count=arguments.users,
+        tenants_count=arguments.tenants,
+        distribution=arguments.distribution,
+        pareto_alpha=arguments.pareto_alpha,
+        seed=arguments.seed,
+    )
+    tasks = [(tenant_index, size, arguments.seed, arguments) for tenant_index, size in enumerate(sizes)]
+    # the largest tenants go first, so one of them does not end up alone on a worker at the end of the run
+    tasks.sort(key=lambda task: task[1], reverse=True)
 
-def random_profiles():
-    full_name = FullName(first_name=fake.first_name(), last_name=fake.last_name())
-    credentials = UserCredentials(username=fake.company_email(), plain_password=None)
-    address = Address(street=fake.street_address(), zip_code=fake.postcode(), town=fake.city(), country='AT')
-    phone_number = fake.phone_number()
-    contact = Contact(address=address, phone_number=phone_number)
+    start = time.perf_counter()
+    if arguments.workers > 1:
+        with multiprocessing.Pool(processes=arguments.workers, initializer=database_engine.dispose) as pool:
+            seeded = sum(pool.imap_unordered(seed_tenant, tasks))
+    else:
+        seeded = sum(map(seed_tenant, tasks))
 
-    profile = create_profile(repository=profile_repository, enterprize=enterprize, full_name=full_name)
-    profile.register_user(credentials=credentials)
-    profile.activate()
+    elapsed = time.perf_counter() - start
+    print(f'{seeded} users in {len(sizes)} tenants (largest {max(sizes)}) in {elapsed:.1f}s')
 
-    profile.gender = fake.words(1, gender, True)[0]
-    profile.availability = fake.words(1, availability, True)[0]
-    profile.legal_status = fake.words(1, legal_status, True)[0]
-    profile.contact = contact
-    profile.birthdate = fake.date_of_birth(minimum_age=30, maximum_age=67)
-    profile.position = fake.job()
 
-    profile_repository.save_profile(profile=profile)
+def parse_arguments() -> 'argparse.Namespace':
+    parser = argparse.ArgumentParser(description='Create random data, either for staging or in bulk for load tests.')
+    parser.add_argument('--bulk', action='store_true', help='write whole tenants in bulk instead of staging data')
+    parser.add_argument('--profiles', type=int, default=300, help='staging profiles to create')
+    parser.add_argument('--posts', type=int, default=0, help='staging news posts to create')
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--tenants', type=int, default=100)
+    parser.add_argument('--distribution', choices=('uniform', 'pareto'), default='pareto')
+    parser.add_argument('--pareto-alpha', type=float, default=1.16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reference-date', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--news-posts-per-tenant', type=int, default=20)
+    parser.add_argument('--events-per-tenant', type=int, default=10)
+    parser.add_argument('--questions-per-user', type=float, default=0.1)
+    parser.add_argument('--answers-per-question', type=int, default=3)
+    parser.add_argument('--subdomain-prefix', default='load')
+    parser.add_argument('--password', default='password', help='password of every seeded user')
+    parser.add_argument(
+        '--password-memory-cost', type=int, default=64, help='argon2 memory cost of the seeded hashes, in KiB'
+    )
+    parser.add_argument(
+        '--password-rounds', type=int, default=1, help='argon2 rounds of the seeded hashes, production uses 3'
+    )
 
+    arguments = parser.parse_args()
+    if arguments.tenants < 1:
+        parser.error('--tenants must be at least 1')
+    if arguments.users < arguments.tenants:
+        parser.error('--users must be at least --tenants, every tenant needs its admin')
 
-def random_posts():
-    post_content = PostContent(title=fake.sentence(6), body=fake.paragraph(20))
-    create_post(author=admin, content=post_content, repository=post_repository)
+    return arguments
 
 
 if __name__ == '__main__':
-    for i in range(300):
-        random_profiles()
+    arguments = parse_arguments()
 
-    # for i in range(15):
-    #     random_posts()
+    if arguments.bulk:
+        create_bulk_data(arguments=arguments)
+    else:
+        create_staging_data(profiles_count=arguments.profiles, posts_count=arguments.posts, arguments=arguments)
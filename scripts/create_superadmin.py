@@ -1,6 +1,7 @@
 from saas.core.config import configuration
 from saas.database.models import ProfileRepository
 from saas.database.session import create_session
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
 from saas.domain.exceptions import EnterprizeDoesNotExist, UsernameDoesNotExist
 from saas.domain.users import UserType
 from saas.service.enterprize import create_enterprize
@@ -8,11 +9,14 @@ from saas.service.profile import create_profile
 
 session = create_session()
 profile_repository = ProfileRepository(session=session)
+unit_of_work = SqlAlchemyUnitOfWork(session=session)
 
 try:
     enterprize = profile_repository.retrieve_enterprize(enterprize_subdomain='staging')
 except EnterprizeDoesNotExist:
-    enterprize = create_enterprize(name='Staging', subdomain='staging', repository=profile_repository)
+    enterprize = create_enterprize(
+        name='Staging', subdomain='staging', repository=profile_repository, unit_of_work=unit_of_work
+    )
 
 
 def create_superadmin():
@@ -25,7 +29,9 @@ def create_superadmin():
         profile.user.type = UserType.super_admin
         profile.user.activate()
 
-        profile_repository.save_profile(profile=profile)
+        with unit_of_work:
+            profile_repository.save_profile(profile=profile)
+            unit_of_work.commit()
 
 
 def create_admin(username):
@@ -39,7 +45,9 @@ def create_admin(username):
         profile.user.password = '123456'
         profile.user.activate()
 
-        profile_repository.save_profile(profile=profile)
+        with unit_of_work:
+            profile_repository.save_profile(profile=profile)
+            unit_of_work.commit()
 
 
 def create_user(username):
@@ -53,4 +61,6 @@ def create_user(username):
         profile.user.password = '123456'
         profile.user.activate()
 
-        profile_repository.save_profile(profile=profile)
+        with unit_of_work:
+            profile_repository.save_profile(profile=profile)
+            unit_of_work.commit()
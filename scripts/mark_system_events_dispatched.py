@@ -0,0 +1,26 @@
+import sys
+from datetime import datetime, timezone
+
+from saas.database.models import system_event_logs
+from saas.database.session import create_session
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+
+# run once before switching MESSAGE_BUS_DISPATCHER from 'inline' or 'thread' to 'outbox',
+# events logged by those dispatchers were already delivered and must not be replayed by the relay
+if __name__ == '__main__':
+    before = datetime.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else datetime.now(tz=timezone.utc)
+
+    session = create_session()
+    try:
+        with SqlAlchemyUnitOfWork(session=session) as unit_of_work:
+            result = session.execute(
+                system_event_logs.update()
+                .where(system_event_logs.c.dispatched_at.is_(None))
+                .where(system_event_logs.c.created < before)
+                .values(dispatched_at=system_event_logs.c.created)
+            )
+            unit_of_work.commit()
+    finally:
+        session.close()
+
+    print(f'marked {result.rowcount} system events created before {before.isoformat()} as dispatched')
@@ -0,0 +1,11 @@
+from saas.database.models import ProfileRepository
+from saas.database.session import create_session
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+
+if __name__ == '__main__':
+    session = create_session()
+    profile_repository = ProfileRepository(session=session)
+
+    with SqlAlchemyUnitOfWork(session=session) as unit_of_work:
+        profile_repository.rebuild_dashboard_statistics()
+        unit_of_work.commit()
@@ -0,0 +1,14 @@
+import signal
+
+from saas.database.metadata import start_mappers
+from saas.service.message_bus import create_outbox_relay
+
+start_mappers()
+relay = create_outbox_relay()
+
+signal.signal(signal.SIGTERM, lambda *args: relay.stop())
+
+try:
+    relay.run()
+except KeyboardInterrupt:
+    pass
@@ -1,14 +1,26 @@
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 
 import pytest
+import sqlalchemy
 from PIL import Image
 from fastapi.testclient import TestClient
+from requests import Response
 from jose import jwt
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from saas.core.config import configuration
 from saas.domain.events import Event, EventContent
 from saas.domain.posts import NewsPost, PostContent, Question
+from saas.service.authentication import PasswordHasher
+from saas.service.photos import PhotoCache, PhotoPipeline
+from saas.service.profile import upload_user_photo
+from saas.service.storage import LocalBlobStore
 from saas.domain.users import (
     Enterprize,
     UserCredentials,
@@ -22,7 +34,13 @@ from saas.domain.users import (
     EnterprizeNotes,
 )
 from saas.web.app import web_app
-from .repository import FakeProfileRepository, FakePostRepository, FakeEventRepository
+from saas.web.ws.hub import BroadcastHub
+from .repository import FakeProfileRepository, FakePostRepository, FakeEventRepository, FakeUnitOfWork
+
+
+@compiles(JSONB, 'sqlite')
+def compile_jsonb_for_sqlite(type_, compiler, **kwargs):
+    return 'JSON'
 
 
 # @pytest.fixture(scope='session', autouse=True)
@@ -65,8 +83,47 @@ def company_status():
 
 @pytest.fixture(scope='function')
 def photo():
-    image = Image.new(mode='RGB', size=(1, 1))
-    return io.BytesIO(initial_bytes=image.tobytes())
+    image = Image.new(mode='RGB', size=(1_024, 768))
+    photo = io.BytesIO()
+    image.save(photo, format='JPEG')
+    photo.seek(0)
+
+    return photo
+
+
+@pytest.fixture(scope='function')
+def blob_store(tmp_path):
+    return LocalBlobStore(root=str(tmp_path / 'blobs'))
+
+
+@pytest.fixture(scope='function')
+def photo_cache(tmp_path):
+    return PhotoCache(path=str(tmp_path / 'cache'), max_size_in_bytes=1024 * 1024)
+
+
+@pytest.fixture(scope='function')
+def broadcast_hub():
+    return BroadcastHub(queue_size=4, heartbeat_interval_in_seconds=0.05)
+
+
+@pytest.fixture(scope='function')
+def photo_pipeline(tmp_path, blob_store, photo_cache, user_repository, unit_of_work):
+    def process(reference, path, replaces_version):
+        with path.open('rb') as photo:
+            upload_user_photo(
+                reference=reference,
+                photo=photo,
+                replaces_version=replaces_version,
+                blob_store=blob_store,
+                photo_cache=photo_cache,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
+
+    pipeline = PhotoPipeline(spool_path=str(tmp_path / 'spool'), process=process, workers=1, max_pending=10)
+    yield pipeline
+
+    pipeline.shutdown()
 
 
 @pytest.fixture(scope='function')
@@ -202,6 +259,11 @@ def post_repository():
     return FakePostRepository()
 
 
+@pytest.fixture(scope='function')
+def unit_of_work():
+    return FakeUnitOfWork()
+
+
 @pytest.fixture(scope='function')
 def post_content():
     return PostContent(title='Title', body='Text')
@@ -251,8 +313,26 @@ def event_repository(event, other_event):
 
 
 @pytest.fixture(scope='function')
-def http_client(user_repository, post_repository, event_repository):
-    from saas.web.session import profile_database, post_database, event_database
+def http_client(
+    user_repository,
+    post_repository,
+    event_repository,
+    unit_of_work,
+    blob_store,
+    photo_pipeline,
+    photo_cache,
+    broadcast_hub,
+):
+    from saas.web.session import (
+        profile_database,
+        post_database,
+        event_database,
+        database_unit_of_work,
+        photo_processing_pipeline,
+        photo_disk_cache,
+        blob_storage,
+        websocket_broadcast,
+    )
 
     def fake_user_repository():
         return user_repository
@@ -266,8 +346,104 @@ def http_client(user_repository, post_repository, event_repository):
     web_app.dependency_overrides[profile_database] = fake_user_repository
     web_app.dependency_overrides[post_database] = fake_post_repository
     web_app.dependency_overrides[event_database] = fake_event_repository
+    web_app.dependency_overrides[database_unit_of_work] = lambda: unit_of_work
+    web_app.dependency_overrides[photo_processing_pipeline] = lambda: photo_pipeline
+    web_app.dependency_overrides[blob_storage] = lambda: blob_store
+    web_app.dependency_overrides[photo_disk_cache] = lambda: photo_cache
+    web_app.dependency_overrides[websocket_broadcast] = lambda: broadcast_hub
+
+    yield TestClient(app=web_app)
 
-    return TestClient(app=web_app)
+    web_app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope='function')
+def database_engine():
+    from saas.database.cache import principal_cache
+    from saas.database.metadata import metadata, start_mappers, stop_mappers
+
+    engine = sqlalchemy.create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    start_mappers()
+    metadata.create_all(bind=engine)
+    principal_cache.clear()
+
+    yield engine
+
+    principal_cache.clear()
+    stop_mappers()
+    engine.dispose()
+
+
+@pytest.fixture(scope='function')
+def database_session(database_engine):
+    session = sessionmaker(bind=database_engine)()
+
+    yield session
+
+    session.close()
+
+
+@pytest.fixture(scope='function')
+def executed_statements(database_engine):
+    statements: list[str] = []
+
+    def record_statement(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(database_engine, 'before_cursor_execute', record_statement)
+
+    return statements
+
+
+@pytest.fixture(scope='function')
+def database_http_client(database_engine):
+    from saas.web.session import database_session
+
+    create_session = sessionmaker(bind=database_engine)
+
+    def request_session():
+        session = create_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    web_app.dependency_overrides[database_session] = request_session
+
+    yield TestClient(app=web_app)
+
+    web_app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope='function')
+def create_database_profile():
+    enterprize = Enterprize(name='test', subdomain='test')
+
+    def create_profile(username: str, user_type: 'UserType' = UserType.user) -> 'Profile':
+        profile = Profile(enterprize=enterprize)
+        profile.register_user(credentials=UserCredentials(username=username, plain_password=None))
+        profile.activate()
+        profile.user.type = user_type
+
+        return profile
+
+    return create_profile
+
+
+@pytest.fixture(scope='function')
+def count_statements(database_http_client, executed_statements):
+    from saas.database.cache import principal_cache
+
+    def get(path: str, access_token: str) -> tuple['Response', int]:
+        # a cold principal cache, so every request pays for the same lookups
+        principal_cache.clear()
+        executed_statements.clear()
+
+        response = database_http_client.get(path, headers={'Authorization': f'Bearer {access_token}'})
+
+        return response, len(executed_statements)
+
+    return get
 
 
 @pytest.fixture(scope='function')
@@ -342,6 +518,22 @@ def username_change_token(active_user, other_credentials):
     )
 
 
-# @pytest.fixture(scope='function')
-# def test_file(tmp_path):
-#     return io.BytesIO(b'byte_data')
+@pytest.fixture(scope='function')
+def saturated_password_hasher(monkeypatch):
+    password_hasher = PasswordHasher(executor=ThreadPoolExecutor(max_workers=1), max_pending=1)
+    released = threading.Event()
+    password_hasher._submit(released.wait)
+
+    for module in ('authenticate', 'changes', 'hashing'):
+        monkeypatch.setattr(f'saas.service.authentication.{module}.password_hasher', password_hasher)
+    monkeypatch.setattr('saas.service.registration.password_hasher', password_hasher)
+
+    yield password_hasher
+
+    released.set()
+    password_hasher.shutdown()
+
+
+@pytest.fixture(scope='function')
+def test_file(tmp_path):
+    return io.BytesIO(b'byte_data')
@@ -1,15 +1,24 @@
-from typing import Any
+from datetime import datetime
+from typing import Iterator, Optional
 
 from saas.domain.events import Event, EventAbstractRepository
 from saas.domain.exceptions import PostDoesNotExist, EventDoesNotExist
 from saas.domain.posts import NewsPost, PostAbstractRepository, Question, Answer
-from saas.domain.users import Enterprize, User, ProfileAbstractRepository, Profile
+from saas.domain.users import (
+    Enterprize,
+    User,
+    ProfileAbstractRepository,
+    Profile,
+    UserAvailability,
+    LegalStatus,
+)
 from saas.domain.exceptions import (
     UsernameDoesNotExist,
     UserDoesNotExist,
     EnterprizeExists,
     EnterprizeDoesNotExist,
 )
+from saas.service.unit_of_work import AbstractUnitOfWork
 
 
 class FakeProfileRepository(ProfileAbstractRepository):
@@ -21,15 +30,8 @@ class FakeProfileRepository(ProfileAbstractRepository):
     def save_profile(self, profile: 'Profile'):
         self._profiles.add(profile)
 
-    def upload_photo(self, profile: Profile, photo: Any):
-        profile.photo = photo
-        self._profiles.add(profile)
-
-        return str(photo)
-
-    def delete_photo(self, profile: Profile):
-        profile.photo = None
-        self._profiles.add(profile)
+    def save_profiles(self, profiles: list['Profile']):
+        self._profiles.update(profiles)
 
     def create_enterprize(self, enterprize: Enterprize):
         if enterprize.subdomain in (enterprize.subdomain for enterprize in self._enterprizes):
@@ -43,21 +45,70 @@ class FakeProfileRepository(ProfileAbstractRepository):
         except StopIteration:
             raise UserDoesNotExist(reference=reference)
 
-    def retrieve_profiles_for_admin(self, admin_username: str) -> list[Profile]:
+    def retrieve_profile_for_update(self, reference: str) -> Profile:
+        return self.retrieve_profile(reference=reference)
+
+    def retrieve_photo_version(self, reference: str) -> Optional[str]:
+        return self.retrieve_profile(reference=reference).photo_version
+
+    def retrieve_profiles_for_admin(
+        self,
+        admin_username: str,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> list[Profile]:
         admin = next(
             profile
             for profile in self._profiles
             if profile.user is not None and profile.user.username.lower() == admin_username.lower()
         )
-        return list(
-            profile
-            for profile in self._profiles
-            if profile.user is not None and profile.enterprize == admin.enterprize
+        profiles = sorted(
+            (
+                profile
+                for profile in self._profiles
+                if profile.user is not None
+                and profile.enterprize == admin.enterprize
+                and (after is None or (profile.created, profile.reference) > after)
+                and (availability is None or profile.availability == availability)
+                and (department is None or profile.department == department)
+                and (legal_status is None or profile.legal_status == legal_status)
+            ),
+            key=lambda profile: (profile.created, profile.reference),
+        )
+        return profiles[:limit]
+
+    def stream_profiles_for_admin(
+        self,
+        admin_username: str,
+        batch_size: int = 1_000,
+        availability: Optional[UserAvailability] = None,
+        department: Optional[str] = None,
+        legal_status: Optional[LegalStatus] = None,
+    ) -> Iterator[Profile]:
+        return iter(
+            self.retrieve_profiles_for_admin(
+                admin_username=admin_username,
+                availability=availability,
+                department=department,
+                legal_status=legal_status,
+            )
         )
 
     def retrieve_invited_profiles_for_admin(self, admin_username: str) -> list[Profile]:
         return self.retrieve_profiles_for_admin(admin_username=admin_username)
 
+    def retrieve_by_usernames(self, usernames: list[str]) -> list[Profile]:
+        usernames = {username.lower() for username in usernames}
+
+        return [
+            profile
+            for profile in self._profiles
+            if profile.user is not None and profile.user.username.lower() in usernames
+        ]
+
     def retrieve_by_username(self, username: str) -> Profile:
         try:
             return next(
@@ -68,6 +119,9 @@ class FakeProfileRepository(ProfileAbstractRepository):
         except StopIteration:
             raise UsernameDoesNotExist(username=username)
 
+    def retrieve_by_username_for_authentication(self, username: str) -> Profile:
+        return self.retrieve_by_username(username=username)
+
     def retrieve_by_username_allowed_to_register(self, username: str) -> Profile:
         try:
             return next(
@@ -95,7 +149,13 @@ class FakeProfileRepository(ProfileAbstractRepository):
                 if profile.enterprize == admin.enterprize and profile.user.is_active
             ]
         )
-        total_registrations = len([profile for profile in self._profiles if profile.enterprize == admin.enterprize])
+        total_registrations = len(
+            [
+                profile
+                for profile in self._profiles
+                if profile.enterprize == admin.enterprize and profile.user.password is not None
+            ]
+        )
         accepted_invitations = len(
             [
                 profile
@@ -126,11 +186,22 @@ class FakePostRepository(PostAbstractRepository):
         self._news_posts = set()
         self._admin_profiles = set()
 
-    def list_for_enterprize(self, enterprize: Enterprize):
-        return list(post for post in self._news_posts if post.author.enterprize == enterprize)
+    def list_for_enterprize(
+        self, enterprize: Enterprize, limit: Optional[int] = None, before: Optional[tuple[datetime, str]] = None
+    ):
+        posts = sorted(
+            (
+                post
+                for post in self._news_posts
+                if post.enterprize == enterprize and (before is None or (post.created, post.reference) < before)
+            ),
+            key=lambda post: (post.created, post.reference),
+            reverse=True,
+        )
+        return posts[:limit]
 
     def list_questions_for_enterprize(self, enterprize: Enterprize):
-        return list(question for question in self._qa_posts if question.author.enterprize == enterprize)
+        return list(question for question in self._qa_posts if question.enterprize == enterprize)
 
     def add_news_post(self, post: NewsPost):
         self._news_posts.add(post)
@@ -217,5 +288,17 @@ class FakeEventRepository(EventAbstractRepository):
         except StopIteration:
             raise EventDoesNotExist(reference=reference)
 
-    def list_events_for_enterprize(self, enterprize_reference: str):
-        return list(event for event in self._events if event.organizer.enterprize.reference == enterprize_reference)
+    def list_events_for_enterprize(self, enterprize: Enterprize):
+        return list(event for event in self._events if event.enterprize == enterprize)
+
+
+class FakeUnitOfWork(AbstractUnitOfWork):
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
@@ -0,0 +1,30 @@
+import asyncio
+
+from saas.database.models import AsyncEventRepository, AsyncProfileRepository, EventRepository, ProfileRepository
+
+
+class TestAsyncRepositories:
+    def test_list_events_for_enterprize(self, database_session, enterprize, event, other_event):
+        database_session.add_all([event, other_event])
+        database_session.commit()
+        repository = AsyncEventRepository(repository=EventRepository(session=database_session))
+
+        events = asyncio.run(repository.list_events_for_enterprize(enterprize=enterprize))
+
+        assert events == [event]
+
+    def test_stream_profiles_for_admin(self, database_session, admin_profile, profile):
+        profile.activate()
+        database_session.add_all([admin_profile, profile])
+        database_session.commit()
+        repository = AsyncProfileRepository(repository=ProfileRepository(session=database_session))
+
+        async def stream_profiles():
+            return [
+                streamed_profile
+                async for streamed_profile in repository.stream_profiles_for_admin(
+                    admin_username=admin_profile.user.username, batch_size=1
+                )
+            ]
+
+        assert asyncio.run(stream_profiles()) == [profile]
@@ -0,0 +1,55 @@
+import time
+
+from saas.database.cache import PrincipalCache
+
+
+class TestPrincipalCache:
+    def test_can_cache_profile(self, profile):
+        cache = PrincipalCache(max_size=10, ttl_in_seconds=60)
+        cache.set(username=profile.user.username, profile=profile)
+
+        cached_profile = cache.get(username=profile.user.username.upper())
+
+        assert cached_profile.reference == profile.reference
+        assert cached_profile is not profile
+
+    def test_cache_miss(self, profile):
+        cache = PrincipalCache(max_size=10, ttl_in_seconds=60)
+
+        assert cache.get(username=profile.user.username) is None
+
+    def test_expired_profile_is_evicted(self, profile):
+        cache = PrincipalCache(max_size=10, ttl_in_seconds=0)
+        cache.set(username=profile.user.username, profile=profile)
+        time.sleep(0.001)
+
+        assert cache.get(username=profile.user.username) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_profile_is_evicted(self, profile, admin_profile, other_profile):
+        cache = PrincipalCache(max_size=2, ttl_in_seconds=60)
+        cache.set(username=profile.user.username, profile=profile)
+        cache.set(username=admin_profile.user.username, profile=admin_profile)
+        cache.get(username=profile.user.username)
+        cache.set(username=other_profile.user.username, profile=other_profile)
+
+        assert cache.get(username=admin_profile.user.username) is None
+        assert cache.get(username=profile.user.username) is not None
+        assert cache.get(username=other_profile.user.username) is not None
+
+    def test_can_invalidate_profile_after_username_change(self, profile):
+        cache = PrincipalCache(max_size=10, ttl_in_seconds=60)
+        old_username = profile.user.username
+        cache.set(username=old_username, profile=profile)
+
+        profile.user.username = 'changed@example.com'
+        cache.invalidate(reference=profile.reference)
+
+        assert cache.get(username=old_username) is None
+        assert len(cache) == 0
+
+    def test_disabled_cache(self, profile):
+        cache = PrincipalCache(max_size=0, ttl_in_seconds=60)
+        cache.set(username=profile.user.username, profile=profile)
+
+        assert cache.get(username=profile.user.username) is None
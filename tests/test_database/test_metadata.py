@@ -0,0 +1,16 @@
+from sqlalchemy.orm import class_mapper
+
+from saas.database.metadata import start_mappers
+from saas.domain.users import Profile
+
+
+class TestStartMappers:
+    def test_start_mappers_is_idempotent(self, database_engine):
+        mapper = class_mapper(Profile)
+
+        start_mappers()
+
+        assert class_mapper(Profile) is mapper
+
+    def test_mappers_are_configured_eagerly(self, database_engine):
+        assert class_mapper(Profile, configure=False).configured
@@ -0,0 +1,127 @@
+import contextlib
+
+from sqlalchemy.orm import sessionmaker
+
+from saas.core.config import configuration
+from saas.database.models import ProfileRepository, SystemEvent
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+from saas.domain.users.events import UserRegistered
+from saas.service.message_bus.outbox import OutboxRelay, deserialize_event
+
+
+class TestOutboxRelay:
+    def test_event_is_delivered_once(self, database_engine, database_session, profile):
+        profile.publish_profile_registered_event(profile_activation_token='token')
+        with SqlAlchemyUnitOfWork(session=database_session) as unit_of_work:
+            ProfileRepository(session=database_session).save_profile(profile=profile)
+            unit_of_work.commit()
+
+        delivered_events = []
+
+        def deliver(event):
+            delivered_events.append(event)
+
+        relay = OutboxRelay(
+            deliver=deliver,
+            batch_size=10,
+            poll_interval_in_seconds=0,
+            session_factory=sessionmaker(bind=database_engine),
+        )
+
+        assert relay.relay_once() == 1
+        assert relay.relay_once() == 0
+        assert delivered_events == [profile.event_logs[-1]]
+
+        database_session.expire_all()
+        assert database_session.query(SystemEvent).one().dispatched_at is not None
+
+    @staticmethod
+    def save_registered_profile(database_session, profile):
+        profile.publish_profile_registered_event(profile_activation_token='token')
+        with SqlAlchemyUnitOfWork(session=database_session) as unit_of_work:
+            ProfileRepository(session=database_session).save_profile(profile=profile)
+            unit_of_work.commit()
+
+    def test_failed_event_is_retried_later(self, database_engine, database_session, profile):
+        self.save_registered_profile(database_session=database_session, profile=profile)
+
+        def deliver(event):
+            raise RuntimeError('Customer.io is down.')
+
+        relay = OutboxRelay(
+            deliver=deliver,
+            batch_size=10,
+            poll_interval_in_seconds=0,
+            session_factory=sessionmaker(bind=database_engine),
+        )
+
+        assert relay.relay_once() == 1
+        # the retry is due after the backoff, not on the next poll
+        assert relay.relay_once() == 0
+
+        database_session.expire_all()
+        system_event = database_session.query(SystemEvent).one()
+        assert system_event.dispatched_at is None
+        assert system_event.attempts == 1
+        assert 'Customer.io is down.' in system_event.last_error
+
+    def test_failed_batch_is_not_dispatched(self, database_engine, database_session, profile):
+        self.save_registered_profile(database_session=database_session, profile=profile)
+
+        @contextlib.contextmanager
+        def batch():
+            yield
+            raise RuntimeError('Batch request failed.')
+
+        relay = OutboxRelay(
+            deliver=lambda event: None,
+            batch_size=10,
+            poll_interval_in_seconds=0,
+            session_factory=sessionmaker(bind=database_engine),
+            batch=batch,
+        )
+
+        assert relay.relay_once() == 1
+
+        database_session.expire_all()
+        system_event = database_session.query(SystemEvent).one()
+        assert system_event.dispatched_at is None
+        assert system_event.attempts == 1
+
+    def test_claimed_events_are_skipped_by_other_relays(self, database_engine, database_session, profile):
+        self.save_registered_profile(database_session=database_session, profile=profile)
+        relays = []
+
+        def deliver(event):
+            relays.append(other_relay.relay_once())
+
+        relay = OutboxRelay(
+            deliver=deliver,
+            batch_size=10,
+            poll_interval_in_seconds=0,
+            session_factory=sessionmaker(bind=database_engine),
+        )
+        other_relay = OutboxRelay(
+            deliver=deliver,
+            batch_size=10,
+            poll_interval_in_seconds=0,
+            session_factory=sessionmaker(bind=database_engine),
+        )
+
+        assert relay.relay_once() == 1
+        assert relays == [0]
+
+    def test_events_are_logged_as_dispatched_without_outbox(self, database_session, profile, monkeypatch):
+        monkeypatch.setattr(configuration, 'MESSAGE_BUS_DISPATCHER', 'inline')
+
+        self.save_registered_profile(database_session=database_session, profile=profile)
+
+        assert database_session.query(SystemEvent).one().dispatched_at is not None
+
+    def test_unknown_events_are_skipped(self):
+        assert deserialize_event(payload={'name': 'Unknown', 'reference': 'reference'}) is None
+
+    def test_event_roundtrip(self):
+        event = UserRegistered(username='user@example.com', activation_code='code')
+
+        assert deserialize_event(payload={'name': event.name, 'reference': event.reference, **vars(event)}) == event
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+import sqlalchemy.exc
+
+from saas.database.pool import InstrumentedQueuePool, PoolMetrics
+
+
+@pytest.fixture
+def metrics():
+    return PoolMetrics()
+
+
+@pytest.fixture
+def pool(metrics):
+    class Pool(InstrumentedQueuePool):
+        pass
+
+    Pool.metrics = metrics
+    pool = Pool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=1, timeout=0.01)
+    yield pool
+    pool.dispose()
+
+
+class TestInstrumentedQueuePool:
+    def test_checkouts_are_counted(self, pool, metrics):
+        connection = pool.connect()
+        statistics = metrics.snapshot(pool=pool)
+        connection.close()
+
+        assert statistics['checkouts'] == 1
+        assert statistics['checked_out'] == 1
+        assert statistics['overflow'] == 0
+        assert metrics.snapshot(pool=pool)['checked_out'] == 0
+
+    def test_overflow_and_timeouts_are_counted(self, pool, metrics):
+        connections = [pool.connect(), pool.connect()]
+
+        with pytest.raises(sqlalchemy.exc.TimeoutError):
+            pool.connect()
+
+        statistics = metrics.snapshot(pool=pool)
+        for connection in connections:
+            connection.close()
+
+        assert statistics['checked_out'] == 2
+        assert statistics['overflow'] == 1
+        assert statistics['max_overflow'] == 1
+        assert statistics['timeouts'] == 1
+        assert statistics['max_wait_in_ms'] >= 10
+
+    def test_recreated_pool_keeps_max_overflow(self, pool, metrics):
+        recreated = pool.recreate()
+
+        assert metrics.snapshot(pool=recreated)['max_overflow'] == 1
+        recreated.dispose()
+
+    def test_reset(self, pool, metrics):
+        pool.connect().close()
+        metrics.reset()
+
+        assert metrics.snapshot(pool=pool)['checkouts'] == 0
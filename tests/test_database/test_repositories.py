@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from saas.database.models import EventRepository, PostRepository, ProfileRepository, SystemEvent, profiles, users
+from saas.database.models.profiles import upsert_dashboard_statistics
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+from saas.service.authentication import authenticate_credentials
+from saas.service.profile import invite_users_to_register
+from saas.domain.exceptions import UserInactive
+from saas.domain.posts import NewsPost, Question, Answer
+from saas.domain.users import UserCredentials
+from saas.domain.users.events import UserInvited, UserRegistered
+from saas.service.message_bus.handlers import statistics_handlers
+
+
+class TestTenantScopedRepositories:
+    def test_list_events_for_enterprize(self, database_session, enterprize, event, other_event):
+        database_session.add_all([event, other_event])
+        database_session.commit()
+
+        events = EventRepository(session=database_session).list_events_for_enterprize(enterprize=enterprize)
+
+        assert events == [event]
+        assert event.enterprize_id == enterprize.id
+
+    def test_list_news_posts_for_enterprize(
+        self, database_session, enterprize, news_post, other_admin_profile, post_content
+    ):
+        other_news_post = NewsPost(author=other_admin_profile, content=post_content)
+        database_session.add_all([news_post, other_news_post])
+        database_session.commit()
+
+        posts = PostRepository(session=database_session).list_for_enterprize(enterprize=enterprize)
+
+        assert posts == [news_post]
+        assert news_post.enterprize_id == enterprize.id
+
+    def test_list_questions_for_enterprize(
+        self, database_session, enterprize, question, admin_profile, other_profile, post_content
+    ):
+        answer = Answer(author=admin_profile, question=question, content=post_content)
+        other_question = Question(author=other_profile, content=post_content)
+        database_session.add_all([question, other_question])
+        database_session.commit()
+
+        questions = PostRepository(session=database_session).list_questions_for_enterprize(enterprize=enterprize)
+
+        assert questions == [question]
+        assert answer.enterprize_id == enterprize.id
+
+
+class TestBulkInvitation:
+    def test_invite_users_to_register(self, database_session, admin_profile, profile, other_profile):
+        database_session.add_all([admin_profile, profile, other_profile])
+        database_session.commit()
+        repository = ProfileRepository(session=database_session)
+        usernames = [f'user{index}@example.com' for index in range(20)] + [profile.user.username]
+
+        invite_users_to_register(
+            usernames=usernames + [other_profile.user.username],
+            creator=admin_profile,
+            repository=repository,
+            unit_of_work=SqlAlchemyUnitOfWork(session=database_session),
+        )
+        database_session.expire_all()
+
+        invited_profiles = repository.retrieve_by_usernames(usernames=usernames)
+        assert len(invited_profiles) == 21
+        assert all(invited_profile.user.invited is not None for invited_profile in invited_profiles)
+        assert all(
+            invited_profile.enterprize_id == admin_profile.enterprize_id for invited_profile in invited_profiles
+        )
+        assert database_session.query(SystemEvent).count() == 21
+        assert repository.retrieve_by_username(username=other_profile.user.username).user.invited is None
+
+
+class TestAuthenticationReads:
+    def test_credentials_are_not_read_from_the_principal_cache(self, database_engine, database_session, admin_profile):
+        database_session.add(admin_profile)
+        database_session.commit()
+        ProfileRepository(session=database_session).retrieve_by_username(username=admin_profile.user.username)
+        # another worker deactivates the user, this process never hears about it
+        database_session.execute(users.update().values(is_active=False))
+        database_session.commit()
+        repository = ProfileRepository(session=sessionmaker(bind=database_engine)())
+        credentials = UserCredentials(username=admin_profile.user.username, plain_password='admin')
+
+        assert repository.retrieve_by_username(username=admin_profile.user.username).user.is_active
+        with pytest.raises(UserInactive):
+            asyncio.run(authenticate_credentials(credentials=credentials, repository=repository))
+
+
+class TestPhotoReads:
+    def test_photo_version_is_read_past_the_session(self, database_engine, database_session, profile):
+        database_session.add(profile)
+        database_session.commit()
+        repository = ProfileRepository(session=database_session)
+        repository.retrieve_profile(reference=profile.reference)
+        # another worker deletes the photo while this session still holds the profile
+        other_session = sessionmaker(bind=database_engine)()
+        other_session.execute(profiles.update().values(photo_version='1a2b3c'))
+        other_session.commit()
+
+        assert repository.retrieve_photo_version(reference=profile.reference) == '1a2b3c'
+        assert repository.retrieve_profile_for_update(reference=profile.reference).photo_version == '1a2b3c'
+
+
+class TestDashboardStatistics:
+    @staticmethod
+    def log_events(database_session, profile, *names):
+        database_session.add_all(
+            SystemEvent(stream_reference=profile.reference, payload={'name': name, 'reference': name})
+            for name in names
+        )
+        database_session.commit()
+
+    @pytest.fixture(scope='function')
+    def repository(self, database_session, admin_profile, profile):
+        database_session.add_all([admin_profile, profile])
+        database_session.commit()
+
+        return ProfileRepository(session=database_session)
+
+    def test_increment_dashboard_statistics(self, repository, admin_profile):
+        repository.increment_dashboard_statistics(enterprize_id=admin_profile.enterprize_id, total_registrations=1)
+        repository.increment_dashboard_statistics(
+            enterprize_id=admin_profile.enterprize_id, total_registrations=1, total_invitations=2
+        )
+
+        statistics = repository.retrieve_dashboard_statistics(admin_username=admin_profile.user.username)
+        assert statistics == {
+            'total_registrations': 2,
+            'active_registrations': 1,
+            'total_invitations': 2,
+            'accepted_invitations': 0,
+        }
+
+    def test_upsert_dashboard_statistics(self):
+        statement = upsert_dashboard_statistics(enterprize_id=1, total_registrations=1)
+
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT (enterprize_id) DO UPDATE SET' in compiled
+        assert 'total_registrations = (enterprize_statistics.total_registrations + excluded.total_registrations)' in (
+            compiled
+        )
+
+    def test_deactivated_users_are_not_counted(self, database_session, repository, admin_profile, profile):
+        profile.user.invite()
+        profile.activate()
+        database_session.commit()
+        assert repository.retrieve_dashboard_statistics(admin_username=admin_profile.user.username) == {
+            'total_registrations': 0,
+            'active_registrations': 2,
+            'total_invitations': 0,
+            'accepted_invitations': 1,
+        }
+
+        profile.user.is_active = False
+        database_session.commit()
+
+        statistics = repository.retrieve_dashboard_statistics(admin_username=admin_profile.user.username)
+        assert statistics['active_registrations'] == 1
+        assert statistics['accepted_invitations'] == 0
+
+    def test_statistics_event_is_recorded_once(self, repository, profile):
+        assert repository.record_statistics_event(stream_reference=profile.reference, event_name='UserRegistered')
+        assert not repository.record_statistics_event(stream_reference=profile.reference, event_name='UserRegistered')
+
+    def test_rebuild_dashboard_statistics(self, database_session, repository, admin_profile, profile):
+        self.log_events(database_session, admin_profile, 'UserRegistered', 'UserActivated')
+        self.log_events(database_session, profile, 'UserInvited', 'UserRegistered', 'UserRegistered', 'UserActivated')
+
+        repository.rebuild_dashboard_statistics()
+
+        statistics = repository.retrieve_dashboard_statistics(admin_username=admin_profile.user.username)
+        assert statistics == {
+            'total_registrations': 2,
+            'active_registrations': 1,
+            'total_invitations': 1,
+            'accepted_invitations': 0,
+        }
+        assert not repository.record_statistics_event(stream_reference=profile.reference, event_name='UserInvited')
+
+    def test_redelivered_events_are_counted_once(
+        self, database_engine, database_session, repository, admin_profile, profile, monkeypatch
+    ):
+        monkeypatch.setattr(statistics_handlers, 'DatabaseSession', sessionmaker(bind=database_engine))
+        self.log_events(database_session, profile, 'UserInvited', 'UserRegistered')
+        invited = UserInvited(
+            invited_email_address=profile.user.username,
+            admin_username=admin_profile.user.username,
+            admin_first_name='',
+            admin_last_name='',
+            admin_company='',
+        )
+        registered = UserRegistered(username=profile.user.username, activation_code='')
+
+        for event in (invited, registered, registered, invited):
+            statistics_handlers.count_user_event(event=event)
+
+        statistics = repository.retrieve_dashboard_statistics(admin_username=admin_profile.user.username)
+        assert statistics == {
+            'total_registrations': 1,
+            'active_registrations': 1,
+            'total_invitations': 1,
+            'accepted_invitations': 0,
+        }
@@ -0,0 +1,30 @@
+import pytest
+
+from saas.database.cache import principal_cache
+from saas.database.models import ProfileRepository
+from saas.database.unit_of_work import SqlAlchemyUnitOfWork
+
+
+class TestSqlAlchemyUnitOfWork:
+    def test_principal_is_invalidated_after_commit(self, database_session, profile):
+        repository = ProfileRepository(session=database_session)
+        principal_cache.set(username=profile.user.username, profile=profile)
+
+        with SqlAlchemyUnitOfWork(session=database_session) as unit_of_work:
+            repository.save_profile(profile=profile)
+
+            assert principal_cache.get(username=profile.user.username) is not None
+
+            unit_of_work.commit()
+
+        assert principal_cache.get(username=profile.user.username) is None
+
+    def test_rollback_on_error(self, database_session, profile):
+        repository = ProfileRepository(session=database_session)
+
+        with pytest.raises(ValueError):
+            with SqlAlchemyUnitOfWork(session=database_session):
+                repository.save_profile(profile=profile)
+                raise ValueError
+
+        assert profile not in database_session
@@ -1,6 +1,12 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+
 from saas.domain.exceptions import UsernameExists, UserAlreadyActive, UserInactive
+from saas.domain.services import verify_hashed_password
 from saas.domain.users import UserCredentials
 from saas.domain.users.events import (
     UserPasswordChangeInitiated,
@@ -9,6 +15,7 @@ from saas.domain.users.events import (
     UserPasswordChanged,
 )
 from saas.service.authentication import (
+    PasswordHasher,
     authenticate_credentials,
     decode_access_token,
     initiate_password_change,
@@ -22,60 +29,95 @@ from saas.service.authentication import (
     initiate_username_change,
     change_username,
 )
-from saas.service.exceptions import InvalidCredentials, InvalidToken
+from saas.service.exceptions import InvalidCredentials, InvalidToken, PasswordHashingBusy
 from saas.service.registration import register_user, activate_profile
 
 
 class TestRegistration:
-    def test_registration_successful_profile_does_not_exist(self, user_repository, credentials, enterprize, full_name):
-        user = register_user(
-            credentials=credentials,
-            enterprize_subdomain=enterprize.subdomain,
-            repository=user_repository,
+    def test_registration_successful_profile_does_not_exist(
+        self, user_repository, credentials, enterprize, full_name, unit_of_work
+    ):
+        user = asyncio.run(
+            register_user(
+                credentials=credentials,
+                enterprize_subdomain=enterprize.subdomain,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
         )
         assert user.username == credentials.username
         assert user.password != credentials.plain_password
 
     def test_registration_successful_profile_exists(
-        self, preregistered_profile, user_repository, credentials, enterprize
+        self, preregistered_profile, user_repository, credentials, enterprize, unit_of_work
     ):
-        user = register_user(
-            credentials=credentials,
-            enterprize_subdomain=enterprize.subdomain,
-            repository=user_repository,
+        user = asyncio.run(
+            register_user(
+                credentials=credentials,
+                enterprize_subdomain=enterprize.subdomain,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
         )
         assert preregistered_profile.user is user
         assert user.username == credentials.username
         assert user.password != credentials.plain_password
+        assert verify_hashed_password(plain_password=credentials.plain_password, password=user.password)
 
     def test_registration_case_insensitive_username_exists(
-        self, user_repository, active_profile, credentials, enterprize
+        self, user_repository, active_profile, credentials, enterprize, unit_of_work
     ):
         credentials = UserCredentials(
             username=credentials.username.upper(),
             plain_password='password',
         )
         with pytest.raises(UsernameExists):
-            register_user(
-                credentials=credentials,
-                enterprize_subdomain=enterprize.subdomain,
-                repository=user_repository,
+            asyncio.run(
+                register_user(
+                    credentials=credentials,
+                    enterprize_subdomain=enterprize.subdomain,
+                    repository=user_repository,
+                    unit_of_work=unit_of_work,
+                )
             )
 
-    def test_registration_username_exists(self, user_repository, active_profile, credentials, enterprize):
+    def test_registration_username_exists(
+        self, user_repository, active_profile, credentials, enterprize, unit_of_work
+    ):
         with pytest.raises(UsernameExists):
-            register_user(
-                credentials=credentials,
-                enterprize_subdomain=enterprize.subdomain,
-                repository=user_repository,
+            asyncio.run(
+                register_user(
+                    credentials=credentials,
+                    enterprize_subdomain=enterprize.subdomain,
+                    repository=user_repository,
+                    unit_of_work=unit_of_work,
+                )
+            )
+
+    def test_registration_username_exists_is_not_hashed(
+        self, user_repository, active_profile, credentials, enterprize, unit_of_work, saturated_password_hasher
+    ):
+        with pytest.raises(UsernameExists):
+            asyncio.run(
+                register_user(
+                    credentials=credentials,
+                    enterprize_subdomain=enterprize.subdomain,
+                    repository=user_repository,
+                    unit_of_work=unit_of_work,
+                )
             )
 
-    def test_registration_username_exists_not_active(self, user_repository, profile, credentials, enterprize):
+    def test_registration_username_exists_not_active(
+        self, user_repository, profile, credentials, enterprize, unit_of_work
+    ):
         with pytest.raises(UserInactive):
-            register_user(
-                credentials=credentials,
-                enterprize_subdomain=enterprize.subdomain,
-                repository=user_repository,
+            asyncio.run(
+                register_user(
+                    credentials=credentials,
+                    enterprize_subdomain=enterprize.subdomain,
+                    repository=user_repository,
+                    unit_of_work=unit_of_work,
+                )
             )
 
 
@@ -95,20 +137,26 @@ class TestProfileActivation:
         with pytest.raises(InvalidToken):
             decode_profile_activation_token(token=access_token)
 
-    def test_activation_successful(self, profile, profile_activation_token, user_repository):
-        activate_profile(profile_activation_token=profile_activation_token, repository=user_repository)
+    def test_activation_successful(self, profile, profile_activation_token, user_repository, unit_of_work):
+        activate_profile(
+            profile_activation_token=profile_activation_token, repository=user_repository, unit_of_work=unit_of_work
+        )
 
         assert profile.user.is_active
         assert profile.user.activated is not None
 
-    def test_activation_user_already_active(self, active_profile_activation_token, user_repository):
+    def test_activation_user_already_active(self, active_profile_activation_token, user_repository, unit_of_work):
         with pytest.raises(UserAlreadyActive):
-            activate_profile(profile_activation_token=active_profile_activation_token, repository=user_repository)
+            activate_profile(
+                profile_activation_token=active_profile_activation_token,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
 
 
 class TestAuthentication:
     def test_user_can_authenticate(self, active_user, user_repository, credentials):
-        retrieved_user = authenticate_credentials(credentials=credentials, repository=user_repository)
+        retrieved_user = asyncio.run(authenticate_credentials(credentials=credentials, repository=user_repository))
         assert retrieved_user == active_user
 
     def test_user_can_authenticate_case_insensitive(self, active_user, user_repository, credentials):
@@ -117,16 +165,42 @@ class TestAuthentication:
             plain_password=credentials.plain_password,
         )
 
-        retrieved_user = authenticate_credentials(credentials=credentials, repository=user_repository)
+        retrieved_user = asyncio.run(authenticate_credentials(credentials=credentials, repository=user_repository))
         assert retrieved_user == active_user
 
     def test_user_inactive(self, user, user_repository, credentials):
         with pytest.raises(UserInactive):
-            authenticate_credentials(credentials=credentials, repository=user_repository)
+            asyncio.run(authenticate_credentials(credentials=credentials, repository=user_repository))
 
     def test_user_invalid_credentials(self, user_repository, credentials):
         with pytest.raises(InvalidCredentials):
-            authenticate_credentials(credentials=credentials, repository=user_repository)
+            asyncio.run(authenticate_credentials(credentials=credentials, repository=user_repository))
+
+    def test_logins_queue_on_the_hasher_instead_of_threads(
+        self, active_user, user_repository, credentials, monkeypatch
+    ):
+        password_hasher = PasswordHasher(executor=ThreadPoolExecutor(max_workers=1), max_pending=3)
+        monkeypatch.setattr('saas.service.authentication.authenticate.password_hasher', password_hasher)
+        released = threading.Event()
+        password_hasher._submit(released.wait, timeout=5)
+
+        async def login_concurrently():
+            # a single thread is left for everything but hashing, as under a saturated threadpool
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+            logins = [
+                asyncio.ensure_future(authenticate_credentials(credentials=credentials, repository=user_repository))
+                for _ in range(3)
+            ]
+            await asyncio.wait(logins, return_when=asyncio.FIRST_EXCEPTION)
+            released.set()
+
+            return await asyncio.gather(*logins, return_exceptions=True)
+
+        results = asyncio.run(login_concurrently())
+        password_hasher.shutdown()
+
+        assert sum(isinstance(result, PasswordHashingBusy) for result in results) == 1
+        assert [result for result in results if not isinstance(result, PasswordHashingBusy)] == [active_user] * 2
 
 
 class TestAccessToken:
@@ -156,18 +230,21 @@ class TestChangePassword:
         with pytest.raises(InvalidToken):
             decode_password_change_token(password_change_token=access_token)
 
-    def test_initiate_password_change(self, active_profile, user_repository):
-        initiate_password_change(profile=active_profile, repository=user_repository)
+    def test_initiate_password_change(self, active_profile, user_repository, unit_of_work):
+        initiate_password_change(profile=active_profile, repository=user_repository, unit_of_work=unit_of_work)
 
         assert isinstance(active_profile.event_logs[-1], UserPasswordChangeInitiated)
 
-    def test_can_change_password(self, active_profile, user_repository):
+    def test_can_change_password(self, active_profile, user_repository, unit_of_work):
         new_plain_password = 'new_password'
         old_password = active_profile.user.password
-        change_user_password(
-            profile=active_profile,
-            new_plain_password=new_plain_password,
-            repository=user_repository,
+        asyncio.run(
+            change_user_password(
+                profile=active_profile,
+                new_plain_password=new_plain_password,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
         )
 
         assert old_password != active_profile.user.password
@@ -192,21 +269,32 @@ class TestChangeUsername:
         with pytest.raises(InvalidToken):
             decode_username_change_token(username_change_token=access_token)
 
-    def test_inititate_username_change(self, active_profile, user_repository):
+    def test_inititate_username_change(self, active_profile, user_repository, unit_of_work):
         initiate_username_change(
-            profile=active_profile, new_username=f'change_{active_profile.user.username}', repository=user_repository
+            profile=active_profile,
+            new_username=f'change_{active_profile.user.username}',
+            repository=user_repository,
+            unit_of_work=unit_of_work,
         )
 
         assert isinstance(active_profile.event_logs[-1], UsernameChangeInitiated)
 
-    def test_username_already_exists(self, active_profile, other_user, user_repository):
+    def test_username_already_exists(self, active_profile, other_user, user_repository, unit_of_work):
         with pytest.raises(UsernameExists):
             initiate_username_change(
-                profile=active_profile, new_username=other_user.username, repository=user_repository
+                profile=active_profile,
+                new_username=other_user.username,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
             )
 
-    def test_can_change_username(self, active_profile, other_credentials, user_repository):
-        change_username(profile=active_profile, new_username=other_credentials.username, repository=user_repository)
+    def test_can_change_username(self, active_profile, other_credentials, user_repository, unit_of_work):
+        change_username(
+            profile=active_profile,
+            new_username=other_credentials.username,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
 
         assert active_profile.user.username == other_credentials.username
         assert isinstance(active_profile.event_logs[-1], UsernameChanged)
@@ -0,0 +1,155 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from saas.domain.users.events import UserRegistered
+from saas.service.email.customer_io import CustomerIOClient, CustomerIOEmailSender
+
+
+class CustomerIOStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_PUT(self):
+        self._record()
+
+    def do_POST(self):
+        self._record()
+
+    def _record(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.command, self.path, json.loads(body)))
+        self.server.connections.add(self.client_address)
+
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def customer_io_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CustomerIOStub)
+    server.requests = []
+    server.connections = set()
+    server.statuses = []
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(customer_io_server):
+    host, port = customer_io_server.server_address
+    client = CustomerIOClient(site_id='site', api_key='key', domain=f'http://{host}:{port}', backoff_factor=0)
+
+    yield client
+
+    client.close()
+
+
+@pytest.fixture
+def activation_event(user):
+    return UserRegistered(username=user.username, activation_code='code')
+
+
+class TestCustomerIOClient:
+    def test_send_activation_email(self, client, customer_io_server, profile, activation_event):
+        email_sender = CustomerIOEmailSender(event=activation_event, profile=profile, client=client)
+        email_sender.create_receiver()
+        email_sender.create_email_message()
+        email_sender.send_email()
+
+        (identify_method, identify_path, person), (event_method, event_path, event) = customer_io_server.requests
+        assert (identify_method, identify_path) == ('PUT', f'/api/v1/customers/{profile.reference}')
+        assert person['email'] == profile.user.username
+        assert (event_method, event_path) == ('POST', f'/api/v1/customers/{profile.reference}/events')
+        assert event['name'] == activation_event.name
+
+    def test_connections_are_reused(self, client, customer_io_server):
+        for index in range(5):
+            client.track_anonymous_event(name='UserInvited', data={'index': index})
+
+        assert len(customer_io_server.requests) == 5
+        assert len(customer_io_server.connections) == 1
+
+    def test_unchanged_person_is_not_upserted_again(self, client, customer_io_server):
+        client.identify_person(reference='reference', attributes={'email': 'user@example.com'})
+        client.identify_person(reference='reference', attributes={'email': 'user@example.com'})
+        client.identify_person(reference='reference', attributes={'email': 'other@example.com'})
+
+        assert [payload['email'] for _, _, payload in customer_io_server.requests] == [
+            'user@example.com',
+            'other@example.com',
+        ]
+
+    def test_failed_idempotent_requests_are_retried(self, client, customer_io_server):
+        customer_io_server.statuses = [503, 502]
+
+        client.identify_person(reference='reference', attributes={'email': 'user@example.com'})
+
+        assert len(customer_io_server.requests) == 3
+
+    def test_failed_events_are_not_sent_twice(self, client, customer_io_server):
+        customer_io_server.statuses = [503]
+
+        with pytest.raises(requests.HTTPError):
+            client.track_anonymous_event(name='UserInvited', data={})
+
+        assert len(customer_io_server.requests) == 1
+
+    def test_rate_limited_events_are_retried(self, client, customer_io_server):
+        customer_io_server.statuses = [429]
+
+        client.track_anonymous_event(name='UserInvited', data={})
+
+        assert len(customer_io_server.requests) == 2
+
+    def test_failed_person_upsert_is_not_cached(self, client, customer_io_server):
+        customer_io_server.statuses = [400]
+
+        with pytest.raises(requests.HTTPError):
+            client.identify_person(reference='reference', attributes={'email': 'user@example.com'})
+        client.identify_person(reference='reference', attributes={'email': 'user@example.com'})
+
+        assert len(customer_io_server.requests) == 2
+
+    def test_batch(self, customer_io_server, client):
+        client.batch_size = 2
+
+        with client.batch():
+            for index in range(3):
+                client.identify_person(reference=f'reference-{index}', attributes={'index': index})
+                client.track_person_event(reference=f'reference-{index}', name='UserInvited', data={})
+
+            assert customer_io_server.requests == []
+
+        assert [(method, path) for method, path, _ in customer_io_server.requests] == [('POST', '/api/v2/batch')] * 3
+        assert [
+            operation['action'] for _, _, payload in customer_io_server.requests for operation in payload['batch']
+        ] == [
+            'identify',
+            'event',
+        ] * 3
+
+    def test_failed_batch_is_raised(self, customer_io_server, client):
+        client.batch_size = 1
+        customer_io_server.statuses = [500]
+
+        with pytest.raises(requests.HTTPError):
+            with client.batch():
+                client.track_person_event(reference='reference', name='UserInvited', data={})
+                client.track_person_event(reference='reference', name='UserActivated', data={})
+
+        # the remaining chunks are still sent
+        assert len(customer_io_server.requests) == 2
@@ -5,16 +5,23 @@ from saas.service.enterprize import create_enterprize
 
 
 class TestCreateEnterprize:
-    def test_can_create_enterprize(self, user_repository):
-        enterprize = create_enterprize(name='test', subdomain='test', repository=user_repository)
+    def test_can_create_enterprize(self, user_repository, unit_of_work):
+        enterprize = create_enterprize(
+            name='test', subdomain='test', repository=user_repository, unit_of_work=unit_of_work
+        )
 
         assert enterprize.name == 'test'
         assert enterprize.subdomain == 'test'
+        assert unit_of_work.commits == 1
 
-    def test_cannot_create_enterprize_subdomain_exists(self, user_repository, enterprize):
+    def test_cannot_create_enterprize_subdomain_exists(self, user_repository, enterprize, unit_of_work):
         with pytest.raises(EnterprizeExists):
             create_enterprize(
                 name=enterprize.name,
                 subdomain=enterprize.subdomain,
                 repository=user_repository,
+                unit_of_work=unit_of_work,
             )
+
+        assert unit_of_work.commits == 0
+        assert unit_of_work.rollbacks == 1
@@ -0,0 +1,79 @@
+import atexit
+import dataclasses
+import threading
+
+import pytest
+
+from saas.domain.base import DomainEvent
+from saas.service.message_bus.dispatcher import HANDLERS, InlineDispatcher, ThreadPoolDispatcher, run_handlers
+
+
+@dataclasses.dataclass(frozen=True)
+class SomethingHappened(DomainEvent):
+    name: str = dataclasses.field(default='SomethingHappened', init=False)
+    value: int
+
+
+@pytest.fixture
+def handled_events(monkeypatch):
+    handled_events = []
+
+    def record_event(event):
+        handled_events.append((event.value, threading.current_thread().name))
+
+    def fail(event):
+        raise RuntimeError('Handler failed.')
+
+    monkeypatch.setitem(HANDLERS, SomethingHappened, {record_event, fail})
+
+    return handled_events
+
+
+class TestRunHandlers:
+    def test_failure_is_raised_after_every_handler_ran(self, handled_events):
+        with pytest.raises(RuntimeError):
+            run_handlers(event=SomethingHappened(value=1))
+
+        assert handled_events == [(1, threading.current_thread().name)]
+
+
+class TestInlineDispatcher:
+    def test_handlers_run_in_calling_thread(self, handled_events):
+        InlineDispatcher().dispatch(event=SomethingHappened(value=1))
+
+        assert handled_events == [(1, threading.current_thread().name)]
+
+
+class TestThreadPoolDispatcher:
+    def test_handlers_run_in_workers(self, handled_events):
+        dispatcher = ThreadPoolDispatcher(workers=2)
+
+        for value in range(10):
+            dispatcher.dispatch(event=SomethingHappened(value=value))
+        dispatcher.join()
+        dispatcher.stop()
+
+        assert sorted(value for value, _ in handled_events) == list(range(10))
+        assert all(thread_name.startswith('message-bus-') for _, thread_name in handled_events)
+
+    def test_stop_drains_queue(self, handled_events):
+        dispatcher = ThreadPoolDispatcher(workers=1)
+
+        for value in range(5):
+            dispatcher.dispatch(event=SomethingHappened(value=value))
+        dispatcher.stop()
+
+        assert len(handled_events) == 5
+        assert dispatcher.queue.empty()
+
+    def test_stop_is_registered_at_exit_once(self, handled_events, monkeypatch):
+        registered = []
+        monkeypatch.setattr(atexit, 'register', registered.append)
+        dispatcher = ThreadPoolDispatcher(workers=1)
+
+        for value in range(3):
+            dispatcher.dispatch(event=SomethingHappened(value=value))
+            dispatcher.stop()
+
+        assert registered == [dispatcher.stop]
+        assert len(handled_events) == 3
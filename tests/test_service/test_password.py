@@ -1,8 +1,14 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from passlib.hash import argon2
 
 from saas.domain.exceptions import InvalidPasswordHash
 from saas.domain.services import create_hashed_password, verify_hashed_password
+from saas.service.authentication import PasswordHasher
+from saas.service.exceptions import PasswordHashingBusy
 
 
 class TestPassword:
@@ -28,3 +34,43 @@ class TestPassword:
 
         with pytest.raises(InvalidPasswordHash):
             verify_hashed_password(plain_password=plain_password, password=hashed_password)
+
+
+class TestPasswordHasher:
+    plain_password = 'plain_password'
+
+    @pytest.fixture
+    def password_hasher(self):
+        password_hasher = PasswordHasher(executor=ThreadPoolExecutor(max_workers=2), max_pending=2)
+        yield password_hasher
+        password_hasher.shutdown()
+
+    def test_can_hash_and_verify_password(self, password_hasher):
+        hashed_password = password_hasher.hash(plain_password=self.plain_password)
+
+        assert password_hasher.verify(plain_password=self.plain_password, password=hashed_password)
+        assert not password_hasher.verify(plain_password='wrong_password', password=hashed_password)
+
+    def test_can_hash_and_verify_password_async(self, password_hasher):
+        async def hash_and_verify():
+            hashed_password = await password_hasher.async_hash(plain_password=self.plain_password)
+            return await password_hasher.async_verify(plain_password=self.plain_password, password=hashed_password)
+
+        assert asyncio.run(hash_and_verify())
+
+    def test_malformed_hash_propagates(self, password_hasher):
+        with pytest.raises(InvalidPasswordHash):
+            password_hasher.verify(plain_password=self.plain_password, password='malformed')
+
+    def test_busy_when_saturated(self, password_hasher):
+        released = threading.Event()
+        blocked = [password_hasher._submit(released.wait) for _ in range(password_hasher.max_pending)]
+
+        with pytest.raises(PasswordHashingBusy):
+            password_hasher.hash(plain_password=self.plain_password)
+
+        released.set()
+        for future in blocked:
+            future.result()
+
+        assert password_hasher.hash(plain_password=self.plain_password)
@@ -0,0 +1,328 @@
+import fcntl
+import io
+import struct
+import threading
+
+import pytest
+from PIL import Image
+
+from saas.service.exceptions import BlobDoesNotExist, InvalidPhoto, PhotoPipelineBusy, PhotoTooLarge
+from saas.service.photos import (
+    PhotoCache,
+    PhotoHeader,
+    PhotoPipeline,
+    create_photo_variants,
+    read_photo_header,
+    validate_photo,
+)
+from saas.service.photos.validation import PNG_SIGNATURE
+
+
+class TestPhotoVariants:
+    def test_variants_are_resized(self, photo):
+        variants = {variant.name: variant for variant in create_photo_variants(photo=photo)}
+
+        assert Image.open(io.BytesIO(variants['thumbnail'].data)).size == (128, 96)
+        assert Image.open(io.BytesIO(variants['medium'].data)).size == (512, 384)
+        assert variants['medium'].content_type == 'image/jpeg'
+
+    def test_small_photo_is_not_upscaled(self):
+        photo = io.BytesIO()
+        Image.new(mode='RGB', size=(64, 64)).save(photo, format='PNG')
+        photo.seek(0)
+
+        variants = create_photo_variants(photo=photo)
+
+        assert {Image.open(io.BytesIO(variant.data)).size for variant in variants} == {(64, 64)}
+
+    def test_metadata_is_stripped(self):
+        image = Image.new(mode='RGB', size=(600, 300))
+        exif = image.getexif()
+        exif[0x0112] = 6  # rotated 90 degrees clockwise
+        exif[0x010F] = 'Camera maker'
+        photo = io.BytesIO()
+        image.save(photo, format='JPEG', exif=exif)
+        photo.seek(0)
+
+        medium = next(variant for variant in create_photo_variants(photo=photo) if variant.name == 'medium')
+        variant = Image.open(io.BytesIO(medium.data))
+
+        assert variant.size == (256, 512)
+        assert not variant.getexif()
+
+    def test_transparency_is_kept(self):
+        photo = io.BytesIO()
+        Image.new(mode='RGBA', size=(32, 32)).save(photo, format='PNG')
+        photo.seek(0)
+
+        assert {variant.content_type for variant in create_photo_variants(photo=photo)} == {'image/png'}
+
+    def test_invalid_photo(self):
+        with pytest.raises(InvalidPhoto):
+            create_photo_variants(photo=io.BytesIO(b'not an image'))
+
+    def test_pixel_limit(self, photo):
+        with pytest.raises(InvalidPhoto):
+            create_photo_variants(photo=photo, max_pixels=1_000)
+
+
+class TestPhotoPipeline:
+    @pytest.fixture
+    def processed(self):
+        return []
+
+    @pytest.fixture
+    def pipeline(self, tmp_path, processed):
+        def process(reference, path, replaces_version):
+            processed.append((reference, replaces_version, path.read_bytes()))
+
+        pipeline = PhotoPipeline(spool_path=str(tmp_path), process=process, workers=1, max_pending=2)
+        yield pipeline
+        pipeline.shutdown()
+
+    def test_accepted_photo_is_processed_and_removed(self, pipeline, processed, tmp_path):
+        pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version=None).result()
+
+        assert processed == [('reference', None, b'photo')]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_accepted_photo_carries_the_version_it_replaces(self, pipeline, processed):
+        pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version='1a2b3c').result()
+
+        assert processed == [('reference', '1a2b3c', b'photo')]
+
+    def test_invalid_photo_is_removed(self, tmp_path):
+        def process(reference, path, replaces_version):
+            raise InvalidPhoto(reason='broken')
+
+        pipeline = PhotoPipeline(spool_path=str(tmp_path), process=process, workers=1, max_pending=1)
+        pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version=None).result()
+        pipeline.shutdown()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failed_photo_is_retried(self, tmp_path, processed):
+        def process(reference, path, replaces_version):
+            processed.append(reference)
+            if len(processed) == 1:
+                raise ConnectionError('storage unavailable')
+            done.set()
+
+        done = threading.Event()
+        pipeline = PhotoPipeline(
+            spool_path=str(tmp_path), process=process, workers=1, max_pending=1, retry_delay_in_seconds=0.01
+        )
+        pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version=None).result()
+
+        assert done.wait(timeout=5)
+        pipeline.shutdown()
+
+        assert processed == ['reference', 'reference']
+        assert list(tmp_path.iterdir()) == []
+
+    def test_photo_is_set_aside_after_last_attempt(self, tmp_path):
+        def process(reference, path, replaces_version):
+            raise ConnectionError('storage unavailable')
+
+        pipeline = PhotoPipeline(spool_path=str(tmp_path), process=process, workers=1, max_pending=1, max_attempts=1)
+        pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version=None).result()
+        pipeline.shutdown()
+
+        assert [path.name for path in tmp_path.iterdir()] == ['failed']
+        assert len(list((tmp_path / 'failed').iterdir())) == 1
+
+    def test_busy_when_saturated(self, tmp_path):
+        released = threading.Event()
+        pipeline = PhotoPipeline(
+            spool_path=str(tmp_path),
+            process=lambda reference, path, replaces_version: released.wait(),
+            workers=1,
+            max_pending=1,
+        )
+        future = pipeline.accept(reference='reference', file_obj=io.BytesIO(b'photo'), replaces_version=None)
+
+        with pytest.raises(PhotoPipelineBusy):
+            pipeline.accept(reference='other', file_obj=io.BytesIO(b'photo'), replaces_version=None)
+
+        released.set()
+        future.result()
+        pipeline.shutdown()
+
+        assert len(list(tmp_path.iterdir())) == 0
+
+    def test_recover_spooled_photos(self, pipeline, processed, tmp_path):
+        (tmp_path / 'reference.none.1234.photo').write_bytes(b'photo')
+        (tmp_path / 'stamped.1a2b3c.5678.photo').write_bytes(b'stamped')
+        (tmp_path / 'other.none.5678.partial').write_bytes(b'incomplete')
+
+        assert pipeline.recover() == 2
+        pipeline.shutdown()
+
+        assert processed == [('reference', None, b'photo'), ('stamped', '1a2b3c', b'stamped')]
+        assert [path.name for path in tmp_path.iterdir()] == ['other.none.5678.partial']
+
+    def test_recover_skips_photos_claimed_elsewhere(self, pipeline, processed, tmp_path):
+        path = tmp_path / 'reference.none.1234.photo'
+        path.write_bytes(b'photo')
+
+        with path.open('rb') as claimed:
+            fcntl.flock(claimed.fileno(), fcntl.LOCK_EX)
+
+            assert pipeline.recover() == 0
+
+        assert pipeline.recover() == 1
+        pipeline.shutdown()
+
+        assert processed == [('reference', None, b'photo')]
+
+
+class TestPhotoValidation:
+    @staticmethod
+    def encode(image: 'Image.Image', **options) -> io.BytesIO:
+        photo = io.BytesIO()
+        image.save(photo, **options)
+        photo.seek(0)
+
+        return photo
+
+    @pytest.mark.parametrize(
+        'mode, options, expected_format',
+        [
+            ('RGB', dict(format='JPEG'), 'JPEG'),
+            ('RGB', dict(format='JPEG', progressive=True), 'JPEG'),
+            ('RGBA', dict(format='PNG'), 'PNG'),
+            ('P', dict(format='GIF'), 'GIF'),
+            ('RGB', dict(format='WEBP'), 'WEBP'),
+            ('RGB', dict(format='WEBP', lossless=True), 'WEBP'),
+            ('RGBA', dict(format='WEBP'), 'WEBP'),
+        ],
+    )
+    def test_header_is_read(self, mode, options, expected_format):
+        photo = self.encode(Image.new(mode=mode, size=(321, 123)), **options)
+
+        header = read_photo_header(photo=photo)
+
+        assert header == PhotoHeader(format=expected_format, width=321, height=123)
+        assert photo.tell() == 0
+
+    def test_jpeg_header_after_large_exif(self):
+        exif = Image.Exif()
+        exif[0x010E] = 'x' * 60_000
+        photo = self.encode(Image.new(mode='RGB', size=(40, 30)), format='JPEG', exif=exif)
+
+        assert read_photo_header(photo=photo) == PhotoHeader(format='JPEG', width=40, height=30)
+
+    def test_decompression_bomb_is_rejected(self):
+        # a valid png signature and header for a 100000x100000 image, without any pixel data
+        header = struct.pack('>IIBBBBB', 100_000, 100_000, 8, 2, 0, 0, 0)
+        photo = io.BytesIO(PNG_SIGNATURE + struct.pack('>I', len(header)) + b'IHDR' + header + b'\x00' * 4)
+
+        with pytest.raises(InvalidPhoto):
+            validate_photo(photo=photo, max_size_in_bytes=1024, max_pixels=40_000_000)
+
+    def test_dimension_limit(self):
+        photo = self.encode(Image.new(mode='RGB', size=(2_000, 10)), format='PNG')
+
+        with pytest.raises(InvalidPhoto):
+            validate_photo(photo=photo, max_size_in_bytes=1024 * 1024, max_pixels=40_000_000, max_dimension=1_000)
+
+    def test_size_limit(self, photo):
+        with pytest.raises(PhotoTooLarge):
+            validate_photo(photo=photo, max_size_in_bytes=100, max_pixels=40_000_000)
+
+    @pytest.mark.parametrize('data', [b'', b'not an image', PNG_SIGNATURE, b'\xff\xd8\xff\xe0\x00'])
+    def test_invalid_header(self, data):
+        with pytest.raises(InvalidPhoto):
+            validate_photo(photo=io.BytesIO(data), max_size_in_bytes=1024, max_pixels=40_000_000)
+
+
+class TestPhotoCache:
+    @staticmethod
+    def write(data: bytes):
+        return lambda file_obj: file_obj.write(data)
+
+    def test_miss_and_fill(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+
+        assert cache.open(key='photo') is None
+        with cache.fill(key='photo', write=self.write(b'photo')) as photo:
+            assert photo.read() == b'photo'
+        with cache.open(key='photo') as photo:
+            assert photo.read() == b'photo'
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=10)
+        cache.fill(key='first', write=self.write(b'x' * 4)).close()
+        cache.fill(key='second', write=self.write(b'x' * 4)).close()
+        cache.open(key='first').close()
+
+        cache.fill(key='third', write=self.write(b'x' * 4)).close()
+
+        assert cache.open(key='second') is None
+        assert cache.open(key='first') is not None
+        assert cache.size_in_bytes == 8
+
+    def test_evicted_photo_stays_readable(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=4)
+        photo = cache.fill(key='first', write=self.write(b'x' * 4))
+
+        cache.fill(key='second', write=self.write(b'y' * 4)).close()
+
+        assert photo.read() == b'x' * 4
+        photo.close()
+
+    def test_failed_fill_leaves_nothing_behind(self, tmp_path):
+        def write(file_obj):
+            file_obj.write(b'partial')
+            raise BlobDoesNotExist(name='photo')
+
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+
+        with pytest.raises(BlobDoesNotExist):
+            cache.fill(key='photo', write=write)
+
+        assert len(cache) == 0
+        assert list(cache.path.iterdir()) == []
+
+    def test_entries_survive_restart(self, tmp_path):
+        previous = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+        previous.fill(key='photo', write=self.write(b'photo')).close()
+        previous.close()
+
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+
+        assert len(cache) == 1
+        assert cache.open(key='photo').read() == b'photo'
+
+    def test_discard_removes_photo_from_every_slot(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=200, slots=2)
+        other = PhotoCache(path=str(tmp_path), max_size_in_bytes=200, slots=2)
+        cache.fill(key='photo', write=self.write(b'photo')).close()
+        other.fill(key='photo', write=self.write(b'photo')).close()
+
+        cache.discard(key='photo')
+
+        assert cache.open(key='photo') is None
+        assert other.open(key='photo') is None
+        assert other.size_in_bytes == 0
+
+    def test_processes_share_the_budget(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=200, slots=2)
+        other = PhotoCache(path=str(tmp_path), max_size_in_bytes=200, slots=2)
+
+        assert cache.path != other.path
+        assert cache.max_size_in_bytes == other.max_size_in_bytes == 100
+
+    def test_partial_fills_of_other_processes_are_kept(self, tmp_path):
+        cache = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+        partial = cache.path / '.photo.1234.partial'
+        cache.path.mkdir()
+        partial.write_bytes(b'pho')
+
+        other = PhotoCache(path=str(tmp_path), max_size_in_bytes=100)
+
+        assert partial.exists()
+        assert other.open(key='photo') is None
+        with other.fill(key='photo', write=self.write(b'photo')) as photo:
+            assert photo.read() == b'photo'
+        assert len(other) == 0
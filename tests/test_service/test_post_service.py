@@ -9,65 +9,107 @@ from saas.service.post import (
     delete_news_post,
 )
 from saas.domain.exceptions import PostDoesNotExist
+from saas.service.exceptions import InvalidCursor
+from saas.service.pagination import encode_cursor
 import pytest
 
 
 class TestNewsPostService:
-    def test_admin_can_create_news_post(self, admin_profile, post_content, post_repository):
-        post = create_post(author=admin_profile, content=post_content, repository=post_repository)
+    def test_admin_can_create_news_post(self, admin_profile, post_content, post_repository, unit_of_work):
+        post = create_post(
+            author=admin_profile, content=post_content, repository=post_repository, unit_of_work=unit_of_work
+        )
 
         assert post.author == admin_profile
         assert post.content == post_content
+        assert unit_of_work.commits == 1
 
     def test_can_list_news_posts_by_enterprize(self, enterprize, news_post, post_repository):
         posts = list_posts_by_enterprize(enterprize=enterprize, repository=post_repository)
 
         assert news_post in posts
 
-    def test_admin_can_delete_news_post(self, admin_profile, news_post, post_repository):
+    def test_can_paginate_news_posts(
+        self, enterprize, admin_profile, news_post, post_content, post_repository, unit_of_work
+    ):
+        other_news_post = create_post(
+            author=admin_profile, content=post_content, repository=post_repository, unit_of_work=unit_of_work
+        )
+
+        first_page = list_posts_by_enterprize(enterprize=enterprize, repository=post_repository, limit=1)
+        before = encode_cursor(created=first_page[-1].created, reference=first_page[-1].reference)
+        second_page = list_posts_by_enterprize(
+            enterprize=enterprize, repository=post_repository, limit=1, before=before
+        )
+
+        assert first_page == [other_news_post]
+        assert second_page == [news_post]
+
+    def test_cannot_list_news_posts_invalid_cursor(self, enterprize, post_repository):
+        with pytest.raises(InvalidCursor):
+            list_posts_by_enterprize(enterprize=enterprize, repository=post_repository, before='invalid')
+
+    def test_admin_can_delete_news_post(self, admin_profile, news_post, post_repository, unit_of_work):
         delete_news_post(
-            news_post_id=news_post.reference, admin_username=admin_profile.username, repository=post_repository
+            news_post_id=news_post.reference,
+            admin_username=admin_profile.username,
+            repository=post_repository,
+            unit_of_work=unit_of_work,
         )
 
         assert news_post.deleted is not None
 
-    def test_admin_cannot_delete_already_delete_news_post(self, admin_profile, news_post, post_repository):
+    def test_admin_cannot_delete_already_delete_news_post(
+        self, admin_profile, news_post, post_repository, unit_of_work
+    ):
         with pytest.raises(PostDoesNotExist):
             delete_news_post(
-                news_post_id=news_post.reference, admin_username=admin_profile.username, repository=post_repository
+                news_post_id=news_post.reference,
+                admin_username=admin_profile.username,
+                repository=post_repository,
+                unit_of_work=unit_of_work,
             )
             delete_news_post(
-                news_post_id=news_post.reference, admin_username=admin_profile.username, repository=post_repository
+                news_post_id=news_post.reference,
+                admin_username=admin_profile.username,
+                repository=post_repository,
+                unit_of_work=unit_of_work,
             )
 
-    def test_wrong_admin_cannot_delete_news_post(self, other_admin_profile, news_post, post_repository):
+    def test_wrong_admin_cannot_delete_news_post(self, other_admin_profile, news_post, post_repository, unit_of_work):
         with pytest.raises(PostDoesNotExist):
             delete_news_post(
                 admin_username=other_admin_profile.username,
                 news_post_id=news_post.reference,
                 repository=post_repository,
+                unit_of_work=unit_of_work,
             )
 
-    def test_user_cannot_delete_news_post(self, profile, news_post, post_repository):
+    def test_user_cannot_delete_news_post(self, profile, news_post, post_repository, unit_of_work):
         with pytest.raises(PostDoesNotExist):
             delete_news_post(
                 admin_username=profile.username,
                 news_post_id=news_post.reference,
                 repository=post_repository,
+                unit_of_work=unit_of_work,
             )
 
 
 class TestQAService:
     tags = {'tag1', 'tag2', 'tag3'}
 
-    def test_post_question(self, profile, post_content, post_repository):
-        question = post_question(author=profile, content=post_content, repository=post_repository)
+    def test_post_question(self, profile, post_content, post_repository, unit_of_work):
+        question = post_question(
+            author=profile, content=post_content, repository=post_repository, unit_of_work=unit_of_work
+        )
 
         assert question.author == profile
         assert question.content == post_content
 
-    def test_post_question_with_tags(self, profile, post_content, post_repository):
-        question = post_question(author=profile, content=post_content, repository=post_repository, tags=self.tags)
+    def test_post_question_with_tags(self, profile, post_content, post_repository, unit_of_work):
+        question = post_question(
+            author=profile, content=post_content, repository=post_repository, tags=self.tags, unit_of_work=unit_of_work
+        )
 
         assert question.author == profile
         assert question.content == post_content
@@ -83,8 +125,14 @@ class TestQAService:
 
         assert retrieved_question is question
 
-    def test_post_answer(self, profile, question, post_content, post_repository):
-        answer = create_answer(author=profile, content=post_content, question=question, repository=post_repository)
+    def test_post_answer(self, profile, question, post_content, post_repository, unit_of_work):
+        answer = create_answer(
+            author=profile,
+            content=post_content,
+            question=question,
+            repository=post_repository,
+            unit_of_work=unit_of_work,
+        )
 
         assert answer.author == profile
         assert answer.question == question
@@ -1,5 +1,10 @@
 import dataclasses
+import io
 from datetime import date, timedelta
+
+import pytest
+from PIL import Image
+
 from saas.domain.users import (
     Address,
     Contact,
@@ -12,12 +17,16 @@ from saas.domain.users import (
     LegalStatus,
 )
 from saas.domain.users.events import UserInvited
+from saas.service.exceptions import InvalidCursor, InvalidPhoto
+from saas.service.pagination import encode_cursor
 from saas.service.profile import (
     retrieve_profiles,
     update_profile,
     upload_user_photo,
+    delete_user_photo,
     create_profile,
     invite_user_to_register,
+    invite_users_to_register,
     update_non_public_profile,
 )
 
@@ -34,6 +43,14 @@ class TestProfileService:
         exit_date=date.today(),
     )
 
+    @pytest.fixture(scope='function')
+    def other_photo(self):
+        other_photo = io.BytesIO()
+        Image.new(mode='RGB', size=(300, 300), color='red').save(other_photo, format='PNG')
+        other_photo.seek(0)
+
+        return other_photo
+
     def test_can_create_profile(self, user_repository, enterprize):
         profile = create_profile(repository=user_repository, enterprize=enterprize)
 
@@ -45,7 +62,33 @@ class TestProfileService:
         assert profile in profiles
         assert admin_profile in profiles
 
-    def test_can_update_profile(self, user, user_repository):
+    def test_can_paginate_profiles(self, profile, admin_profile, user_repository):
+        first_page = retrieve_profiles(admin_username=admin_profile.user.username, repository=user_repository, limit=1)
+        cursor = encode_cursor(created=first_page[-1].created, reference=first_page[-1].reference)
+        second_page = retrieve_profiles(
+            admin_username=admin_profile.user.username, repository=user_repository, limit=1, cursor=cursor
+        )
+
+        assert len(first_page) == 1
+        assert len(second_page) == 1
+        assert {first_page[0], second_page[0]} == {profile, admin_profile}
+
+    def test_can_filter_profiles(self, profile, admin_profile, user_repository):
+        profile.availability = UserAvailability.available
+
+        profiles = retrieve_profiles(
+            admin_username=admin_profile.user.username,
+            repository=user_repository,
+            availability=UserAvailability.available,
+        )
+
+        assert profiles == [profile]
+
+    def test_cannot_retrieve_profiles_invalid_cursor(self, admin_profile, user_repository):
+        with pytest.raises(InvalidCursor):
+            retrieve_profiles(admin_username=admin_profile.user.username, repository=user_repository, cursor='invalid')
+
+    def test_can_update_profile(self, user, user_repository, unit_of_work):
         update_arguments = {
             'first_name': self.full_name.first_name,
             'last_name': self.full_name.last_name,
@@ -63,7 +106,9 @@ class TestProfileService:
             'availability': UserAvailability.available,
             'motivation': [UserMotivation.job, UserMotivation.mentor],
         }
-        profile = update_profile(username=user.username, repository=user_repository, **update_arguments)
+        profile = update_profile(
+            username=user.username, repository=user_repository, unit_of_work=unit_of_work, **update_arguments
+        )
 
         assert profile.full_name == self.full_name
         assert profile.contact == self.contact
@@ -73,7 +118,7 @@ class TestProfileService:
         assert profile.birthdate == date.today() - timedelta(weeks=250)
         assert profile.motivation == [UserMotivation.job, UserMotivation.mentor]
 
-    def test_can_update_non_public_profile(self, profile, user_repository):
+    def test_can_update_non_public_profile(self, profile, user_repository, unit_of_work):
         update_arguments = {
             'legal_status': self.enterprize_notes.legal_status,
             'exit_notes': self.enterprize_notes.exit_notes,
@@ -81,7 +126,10 @@ class TestProfileService:
             'exit_date': self.enterprize_notes.exit_date,
         }
         profile = update_non_public_profile(
-            profile_id=profile.reference, repository=user_repository, **update_arguments
+            profile_id=profile.reference,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+            **update_arguments,
         )
 
         assert profile.enterprize_notes.legal_status == self.enterprize_notes.legal_status
@@ -89,32 +137,208 @@ class TestProfileService:
         assert profile.enterprize_notes.enter_date == self.enterprize_notes.enter_date
         assert profile.enterprize_notes.exit_date == self.enterprize_notes.exit_date
 
-    def test_can_update_non_public_profile_partially(self, profile, user_repository, enterprize_notes):
+    def test_can_update_non_public_profile_partially(self, profile, user_repository, enterprize_notes, unit_of_work):
         update_arguments = {
             'legal_status': self.enterprize_notes.legal_status,
             'exit_date': self.enterprize_notes.exit_date,
         }
         profile = update_non_public_profile(
-            profile_id=profile.reference, repository=user_repository, **dataclasses.asdict(enterprize_notes)
+            profile_id=profile.reference,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+            **dataclasses.asdict(enterprize_notes),
         )
         profile = update_non_public_profile(
-            profile_id=profile.reference, repository=user_repository, **update_arguments
+            profile_id=profile.reference,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+            **update_arguments,
         )
         assert profile.enterprize_notes.legal_status == self.enterprize_notes.legal_status
         assert profile.enterprize_notes.exit_notes == enterprize_notes.exit_notes
         assert profile.enterprize_notes.enter_date == enterprize_notes.enter_date
         assert profile.enterprize_notes.exit_date == self.enterprize_notes.exit_date
 
-    def test_can_upload_photo(self, profile, photo, user_repository):
-        photo_url = upload_user_photo(username=profile.user.username, photo=photo, repository=user_repository)
+    def test_can_upload_photo(self, profile, photo, blob_store, photo_cache, user_repository, unit_of_work):
+        photo_url = upload_user_photo(
+            reference=profile.reference,
+            photo=photo,
+            replaces_version=None,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+        assert photo_url == profile.photo_url == f'/photos/{profile.reference}/{profile.photo_version}/medium'
+        assert blob_store.path(name=f'{profile.reference}/{profile.photo_version}/thumbnail').exists()
+        assert unit_of_work.commits == 1
+
+    def test_upload_photo_replaces_previous_version(
+        self, profile, photo, other_photo, blob_store, photo_cache, user_repository, unit_of_work
+    ):
+        upload_user_photo(
+            reference=profile.reference,
+            photo=photo,
+            replaces_version=None,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+        previous_version = profile.photo_version
+        photo_cache.fill(
+            key=f'{profile.reference}.{previous_version}.medium', write=lambda file_obj: file_obj.write(b'photo')
+        ).close()
+
+        upload_user_photo(
+            reference=profile.reference,
+            photo=other_photo,
+            replaces_version=previous_version,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
 
-        assert photo_url == str(profile.photo)
+        assert profile.photo_version != previous_version
+        assert blob_store.path(name=f'{profile.reference}/{profile.photo_version}/medium').exists()
+        assert not blob_store.path(name=f'{profile.reference}/{previous_version}/medium').exists()
+        assert photo_cache.open(key=f'{profile.reference}.{previous_version}.medium') is None
 
-    def test_can_invite_user_to_register_user_exists(self, profile, admin_profile, user_repository):
-        invite_user_to_register(username=profile.user.username, creator=admin_profile, repository=user_repository)
+    def test_upload_accepted_before_a_delete_is_discarded(
+        self, profile, photo, other_photo, blob_store, photo_cache, user_repository, unit_of_work
+    ):
+        upload_user_photo(
+            reference=profile.reference,
+            photo=photo,
+            replaces_version=None,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+        accepted_over = profile.photo_version
+        delete_user_photo(
+            username=profile.user.username,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+        photo_url = upload_user_photo(
+            reference=profile.reference,
+            photo=other_photo,
+            replaces_version=accepted_over,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+        assert photo_url is None
+        assert profile.photo_url is None
+        assert profile.photo_version is None
+        assert unit_of_work.rollbacks == 1
+        assert list(blob_store.path(name=profile.reference).glob('*/*')) == []
+
+    def test_overlapping_uploads_keep_the_first_committed(
+        self, profile, photo, other_photo, blob_store, photo_cache, user_repository, unit_of_work
+    ):
+        # both were accepted while the profile had no photo
+        for uploaded in (photo, other_photo):
+            upload_user_photo(
+                reference=profile.reference,
+                photo=uploaded,
+                replaces_version=None,
+                blob_store=blob_store,
+                photo_cache=photo_cache,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
+
+        assert unit_of_work.commits == 1
+        assert {path.parent.name for path in blob_store.path(name=profile.reference).glob('*/*')} == {
+            profile.photo_version
+        }
+
+    def test_upload_invalid_photo(self, profile, blob_store, photo_cache, user_repository, unit_of_work):
+        with pytest.raises(InvalidPhoto):
+            upload_user_photo(
+                reference=profile.reference,
+                photo=io.BytesIO(b'not an image'),
+                replaces_version=None,
+                blob_store=blob_store,
+                photo_cache=photo_cache,
+                repository=user_repository,
+                unit_of_work=unit_of_work,
+            )
+
+        assert profile.photo_url is None
+
+    def test_can_delete_photo(self, profile, photo, blob_store, photo_cache, user_repository, unit_of_work):
+        upload_user_photo(
+            reference=profile.reference,
+            photo=photo,
+            replaces_version=None,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+        version = profile.photo_version
+        photo_cache.fill(
+            key=f'{profile.reference}.{version}.medium', write=lambda file_obj: file_obj.write(b'photo')
+        ).close()
+
+        delete_user_photo(
+            username=profile.user.username,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+        assert profile.photo_url is None
+        assert profile.photo_version is None
+        assert not blob_store.path(name=f'{profile.reference}/{version}/medium').exists()
+        assert photo_cache.open(key=f'{profile.reference}.{version}.medium') is None
+
+    def test_can_invite_user_to_register_user_exists(self, profile, admin_profile, user_repository, unit_of_work):
+        invite_user_to_register(
+            username=profile.user.username,
+            creator=admin_profile,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
 
         assert profile.user.invited is not None
         assert isinstance(profile.event_logs[-1], UserInvited)
 
-    def test_can_invite_user_to_register_user_does_not_exist(self, credentials, admin_profile, user_repository):
-        invite_user_to_register(username=credentials.username, creator=admin_profile, repository=user_repository)
+    def test_can_invite_users_to_register_in_bulk(
+        self, profile, other_profile, admin_profile, user_repository, unit_of_work
+    ):
+        invited_profiles = invite_users_to_register(
+            usernames=['new@example.com', profile.user.username.upper(), other_profile.user.username],
+            creator=admin_profile,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+        assert list(invited_profiles) == ['new@example.com', profile.user.username, other_profile.user.username]
+        assert invited_profiles['new@example.com'].user.invited is not None
+        assert invited_profiles['new@example.com'].enterprize == admin_profile.enterprize
+        assert invited_profiles[profile.user.username] is profile
+        assert isinstance(profile.event_logs[-1], UserInvited)
+        assert invited_profiles[other_profile.user.username] is None
+        assert other_profile.user.invited is None
+        assert user_repository.retrieve_by_username(username='new@example.com') is not None
+        assert unit_of_work.commits == 1
+
+    def test_can_invite_user_to_register_user_does_not_exist(
+        self, credentials, admin_profile, user_repository, unit_of_work
+    ):
+        invite_user_to_register(
+            username=credentials.username, creator=admin_profile, repository=user_repository, unit_of_work=unit_of_work
+        )
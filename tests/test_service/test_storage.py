@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+from saas.service.storage import GoogleCloudBlobStore, LocalBlobStore
+
+
+class FakeBlob:
+    def __init__(self, name: str):
+        self.name = name
+        self.chunk_size = None
+        self.uploads = []
+
+    def upload_from_file(self, file_obj, size, content_type, predefined_acl):
+        self.uploads.append(
+            dict(data=file_obj.read(), size=size, chunk_size=self.chunk_size, predefined_acl=predefined_acl)
+        )
+
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs = {}
+
+    def blob(self, blob_name: str) -> 'FakeBlob':
+        return self.blobs.setdefault(blob_name, FakeBlob(name=blob_name))
+
+
+class FakeClient:
+    def __init__(self):
+        self.buckets = []
+
+    def bucket(self, bucket_name: str) -> 'FakeBucket':
+        self.buckets.append(bucket_name)
+        return FakeBucket()
+
+
+class TestLocalBlobStore:
+    def test_can_upload_and_delete(self, tmp_path):
+        blob_store = LocalBlobStore(root=str(tmp_path))
+
+        blob_store.upload(name='enterprize/document', file_obj=io.BytesIO(b'document'), content_type='text/plain')
+
+        assert (tmp_path / 'enterprize' / 'document').read_bytes() == b'document'
+        assert blob_store.public_url(name='enterprize/document') == f'{tmp_path.as_uri()}/enterprize/document'
+
+        blob_store.delete(name='enterprize/document')
+        blob_store.delete(name='enterprize/document')
+
+        assert not (tmp_path / 'enterprize' / 'document').exists()
+
+    def test_upload_outside_root(self, tmp_path):
+        blob_store = LocalBlobStore(root=str(tmp_path / 'blobs'))
+
+        with pytest.raises(ValueError):
+            blob_store.upload(name='../document', file_obj=io.BytesIO(b'document'), content_type='text/plain')
+
+
+class TestGoogleCloudBlobStore:
+    @pytest.fixture
+    def client(self):
+        return FakeClient()
+
+    @pytest.fixture
+    def blob_store(self, client):
+        return GoogleCloudBlobStore(
+            bucket_name='bucket',
+            chunk_size_in_bytes=256 * 1024,
+            resumable_threshold_in_bytes=1024,
+            client=client,
+        )
+
+    def test_client_is_shared(self, blob_store, client):
+        blob_store.upload(name='first', file_obj=io.BytesIO(b'data'), content_type='text/plain')
+        blob_store.upload(name='second', file_obj=io.BytesIO(b'data'), content_type='text/plain')
+
+        assert client.buckets == ['bucket']
+
+    def test_small_file_is_uploaded_in_one_request(self, blob_store):
+        blob_store.upload(name='photo', file_obj=io.BytesIO(b'data'), content_type='image/jpeg', public=True)
+
+        assert blob_store.bucket.blob(blob_name='photo').uploads == [
+            dict(data=b'data', size=4, chunk_size=None, predefined_acl='publicRead')
+        ]
+
+    def test_large_file_is_uploaded_in_chunks(self, blob_store):
+        file_obj = io.BytesIO(b'x' * 4096)
+        file_obj.seek(1024)
+
+        blob_store.upload(name='document', file_obj=file_obj, content_type='application/pdf')
+
+        [upload] = blob_store.bucket.blob(blob_name='document').uploads
+        assert upload['size'] == 3072
+        assert upload['chunk_size'] == 256 * 1024
+        assert upload['predefined_acl'] == 'private'
+
+    def test_chunk_size_has_to_be_a_multiple_of_256_kib(self):
+        with pytest.raises(ValueError):
+            GoogleCloudBlobStore(bucket_name='bucket', chunk_size_in_bytes=1000)
@@ -1,6 +1,53 @@
+import csv
+import io
+import json
+
 import pytest
 from fastapi import status
 
+from saas.web.controllers import admin_users
+
+
+class TestBulkInvitationAPI:
+    uri_path = '/users/actions/bulk-invitation'
+
+    def test_bulk_invitation_200(self, http_client, admin_access_token, other_user):
+        response = http_client.post(
+            self.uri_path,
+            headers={'Authorization': f'Bearer {admin_access_token}'},
+            json={'emails': ['new@example.com', 'NEW@example.com', 'invalid', other_user.username]},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'invited': 1,
+            'results': [
+                {'email': 'new@example.com', 'status': 'invited'},
+                {'email': 'NEW@example.com', 'status': 'duplicate'},
+                {'email': 'invalid', 'status': 'invalid'},
+                {'email': other_user.username, 'status': 'rejected'},
+            ],
+        }
+
+    def test_bulk_invitation_from_csv_200(self, http_client, admin_access_token):
+        document = io.BytesIO(b'email\nfirst@example.com\n\nsecond@example.com\n')
+
+        response = http_client.post(
+            f'{self.uri_path}/csv',
+            headers={'Authorization': f'Bearer {admin_access_token}'},
+            files={'document': ('invitations.csv', document, 'text/csv')},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['invited'] == 2
+
+    def test_bulk_invitation_forbidden_403(self, http_client, access_token):
+        response = http_client.post(
+            self.uri_path, headers={'Authorization': f'Bearer {access_token}'}, json={'emails': ['new@example.com']}
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
 
 class TestInvitationAPI:
     uri_path = '/users/actions/invitation'
@@ -49,6 +96,50 @@ class TestListProfilesAPI:
         assert response.status_code == status.HTTP_200_OK
         assert 'profiles' in response.json()
 
+    def test_list_profiles_paginated_200(self, http_client, profile, admin_access_token):
+        response = http_client.get(
+            self.uri_path, params={'limit': 1}, headers={'Authorization': f'Bearer {admin_access_token}'}
+        )
+        next_response = http_client.get(
+            self.uri_path,
+            params={'limit': 1, 'cursor': response.json()['next_cursor']},
+            headers={'Authorization': f'Bearer {admin_access_token}'},
+        )
+
+        assert len(response.json()['profiles']) == 1
+        assert len(next_response.json()['profiles']) == 1
+        assert response.json()['profiles'] != next_response.json()['profiles']
+
+    def test_list_profiles_unpaginated_200(self, http_client, profile, admin_access_token, monkeypatch):
+        monkeypatch.setattr(admin_users, 'PROFILES_PAGE_SIZE', 1)
+
+        response = http_client.get(self.uri_path, headers={'Authorization': f'Bearer {admin_access_token}'})
+
+        assert len(response.json()['profiles']) == 2
+        assert response.json()['next_cursor'] is None
+
+    def test_list_profiles_cursor_uses_page_size_200(self, http_client, profile, admin_access_token, monkeypatch):
+        monkeypatch.setattr(admin_users, 'PROFILES_PAGE_SIZE', 1)
+        response = http_client.get(
+            self.uri_path, params={'limit': 1}, headers={'Authorization': f'Bearer {admin_access_token}'}
+        )
+
+        next_response = http_client.get(
+            self.uri_path,
+            params={'cursor': response.json()['next_cursor']},
+            headers={'Authorization': f'Bearer {admin_access_token}'},
+        )
+
+        assert len(next_response.json()['profiles']) == 1
+        assert next_response.json()['next_cursor'] is not None
+
+    def test_list_profiles_invalid_cursor_400(self, http_client, admin_access_token):
+        response = http_client.get(
+            self.uri_path, params={'cursor': 'invalid'}, headers={'Authorization': f'Bearer {admin_access_token}'}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_authentication_invalid_credentials_401(self, http_client):
         response = http_client.get(self.uri_path, headers={'Authorization': 'Bearer invalid'})
 
@@ -60,6 +151,33 @@ class TestListProfilesAPI:
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
+class TestExportProfilesAPI:
+    uri_path = '/users/profiles/export'
+
+    def test_export_ndjson_200(self, http_client, profile, admin_profile, admin_access_token):
+        response = http_client.get(self.uri_path, headers={'Authorization': f'Bearer {admin_access_token}'})
+        rows = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        assert {row['reference'] for row in rows} == {profile.reference, admin_profile.reference}
+
+    def test_export_csv_200(self, http_client, profile, admin_profile, admin_access_token):
+        response = http_client.get(
+            self.uri_path, params={'format': 'csv'}, headers={'Authorization': f'Bearer {admin_access_token}'}
+        )
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'].startswith('text/csv')
+        assert {row['email'] for row in rows} == {profile.user.username, admin_profile.user.username}
+
+    def test_forbidden_403(self, http_client, access_token):
+        response = http_client.get(self.uri_path, headers={'Authorization': f'Bearer {access_token}'})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 class TestRetrieveProfileAPI:
     uri_path = '/users/profile'
 
@@ -219,18 +337,39 @@ class TestDashboardAPI:
 
         assert response.status_code == status.HTTP_200_OK
 
+    def test_retrieve_dashboard_scoped_to_enterprize(
+        self, http_client, admin_access_token, preregistered_profile, other_profile
+    ):
+        response = http_client.get(self.uri_path, headers={'Authorization': f'Bearer {admin_access_token}'})
+
+        assert response.json() == {
+            'total_registrations': 1,
+            'active_registrations': 1,
+            'total_invitations': 0,
+            'accepted_invitations': 0,
+        }
+
 
-@pytest.mark.xfail
 class TestUploadFileAPI:
     uri_path = '/users/actions/upload'
 
-    def test_upload_file_200(self, http_client, admin_access_token, test_file):
+    def test_upload_file_200(self, http_client, admin_access_token, admin_profile, blob_store, test_file):
         response = http_client.post(
             self.uri_path,
             headers={'Authorization': f'Bearer {admin_access_token}'},
             files={'document': ('filename', test_file)},
         )
         assert response.status_code == status.HTTP_202_ACCEPTED
+        assert blob_store.path(name=f'{admin_profile.enterprize.subdomain}/filename').read_bytes() == b'byte_data'
+
+    def test_upload_file_keeps_base_name(self, http_client, admin_access_token, admin_profile, blob_store, test_file):
+        response = http_client.post(
+            self.uri_path,
+            headers={'Authorization': f'Bearer {admin_access_token}'},
+            files={'document': ('../../filename', test_file)},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert blob_store.path(name=f'{admin_profile.enterprize.subdomain}/filename').exists()
 
 
 class TestUpdateProfileAPI:
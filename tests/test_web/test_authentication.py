@@ -24,6 +24,16 @@ class TestAuthenticationAPI:
         assert response.status_code == status.HTTP_200_OK
         assert 'access_token' in response.json().keys()
 
+    def test_password_hashing_busy_return_429(self, http_client, active_user, credentials, saturated_password_hasher):
+        files = {
+            'username': (None, active_user.username),
+            'password': (None, credentials.plain_password),
+        }
+        response = http_client.post(self.uri_path, files=files)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers['Retry-After'] == '1'
+
     def test_user_inactive_return_400(self, http_client, user, credentials):
         files = {
             'username': (None, user.username),
@@ -0,0 +1,23 @@
+from fastapi import status
+
+from saas.web.app import web_app
+from saas.web.security import get_super_admin_profile
+
+
+class TestDatabasePoolMetricsAPI:
+    uri_path = '/metrics/database-pool'
+
+    def test_admin_is_forbidden_403(self, http_client, admin_access_token):
+        response = http_client.get(self.uri_path, headers={'Authorization': f'Bearer {admin_access_token}'})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_retrieve_200(self, http_client, admin_profile):
+        web_app.dependency_overrides[get_super_admin_profile] = lambda: admin_profile
+
+        response = http_client.get(self.uri_path)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {'pool_class', 'checkouts', 'timeouts', 'average_wait_in_ms', 'checked_out', 'overflow'} <= set(
+            response.json()
+        )
@@ -0,0 +1,86 @@
+import asyncio
+
+from fastapi import FastAPI, File, Request, UploadFile, status
+from fastapi.testclient import TestClient
+
+from saas.web.middleware import RequestSizeLimitMiddleware
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, limits={'/limited': 10, '/upload': 100})
+
+    @app.post('/limited')
+    async def limited(request: Request):
+        return {'size': len(await request.body())}
+
+    @app.post('/upload')
+    async def upload(photo: UploadFile = File(...)):
+        return {'size': len(await photo.read())}
+
+    @app.post('/unlimited')
+    async def unlimited(request: Request):
+        return {'size': len(await request.body())}
+
+    return app
+
+
+class TestRequestSizeLimitMiddleware:
+    http_client = TestClient(app=create_app())
+
+    def test_body_within_limit(self):
+        response = self.http_client.post('/limited', data=b'x' * 10)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'size': 10}
+
+    def test_content_length_over_limit(self):
+        response = self.http_client.post('/limited', data=b'x' * 11)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    @staticmethod
+    def stream(path: str, chunks: list[bytes], headers: list[tuple[bytes, bytes]] = None) -> list[dict]:
+        # a chunked body without content-length is only caught while it is received
+        scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': headers or [], 'query_string': b''}
+        messages = [
+            {'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+            for index, chunk in enumerate(chunks)
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(create_app()(scope, receive, send))
+        return sent
+
+    def test_streamed_body_over_limit(self):
+        sent = self.stream(path='/limited', chunks=[b'x' * 6, b'x' * 6])
+
+        assert sent[0]['status'] == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_streamed_upload_over_limit(self):
+        body = (
+            b'--boundary\r\n'
+            b'Content-Disposition: form-data; name="photo"; filename="photo.jpg"\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + b'x' * 300 + b'\r\n--boundary--\r\n'
+        )
+
+        sent = self.stream(
+            path='/upload',
+            chunks=[body[start : start + 64] for start in range(0, len(body), 64)],
+            headers=[(b'content-type', b'multipart/form-data; boundary=boundary')],
+        )
+
+        assert [message['status'] for message in sent if message['type'] == 'http.response.start'] == [
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        ]
+
+    def test_other_paths_are_not_limited(self):
+        response = self.http_client.post('/unlimited', data=b'x' * 100)
+
+        assert response.status_code == status.HTTP_200_OK
@@ -28,6 +28,13 @@ class TestRegistrationAPI:
         assert response.status_code == status.HTTP_201_CREATED
         assert {'email': credentials.username} == response.json()
 
+    def test_password_hashing_busy_return_429(self, http_client, credentials, enterprize, saturated_password_hasher):
+        request = self.get_user_input(credentials, enterprize)
+        response = http_client.post(self.uri_path, json=request)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers['Retry-After'] == '1'
+
     def test_user_already_exists_return_400(self, http_client, credentials, enterprize, active_user):
         request = self.get_user_input(credentials, enterprize)
         response = http_client.post(self.uri_path, json=request)
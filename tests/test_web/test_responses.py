@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from saas.web.responses import FileRangeResponse, RangeNotSatisfiable, parse_byte_range
+
+
+class TestParseByteRange:
+    @pytest.mark.parametrize(
+        'range_header, expected',
+        [
+            ('bytes=0-99', (0, 99)),
+            ('bytes=100-', (100, 999)),
+            ('bytes=900-2000', (900, 999)),
+            ('bytes=-100', (900, 999)),
+            ('bytes=-5000', (0, 999)),
+            ('bytes=10-5', None),
+            ('bytes=0-1,5-9', None),
+            ('items=0-9', None),
+            ('bytes=-', None),
+        ],
+    )
+    def test_parse_byte_range(self, range_header, expected):
+        assert parse_byte_range(range_header=range_header, size=1000) == expected
+
+    @pytest.mark.parametrize('range_header', ['bytes=1000-', 'bytes=-0'])
+    def test_range_not_satisfiable(self, range_header):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_byte_range(range_header=range_header, size=1000)
+
+
+class TestFileRangeResponse:
+    @staticmethod
+    def send(response: 'FileRangeResponse', scope: dict) -> list[dict]:
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(response(scope, None, send))
+        return messages
+
+    def test_zero_copy_send(self, tmp_path):
+        path = tmp_path / 'photo'
+        path.write_bytes(b'0123456789')
+        response = FileRangeResponse(
+            file=path.open('rb'), media_type='image/jpeg', headers={}, range_header='bytes=2-5'
+        )
+
+        start, body = self.send(
+            response=response,
+            scope={'type': 'http', 'method': 'GET', 'extensions': {'http.response.zerocopysend': {}}},
+        )
+
+        assert start['status'] == 206
+        assert body['type'] == 'http.response.zerocopysend'
+        assert (body['offset'], body['count']) == (2, 4)
+        assert body['file'].closed
+
+    def test_chunked_send(self, tmp_path, monkeypatch):
+        path = tmp_path / 'photo'
+        path.write_bytes(b'0123456789')
+        monkeypatch.setattr(FileRangeResponse, 'chunk_size', 4)
+        response = FileRangeResponse(file=path.open('rb'), media_type='image/jpeg', headers={})
+
+        start, *bodies = self.send(response=response, scope={'type': 'http', 'method': 'GET'})
+
+        assert start['status'] == 200
+        assert [body['body'] for body in bodies] == [b'0123', b'4567', b'89']
+        assert [body['more_body'] for body in bodies] == [True, True, False]
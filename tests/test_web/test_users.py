@@ -2,7 +2,12 @@ import pytest
 from fastapi import status
 from typing import Any
 
-from saas.domain.users import UserAvailability, UserMotivation
+from saas.core.config import configuration
+from saas.domain.posts import NewsPost, PostContent, Question, Answer
+from saas.domain.users import UserAvailability, UserMotivation, UserType
+from saas.service.authentication import create_access_token
+from saas.service.exceptions import PhotoPipelineBusy
+from saas.service.profile import upload_user_photo
 
 
 @pytest.mark.xfail
@@ -97,14 +102,157 @@ class TestUpdateProfileAPI:
 class TestUploadPhotoAPI:
     path = '/profile/photo'
 
-    @pytest.mark.xfail
-    def test_upload_photo_200(self, http_client, photo, access_token):
+    def test_upload_photo_202(self, http_client, photo, photo_pipeline, profile, access_token):
         response = http_client.post(
             self.path,
             headers={'Authorization': f'Bearer {access_token}'},
             files={'photo': ('filename', photo)},
         )
-        assert response.status_code == status.HTTP_201_CREATED
+        photo_pipeline.shutdown()
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json() == {'status': 'processing'}
+        assert profile.photo_url is not None
+
+    def test_upload_photo_busy_429(self, http_client, photo, photo_pipeline, access_token, monkeypatch):
+        def accept(reference, file_obj, replaces_version):
+            raise PhotoPipelineBusy(retry_after_in_seconds=5)
+
+        monkeypatch.setattr(photo_pipeline, 'accept', accept)
+        response = http_client.post(
+            self.path,
+            headers={'Authorization': f'Bearer {access_token}'},
+            files={'photo': ('filename', photo)},
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers['Retry-After'] == '5'
+
+    def test_upload_photo_is_stamped_with_the_version_it_replaces(
+        self, http_client, photo, photo_pipeline, profile, access_token, monkeypatch
+    ):
+        accepted = []
+        profile.photo_version = '1a2b3c'
+        monkeypatch.setattr(photo_pipeline, 'accept', lambda **kwargs: accepted.append(kwargs['replaces_version']))
+
+        response = http_client.post(
+            self.path,
+            headers={'Authorization': f'Bearer {access_token}'},
+            files={'photo': ('filename', photo)},
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert accepted == ['1a2b3c']
+
+    def test_upload_invalid_photo_422(self, http_client, access_token):
+        response = http_client.post(
+            self.path,
+            headers={'Authorization': f'Bearer {access_token}'},
+            files={'photo': ('filename', b'not an image')},
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_upload_too_large_photo_413(self, http_client, photo, access_token, monkeypatch):
+        monkeypatch.setattr(configuration, 'PHOTO_MAX_SIZE_IN_BYTES', 100)
+
+        response = http_client.post(
+            self.path,
+            headers={'Authorization': f'Bearer {access_token}'},
+            files={'photo': ('filename', photo)},
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_delete_photo_204(self, http_client, profile, access_token):
+        profile.photo_url = 'photo_url'
+
+        response = http_client.delete(self.path, headers={'Authorization': f'Bearer {access_token}'})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert profile.photo_url is None
+
+
+class TestRetrievePhotoAPI:
+    @pytest.fixture(scope='function')
+    def photo_url(self, profile, photo, blob_store, photo_cache, user_repository, unit_of_work):
+        return upload_user_photo(
+            reference=profile.reference,
+            photo=photo,
+            replaces_version=None,
+            blob_store=blob_store,
+            photo_cache=photo_cache,
+            repository=user_repository,
+            unit_of_work=unit_of_work,
+        )
+
+    def test_retrieve_photo_200(self, http_client, profile, photo_url, blob_store):
+        response = http_client.get(photo_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'] == 'image/jpeg'
+        assert response.headers['etag'] == f'"{profile.reference}.{profile.photo_version}.medium"'
+        assert 'immutable' in response.headers['cache-control']
+        assert response.headers['accept-ranges'] == 'bytes'
+        assert (
+            response.content
+            == blob_store.path(name=f'{profile.reference}/{profile.photo_version}/medium').read_bytes()
+        )
+
+    def test_retrieve_photo_from_cache(self, http_client, profile, photo_url, blob_store):
+        first = http_client.get(photo_url)
+        blob_store.delete(name=f'{profile.reference}/{profile.photo_version}/medium')
+
+        response = http_client.get(photo_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == first.content
+
+    def test_retrieve_deleted_photo_404(self, http_client, photo_url, access_token):
+        assert http_client.get(photo_url).status_code == status.HTTP_200_OK
+
+        http_client.delete('/profile/photo', headers={'Authorization': f'Bearer {access_token}'})
+        response = http_client.get(photo_url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_retrieve_photo_not_modified_304(self, http_client, photo_url):
+        etag = http_client.get(photo_url).headers['etag']
+
+        response = http_client.get(photo_url, headers={'If-None-Match': f'W/{etag}'})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+
+    def test_retrieve_photo_range_206(self, http_client, photo_url):
+        photo = http_client.get(photo_url).content
+
+        response = http_client.get(photo_url, headers={'Range': 'bytes=10-19'})
+
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.headers['content-range'] == f'bytes 10-19/{len(photo)}'
+        assert response.content == photo[10:20]
+
+    def test_retrieve_photo_stale_if_range_200(self, http_client, photo_url):
+        response = http_client.get(photo_url, headers={'Range': 'bytes=10-19', 'If-Range': '"stale"'})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_retrieve_photo_range_not_satisfiable_416(self, http_client, photo_url):
+        response = http_client.get(photo_url, headers={'Range': 'bytes=100000000-'})
+
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response.headers['content-range'].startswith('bytes */')
+
+    def test_retrieve_unknown_variant_404(self, http_client, profile, photo_url):
+        response = http_client.get(f'/photos/{profile.reference}/{profile.photo_version}/original')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_retrieve_unknown_version_404(self, http_client, profile, photo_url):
+        response = http_client.get(f'/photos/{profile.reference}/{"0" * 16}/medium')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 class TestListPostsAPI:
@@ -116,6 +264,53 @@ class TestListPostsAPI:
         assert response.status_code == status.HTTP_200_OK
         assert 'posts' in response.json()
 
+    def test_list_paginated_200(self, http_client, news_post, access_token):
+        response = http_client.get(self.path, params={'limit': 1}, headers={'Authorization': f'Bearer {access_token}'})
+        next_page = http_client.get(
+            self.path,
+            params={'limit': 1, 'before': response.json()['next_cursor']},
+            headers={'Authorization': f'Bearer {access_token}'},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [post['reference'] for post in response.json()['posts']] == [news_post.reference]
+        assert next_page.status_code == status.HTTP_200_OK
+        assert next_page.json()['posts'] == []
+        assert next_page.json()['next_cursor'] is None
+
+    def test_list_invalid_cursor_400(self, http_client, access_token):
+        response = http_client.get(
+            self.path, params={'before': 'invalid'}, headers={'Authorization': f'Bearer {access_token}'}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestListPostsQueries:
+    path = '/posts'
+
+    @staticmethod
+    def create_news_posts(database_session, author, count):
+        for _ in range(count):
+            database_session.add(NewsPost(author=author, content=PostContent(title='Title', body='Text')))
+
+        database_session.commit()
+
+    def test_list_constant_number_of_statements(self, database_session, create_database_profile, count_statements):
+        admin_profile = create_database_profile(username='admin@example.com', user_type=UserType.admin)
+        other_admin_profile = create_database_profile(username='other_admin@example.com', user_type=UserType.admin)
+        access_token = create_access_token(username=admin_profile.user.username)
+
+        self.create_news_posts(database_session=database_session, author=admin_profile, count=1)
+        _, statements_for_single_post = count_statements(path=self.path, access_token=access_token)
+
+        self.create_news_posts(database_session=database_session, author=admin_profile, count=5)
+        self.create_news_posts(database_session=database_session, author=other_admin_profile, count=5)
+        response, statements = count_statements(path=self.path, access_token=access_token)
+
+        assert len(response.json()['posts']) == 11
+        assert statements == statements_for_single_post
+
 
 class TestRetrievePostAPI:
     path = '/post'
@@ -192,6 +387,59 @@ class TestListQuestionAPI:
         assert {'questions'} == set(response.json().keys())
 
 
+class TestQuestionsQueries:
+    path = '/questions'
+
+    @staticmethod
+    def create_questions(database_session, authors, count, answers_count):
+        questions = []
+        for _ in range(count):
+            question = Question(author=authors[0], content=PostContent(title='Title', body='Text'))
+            for index in range(answers_count):
+                Answer(
+                    author=authors[index % len(authors)],
+                    question=question,
+                    content=PostContent(title=None, body='Text'),
+                )
+            questions.append(question)
+
+        database_session.add_all(questions)
+        database_session.commit()
+
+        return questions
+
+    @pytest.fixture(scope='function')
+    def authors(self, create_database_profile):
+        return [create_database_profile(username=f'user{index}@example.com') for index in range(3)]
+
+    def test_list_constant_number_of_statements(self, database_session, count_statements, authors):
+        access_token = create_access_token(username=authors[0].user.username)
+
+        self.create_questions(database_session=database_session, authors=authors[:1], count=1, answers_count=1)
+        _, statements_for_single_question = count_statements(path=self.path, access_token=access_token)
+
+        self.create_questions(database_session=database_session, authors=authors, count=4, answers_count=3)
+        response, statements = count_statements(path=self.path, access_token=access_token)
+
+        assert len(response.json()['questions']) == 5
+        assert statements == statements_for_single_question
+
+    def test_retrieve_constant_number_of_statements(self, database_session, count_statements, authors):
+        access_token = create_access_token(username=authors[0].user.username)
+        (question,) = self.create_questions(database_session, authors=authors[:1], count=1, answers_count=1)
+        (other_question,) = self.create_questions(database_session, authors=authors, count=1, answers_count=6)
+
+        _, statements_for_single_answer = count_statements(
+            path=f'{self.path}/{question.reference}', access_token=access_token
+        )
+        response, statements = count_statements(
+            path=f'{self.path}/{other_question.reference}', access_token=access_token
+        )
+
+        assert len(response.json()['answers']) == 6
+        assert statements == statements_for_single_answer
+
+
 class TestRetrieveQuestionAPI:
     path = '/questions'
 
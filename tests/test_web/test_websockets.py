@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from starlette import status
+from starlette.websockets import WebSocketDisconnect
+
+from saas.web.ws import endpoints
+from saas.web.ws.hub import HEARTBEAT_MESSAGE, BroadcastHub
+
+
+async def silence():
+    await asyncio.Event().wait()
+    yield
+
+
+async def burst():
+    for message in ('1', '2', '3'):
+        yield message
+    await asyncio.Event().wait()
+
+
+class TestBroadcastHub:
+    def test_one_producer_per_topic(self):
+        started = []
+
+        def producer():
+            started.append(True)
+            return silence()
+
+        async def subscribe():
+            hub = BroadcastHub(queue_size=4, heartbeat_interval_in_seconds=10)
+            subscriptions = [hub.subscribe(topic='topic', producer=producer) for _ in range(3)]
+            await asyncio.sleep(0)
+
+            hub.publish(topic='topic', message='message')
+            received = [await subscription.__aiter__().__anext__() for subscription in subscriptions]
+            await hub.close()
+            return received
+
+        assert asyncio.run(subscribe()) == ['message'] * 3
+        assert started == [True]
+
+    def test_slow_consumer_is_dropped(self):
+        async def subscribe():
+            hub = BroadcastHub(queue_size=2, heartbeat_interval_in_seconds=10)
+            slow = hub.subscribe(topic='topic', producer=burst)
+            await asyncio.sleep(0.01)
+
+            received = [message async for message in slow]
+            return hub, slow, received
+
+        hub, slow, received = asyncio.run(subscribe())
+
+        assert received == []
+        assert slow.close_code == status.WS_1013_TRY_AGAIN_LATER
+        assert hub.subscribers(topic='topic') == 0
+
+    def test_idle_subscription_gets_heartbeats(self):
+        async def subscribe():
+            hub = BroadcastHub(queue_size=4, heartbeat_interval_in_seconds=0.01)
+            subscription = hub.subscribe(topic='topic', producer=silence)
+
+            message = await asyncio.wait_for(subscription.__aiter__().__anext__(), timeout=1)
+            await hub.close()
+            return message, subscription
+
+        message, subscription = asyncio.run(subscribe())
+
+        assert message == HEARTBEAT_MESSAGE
+        assert subscription.close_code == status.WS_1001_GOING_AWAY
+
+    def test_failed_producer_closes_topic(self):
+        async def failing():
+            raise ValueError()
+            yield
+
+        async def subscribe():
+            hub = BroadcastHub(queue_size=4, heartbeat_interval_in_seconds=10)
+            subscription = hub.subscribe(topic='topic', producer=failing)
+            return [message async for message in subscription], subscription
+
+        received, subscription = asyncio.run(subscribe())
+
+        assert received == []
+        assert subscription.close_code == status.WS_1011_INTERNAL_ERROR
+
+    def test_last_unsubscribe_stops_producer(self):
+        async def subscribe():
+            hub = BroadcastHub(queue_size=4, heartbeat_interval_in_seconds=10)
+            subscription = hub.subscribe(topic='topic', producer=silence)
+            producer = hub._producers['topic']
+
+            hub.unsubscribe(subscription=subscription)
+            await asyncio.sleep(0)
+            return producer
+
+        assert asyncio.run(subscribe()).cancelled()
+
+
+class TestTimerWebSocket:
+    path = '/timer'
+
+    @pytest.fixture(autouse=True)
+    def fast_timer(self, monkeypatch):
+        monkeypatch.setattr(endpoints, 'TIMER_INTERVAL_IN_SECONDS', 0.01)
+
+    def test_timer_counts(self, http_client, broadcast_hub):
+        with http_client.websocket_connect(self.path) as websocket:
+            ticks = [websocket.receive_text() for _ in range(3)]
+
+        assert ticks == ['1', '2', '3']
+        assert broadcast_hub.subscribers(topic='timer') == 0
+
+    def test_closed_hub_closes_socket(self, http_client, broadcast_hub):
+        with http_client.websocket_connect(self.path) as websocket:
+            websocket.receive_text()
+            asyncio.run_coroutine_threadsafe(broadcast_hub.close(), websocket._loop).result(timeout=1)
+
+            with pytest.raises(WebSocketDisconnect) as exc:
+                while True:
+                    websocket.receive_text()
+
+        assert exc.value.code == status.WS_1001_GOING_AWAY